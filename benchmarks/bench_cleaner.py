@@ -0,0 +1,105 @@
+# benchmarks/bench_cleaner.py
+"""
+Compare clean_csv's cell cleaner against the original three-pass version.
+
+Usage:
+    python -m benchmarks.bench_cleaner [--devices N] [--html-rate R] [--workers N ...]
+
+A synthetic Panorama export with a share of HTML-polluted cells is cleaned
+with the original `clean_html_tags` (three `re.sub` calls on every cell),
+the fast-path cleaner, and the chunked cleaner for each --workers count.
+"""
+
+import argparse
+import csv
+import os
+import re
+import tempfile
+import time
+
+from benchmarks.synthetic import write_panorama_csv
+from device_certificate_report.utilities import cleaner
+from device_certificate_report.utilities.cleaner import clean_csv
+
+
+def original_clean_html_tags(text: str) -> str:
+    cleaned = re.sub(r"<[^>]+>", "", text)
+    cleaned = re.sub(r'";+"', ";", cleaned)
+    cleaned = re.sub(r'"+', '"', cleaned)
+    return cleaned.strip()
+
+
+def original_clean_csv(input_file: str, output_file: str):
+    with open(input_file, "r", newline="", encoding="utf-8-sig") as infile, open(
+        output_file, "w", newline="", encoding="utf-8"
+    ) as outfile:
+        writer = csv.writer(outfile, quoting=csv.QUOTE_MINIMAL)
+        for row in csv.reader(infile):
+            writer.writerow([original_clean_html_tags(cell) for cell in row])
+
+
+def timed(function, *args, **kwargs) -> float:
+    start = time.perf_counter()
+    function(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main(count: int, html_rate: float, worker_counts):
+    with tempfile.TemporaryDirectory() as directory:
+        raw_csv = os.path.join(directory, "fleet.csv")
+        write_panorama_csv(raw_csv, count, seed=0, html_rate=html_rate)
+        size_mib = os.path.getsize(raw_csv) / 2**20
+        with open(raw_csv, newline="", encoding="utf-8") as file:
+            cells = [cell for row in csv.reader(file) for cell in row]
+        marked = sum(1 for cell in cells if "<" in cell or '"' in cell or "&" in cell)
+        print(
+            f"{count} devices, {size_mib:.1f} MiB, {len(cells)} cells, "
+            f"{marked / len(cells):.0%} with markup"
+        )
+
+        start = time.perf_counter()
+        for cell in cells:
+            original_clean_html_tags(cell)
+        original_cells = time.perf_counter() - start
+        start = time.perf_counter()
+        for cell in cells:
+            cleaner.clean_html_tags(cell)
+        fast_cells = time.perf_counter() - start
+
+        results = [
+            ("cells, original", original_cells, len(cells)),
+            ("cells, fast path", fast_cells, len(cells)),
+            (
+                "clean_csv, original",
+                timed(original_clean_csv, raw_csv, os.path.join(directory, "o.csv")),
+                size_mib,
+            ),
+            (
+                "clean_csv",
+                timed(clean_csv, raw_csv, os.path.join(directory, "1.csv")),
+                size_mib,
+            ),
+        ]
+        for workers in worker_counts:
+            output_file = os.path.join(directory, f"w{workers}.csv")
+            results.append(
+                (
+                    f"clean_csv, {workers} workers",
+                    timed(clean_csv, raw_csv, output_file, workers=workers),
+                    size_mib,
+                )
+            )
+
+    print(f"{'variant':>24} {'seconds':>10} {'throughput':>16}")
+    for name, seconds, amount in results:
+        unit = "cells/s" if name.startswith("cells") else "MiB/s"
+        print(f"{name:>24} {seconds:>10.3f} {amount / seconds:>10.1f} {unit}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--devices", type=int, default=100_000)
+    parser.add_argument("--html-rate", type=float, default=0.2)
+    parser.add_argument("--workers", type=int, nargs="*", default=[2, 4])
+    args = parser.parse_args()
+    main(args.devices, args.html_rate, args.workers)
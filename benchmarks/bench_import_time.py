@@ -0,0 +1,67 @@
+# benchmarks/bench_import_time.py
+"""
+Measure the CLI's cold-start import time with `python -X importtime`.
+
+Usage:
+    python -m benchmarks.bench_import_time [--runs N] [--budget-ms MS]
+
+Each run imports the CLI module in a fresh interpreter. The median cumulative
+import time is compared against the budget, and the script exits non-zero
+when it is exceeded, so it can guard the startup time in CI. The slowest
+modules of the last run are listed to show where any regression comes from.
+
+The test suite checks the same measurement against a loose multiple of the
+budget (tests/test_startup.py); run this script for the exact figure.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+MODULE = "device_certificate_report.main"
+
+# Cold-start budget for importing the CLI, in milliseconds
+DEFAULT_BUDGET_MS = 120
+
+
+def import_times(module):
+    """
+    Import `module` in a fresh interpreter and return {module: (self_us,
+    cumulative_us)} as reported by -X importtime.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def main(runs, budget_ms):
+    totals = []
+    for _ in range(runs):
+        times = import_times(MODULE)
+        totals.append(times[MODULE][1] / 1000)
+    median = statistics.median(totals)
+
+    print(f"{MODULE}: median {median:.1f} ms over {runs} runs (budget {budget_ms} ms)")
+    print("Slowest modules (self time):")
+    for name, (self_us, _) in sorted(times.items(), key=lambda item: -item[1][0])[:10]:
+        print(f"  {self_us / 1000:8.1f} ms  {name}")
+    return 0 if median <= budget_ms else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    args = parser.parse_args()
+    sys.exit(main(args.runs, args.budget_ms))
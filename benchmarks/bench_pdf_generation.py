@@ -0,0 +1,67 @@
+# benchmarks/bench_pdf_generation.py
+"""
+Time `generate_report` for growing numbers of devices.
+
+Usage:
+    python -m benchmarks.bench_pdf_generation [--render-workers N] [SIZE ...]
+
+Render time should grow linearly with the number of rows, so the rows/sec
+column stays roughly constant across sizes. With --render-workers, sections
+are rendered in that many processes; wall time should drop with the number
+of cores available.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from device_certificate_report.models.device import DeviceInfo
+from device_certificate_report.utilities.pdf_generation import generate_report
+
+DEFAULT_SIZES = [1_000, 5_000, 10_000, 25_000, 50_000, 100_000]
+
+
+def make_devices(count):
+    return [
+        DeviceInfo(
+            device_name=f"fw{index}",
+            model="PA-220",
+            serial_number=f"{index:012d}",
+            ipv4_address=f"10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}",
+            device_state="Connected",
+            device_certificate="Valid",
+            device_certificate_expiry_date="2030/01/01 00:00:00",
+            software_version="10.1.0",
+            globalprotect_client="",
+        )
+        for index in range(count)
+    ]
+
+
+def main(sizes, render_workers=1):
+    print(f"{'devices':>10} {'seconds':>10} {'rows/sec':>12}")
+    with tempfile.TemporaryDirectory() as directory:
+        output_file = os.path.join(directory, "report.pdf")
+        for size in sizes:
+            devices = make_devices(size)
+            start = time.perf_counter()
+            generate_report(
+                unaffected_devices=devices,
+                no_upgrade_required=[],
+                upgrade_required=[],
+                devices_with_globalprotect=[],
+                devices_with_certificates=[],
+                output_file=output_file,
+                render_workers=render_workers,
+            )
+            elapsed = time.perf_counter() - start
+            print(f"{size:>10} {elapsed:>10.2f} {size / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("sizes", nargs="*", type=int, default=DEFAULT_SIZES)
+    parser.add_argument("--render-workers", type=int, default=1)
+    args = parser.parse_args()
+    main(args.sizes, args.render_workers)
@@ -0,0 +1,54 @@
+# benchmarks/bench_renderers.py
+"""
+Time each streaming output format for a large fleet.
+
+Usage:
+    python -m benchmarks.bench_renderers [--devices N] [FORMAT ...]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.bench_pdf_generation import make_devices
+from device_certificate_report.utilities.renderers import OutputFormat, render_report
+
+STREAMING_FORMATS = ["csv", "jsonl", "html", "parquet"]
+
+
+def main(formats, count):
+    devices = make_devices(count)
+    print(f"{'format':>8} {'devices':>10} {'seconds':>10} {'rows/sec':>12}")
+    with tempfile.TemporaryDirectory() as directory:
+        for output_format in formats:
+            output_file = os.path.join(
+                directory, f"report{OutputFormat(output_format).extension}"
+            )
+            start = time.perf_counter()
+            try:
+                render_report(
+                    output_format,
+                    unaffected_devices=devices,
+                    no_upgrade_required=[],
+                    upgrade_required=[],
+                    devices_with_globalprotect=[],
+                    devices_with_certificates=devices,
+                    output_file=output_file,
+                )
+            except ImportError as e:
+                print(f"{output_format:>8} skipped: {e}")
+                continue
+            elapsed = time.perf_counter() - start
+            rows = 2 * count
+            print(
+                f"{output_format:>8} {rows:>10} {elapsed:>10.2f} {rows / elapsed:>12.0f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("formats", nargs="*", default=STREAMING_FORMATS)
+    parser.add_argument("--devices", type=int, default=100_000)
+    args = parser.parse_args()
+    main(args.formats, args.devices)
@@ -0,0 +1,248 @@
+# benchmarks/suite.py
+"""
+End-to-end benchmark suite over synthetic fleets.
+
+Usage:
+    python -m benchmarks.suite [--sizes N ...] [--stages NAME ...]
+                               [--json results.json] [--baseline results.json]
+
+For each fleet size a Panorama CSV export and a `show devices all` response
+are generated (see benchmarks.synthetic), then each stage is timed on its
+own. Every stage runs in a fresh interpreter so its peak RSS is its own;
+that figure includes loading the stage's input, which is not timed.
+
+With --baseline, each stage is compared against an earlier --json run and
+the suite exits non-zero when one is more than --tolerance slower.
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+STAGES = [
+    "clean_csv",
+    "process_csv_file",
+    "panorama_xml_stream",
+    "panorama_xml_tree",
+    "filter_devices_by_model",
+    "split_devices_by_version",
+    "classify_devices",
+    "generate_report",
+]
+
+
+def _load_devices(workdir):
+    from device_certificate_report.components.data_collection import process_csv_file
+
+    return process_csv_file(os.path.join(workdir, "cleaned.csv"))
+
+
+def run_stage(stage, workdir):
+    """
+    Run one stage and return (devices handled, seconds spent in the stage).
+    """
+    raw_csv = os.path.join(workdir, "fleet.csv")
+    cleaned_csv = os.path.join(workdir, "cleaned.csv")
+    xml_file = os.path.join(workdir, "fleet.xml")
+
+    if stage == "clean_csv":
+        from device_certificate_report.utilities.cleaner import clean_csv
+
+        start = time.perf_counter()
+        clean_csv(raw_csv, cleaned_csv)
+        elapsed = time.perf_counter() - start
+        return len(_load_devices(workdir)), elapsed
+
+    if stage == "process_csv_file":
+        from device_certificate_report.components.data_collection import (
+            process_csv_file,
+        )
+
+        start = time.perf_counter()
+        devices = process_csv_file(cleaned_csv)
+        return len(devices), time.perf_counter() - start
+
+    if stage == "panorama_xml_stream":
+        from device_certificate_report.components.xml_stream import (
+            iter_panorama_devices,
+        )
+
+        start = time.perf_counter()
+        devices = list(iter_panorama_devices(xml_file))
+        return len(devices), time.perf_counter() - start
+
+    if stage == "panorama_xml_tree":
+        import xml.etree.ElementTree as ET
+
+        from device_certificate_report.components.xml_stream import (
+            panorama_entry_record,
+        )
+        from device_certificate_report.models.device import DeviceInfo
+
+        # The non-streaming path of collect_data_from_panorama
+        start = time.perf_counter()
+        root = ET.parse(xml_file).getroot()
+        devices = [
+            DeviceInfo(**panorama_entry_record(entry))
+            for entry in root.findall(".//devices/entry")
+        ]
+        return len(devices), time.perf_counter() - start
+
+    from device_certificate_report.utilities.filters import (
+        filter_devices_by_model,
+        split_devices_by_version,
+    )
+
+    devices = _load_devices(workdir)
+
+    if stage == "filter_devices_by_model":
+        start = time.perf_counter()
+        filter_devices_by_model(devices)
+        return len(devices), time.perf_counter() - start
+
+    if stage == "classify_devices":
+        from device_certificate_report.utilities.classification import (
+            classify_devices,
+        )
+
+        start = time.perf_counter()
+        classify_devices(devices)
+        return len(devices), time.perf_counter() - start
+
+    affected_devices, unaffected_devices = filter_devices_by_model(devices)
+
+    if stage == "split_devices_by_version":
+        start = time.perf_counter()
+        split_devices_by_version(affected_devices)
+        return len(affected_devices), time.perf_counter() - start
+
+    if stage == "generate_report":
+        from device_certificate_report.utilities.pdf_generation import generate_report
+
+        no_upgrade_required, upgrade_required = split_devices_by_version(
+            affected_devices
+        )
+        start = time.perf_counter()
+        generate_report(
+            unaffected_devices=unaffected_devices,
+            no_upgrade_required=no_upgrade_required,
+            upgrade_required=upgrade_required,
+            devices_with_globalprotect=[
+                device for device in devices if device.globalprotect_client
+            ],
+            devices_with_certificates=[
+                device
+                for device in devices
+                if device.device_certificate and device.device_certificate_expiry_date
+            ],
+            output_file=os.path.join(workdir, "report.pdf"),
+        )
+        return len(devices), time.perf_counter() - start
+
+    raise ValueError(f"Unknown stage: {stage}")
+
+
+def measure(stage, workdir):
+    """
+    Run a stage in a fresh interpreter and return its measurements.
+    """
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.suite", "--run-stage", stage, workdir],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def main(args):
+    from benchmarks.synthetic import write_panorama_csv, write_show_devices_xml
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = {
+                (result["stage"], result["size"]): result for result in json.load(file)
+            }
+
+    results = []
+    regressions = []
+    print(
+        f"{'stage':<26} {'devices':>9} {'seconds':>9} {'rows/sec':>10} "
+        f"{'peak RSS':>10}{'  vs baseline' if baseline else ''}"
+    )
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as workdir:
+            write_panorama_csv(os.path.join(workdir, "fleet.csv"), size, args.seed)
+            write_show_devices_xml(os.path.join(workdir, "fleet.xml"), size, args.seed)
+            # Later stages read the cleaned export
+            stages = args.stages
+            if "clean_csv" not in stages:
+                run_stage("clean_csv", workdir)
+
+            for stage in [stage for stage in STAGES if stage in stages]:
+                result = dict(stage=stage, size=size, **measure(stage, workdir))
+                results.append(result)
+                line = (
+                    f"{stage:<26} {result['rows']:>9} {result['seconds']:>9.3f} "
+                    f"{result['rows_per_sec']:>10.0f} "
+                    f"{result['peak_rss_mib']:>6.1f} MiB"
+                )
+                previous = baseline.get((stage, size))
+                if previous:
+                    change = result["seconds"] / previous["seconds"] - 1
+                    line += f"  {change:+.0%}"
+                    if change > args.tolerance:
+                        regressions.append(f"{stage} at {size} devices: {change:+.0%}")
+                print(line, flush=True)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    if regressions:
+        print("Regressions beyond tolerance:\n  " + "\n  ".join(regressions))
+        return 1
+    return 0
+
+
+def _run_stage_main(stage, workdir):
+    rows, seconds = run_stage(stage, workdir)
+    # ru_maxrss is reported in KiB on Linux
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(
+        json.dumps(
+            dict(
+                rows=rows,
+                seconds=seconds,
+                rows_per_sec=rows / seconds if seconds else 0.0,
+                peak_rss_mib=peak_rss,
+            )
+        )
+    )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--run-stage":
+        _run_stage_main(sys.argv[2], sys.argv[3])
+        sys.exit(0)
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES)
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--baseline", help="Compare against an earlier --json run")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Slowdown against the baseline treated as a regression (0.2 = 20%%)",
+    )
+    sys.exit(main(parser.parse_args()))
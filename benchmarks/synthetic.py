@@ -0,0 +1,240 @@
+# benchmarks/synthetic.py
+"""
+Deterministic synthetic fleets for benchmarks.
+
+The same seed always produces the same fleet. The CSV export and the
+`show devices all` response generated from one seed describe the same
+devices, so the CSV and Panorama paths can be compared like for like.
+
+Usage:
+    python -m benchmarks.synthetic --devices 100000 --csv fleet.csv --xml fleet.xml
+"""
+
+import argparse
+import csv
+import random
+
+from typing import Dict, Iterator, List
+from xml.sax.saxutils import escape
+
+from device_certificate_report.config.hardware_families import (
+    AffectedFamilies,
+    UnaffectedFamilies,
+)
+from device_certificate_report.config.panos_versions import MinimumPatchedVersions
+
+CSV_HEADER = [
+    "Device Name",
+    "IP Address Serial Number",
+    "IP Address IPv4",
+    "Status Device State",
+    "Status Device Certificate",
+    "Status Device Certificate Expiry Date",
+    "GlobalProtect Client",
+    "Model",
+    "Software Version",
+]
+
+# Per-device columns, joined with ";" when a row describes several devices
+MULTI_VALUE_COLUMNS = CSV_HEADER[:7]
+
+# Markup the Panorama web UI leaves in exported cells
+HTML_WRAPPERS = [
+    "<p>{}</p>",
+    '<span class="x-grid-cell">{}</span>',
+    '<div><a href="#">{}</a></div>',
+    "<b>{}</b>",
+]
+
+GLOBALPROTECT_VERSIONS = ["5.2.13", "6.0.7", "6.1.3", "6.2.1"]
+
+
+def _software_versions() -> List[str]:
+    """
+    Versions spread around each patched release: the patched versions
+    themselves, the hotfix just before each, a later maintenance release, and
+    a few releases that are not in the advisory at all.
+    """
+    versions = set()
+    for patched in MinimumPatchedVersions.values():
+        for version in patched:
+            versions.add(repr(version))
+            base = f"{version.major}.{version.feature}"
+            if version.hotfix > 1:
+                versions.add(f"{base}.{version.maintenance}-h{version.hotfix - 1}")
+            elif version.hotfix == 1:
+                versions.add(f"{base}.{version.maintenance}")
+            versions.add(f"{base}.{version.maintenance + 1}")
+    versions.update(["11.2.3", "11.2.4-h1", "8.0.20"])
+    return sorted(versions)
+
+
+SOFTWARE_VERSIONS = _software_versions()
+AFFECTED_MODELS = sorted(
+    model for models in AffectedFamilies.values() for model in models
+)
+UNAFFECTED_MODELS = sorted(
+    model for models in UnaffectedFamilies.values() for model in models
+)
+
+
+def iter_synthetic_groups(
+    count: int, seed: int = 0, multi_device_rate: float = 0.1
+) -> Iterator[List[Dict[str, str]]]:
+    """
+    Yield groups of device records, keyed like the Panorama CSV export, that
+    together describe `count` devices.
+
+    A `multi_device_rate` share of groups hold two to four devices of the same
+    model and software version; the CSV export lists such a group on one row.
+    About 60% of devices are affected models, 90% are connected, 75% hold a
+    valid device certificate and a quarter run a GlobalProtect client.
+    """
+    rng = random.Random(seed)
+    start = 0
+    while start < count:
+        size = rng.randint(2, 4) if rng.random() < multi_device_rate else 1
+        affected = rng.random() < 0.6
+        model = rng.choice(AFFECTED_MODELS if affected else UNAFFECTED_MODELS)
+        software_version = rng.choice(SOFTWARE_VERSIONS)
+        group = []
+        end = min(start + size, count)
+        for index in range(start, end):
+            certificate = rng.random()
+            if certificate < 0.75:
+                status = "Valid"
+                expiry = (
+                    f"{rng.randint(2024, 2030)}/{rng.randint(1, 12):02d}/"
+                    f"{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:"
+                    f"{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}"
+                )
+            elif certificate < 0.8:
+                status = "Expired"
+                expiry = (
+                    f"2023/{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d} 00:00:00"
+                )
+            else:
+                status = "None"
+                expiry = ""
+            group.append(
+                {
+                    "Device Name": f"fw-site{index % 997:03d}-{index:07d}",
+                    "IP Address Serial Number": f"0079{index:011d}",
+                    "IP Address IPv4": (
+                        f"10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}"
+                    ),
+                    "Status Device State": (
+                        "Connected" if rng.random() < 0.9 else "Disconnected"
+                    ),
+                    "Status Device Certificate": status,
+                    "Status Device Certificate Expiry Date": expiry,
+                    "GlobalProtect Client": (
+                        rng.choice(GLOBALPROTECT_VERSIONS)
+                        if rng.random() < 0.25
+                        else "0.0.0"
+                    ),
+                    "Model": model,
+                    "Software Version": software_version,
+                }
+            )
+        start = end
+        yield group
+
+
+def iter_synthetic_devices(
+    count: int, seed: int = 0, multi_device_rate: float = 0.1
+) -> Iterator[Dict[str, str]]:
+    """
+    Yield the `count` device records of `iter_synthetic_groups` one by one.
+    """
+    for group in iter_synthetic_groups(count, seed, multi_device_rate):
+        yield from group
+
+
+def write_panorama_csv(
+    path: str,
+    count: int,
+    seed: int = 0,
+    multi_device_rate: float = 0.1,
+    html_rate: float = 0.2,
+) -> int:
+    """
+    Write a Panorama CSV export describing `count` devices and return the
+    number of CSV rows written (excluding the header).
+
+    Multi-device groups are written on one row, with their per-device cells
+    joined by ";". A `html_rate` share of values are wrapped in leftover
+    HTML markup.
+    """
+    rng = random.Random(seed + 1)
+
+    def pollute(value: str) -> str:
+        if value and rng.random() < html_rate:
+            return rng.choice(HTML_WRAPPERS).format(value)
+        return value
+
+    rows = 0
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file, quoting=csv.QUOTE_ALL)
+        writer.writerow(CSV_HEADER)
+        for group in iter_synthetic_groups(count, seed, multi_device_rate):
+            writer.writerow(
+                [
+                    ";".join(pollute(device[column]) for device in group)
+                    for column in MULTI_VALUE_COLUMNS
+                ]
+                + [pollute(group[0]["Model"]), pollute(group[0]["Software Version"])]
+            )
+            rows += 1
+    return rows
+
+
+def write_show_devices_xml(
+    path: str, count: int, seed: int = 0, multi_device_rate: float = 0.1
+):
+    """
+    Write a `show devices all` API response describing `count` devices.
+
+    Each entry also carries the nested HA and vsys entries real responses
+    have, so parsers are exercised on more than a flat list.
+    """
+    with open(path, "w", encoding="utf-8") as file:
+        file.write('<response status="success"><result><devices>\n')
+        for device in iter_synthetic_devices(count, seed, multi_device_rate):
+            connected = "yes" if device["Status Device State"] == "Connected" else "no"
+            serial = device["IP Address Serial Number"]
+            file.write(
+                f'<entry name="{serial}">'
+                f"<serial>{serial}</serial>"
+                f"<connected>{connected}</connected>"
+                f"<hostname>{escape(device['Device Name'])}</hostname>"
+                f"<ip-address>{device['IP Address IPv4']}</ip-address>"
+                f"<model>{device['Model']}</model>"
+                f"<sw-version>{device['Software Version']}</sw-version>"
+                "<global-protect-client-package-version>"
+                f"{device['GlobalProtect Client']}"
+                "</global-protect-client-package-version>"
+                f"<device-cert-present>{device['Status Device Certificate']}"
+                "</device-cert-present>"
+                "<device-cert-expiry-date>"
+                f"{device['Status Device Certificate Expiry Date']}"
+                "</device-cert-expiry-date>"
+                "<ha><state>active</state><peer><serial>0</serial></peer></ha>"
+                '<vsys><entry name="vsys1"><display-name>vsys1</display-name>'
+                "</entry></vsys>"
+                "</entry>\n"
+            )
+        file.write("</devices></result></response>\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--devices", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--csv", help="Write a Panorama CSV export to this path")
+    parser.add_argument("--xml", help="Write a `show devices all` response here")
+    args = parser.parse_args()
+    if args.csv:
+        write_panorama_csv(args.csv, args.devices, args.seed)
+    if args.xml:
+        write_show_devices_xml(args.xml, args.devices, args.seed)
@@ -1,6 +1,8 @@
 # device_certificate_report/components/__init__.py
 
 from .data_collection import (
+    iter_csv_devices,
+    iter_csv_records,
     process_csv_file,
     collect_data_from_panorama,
     collect_data_from_firewall,
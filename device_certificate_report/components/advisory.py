@@ -0,0 +1,177 @@
+# device_certificate_report/components/advisory.py
+
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from device_certificate_report.components.version import (
+    Version,
+    parse_version_cached,
+)
+from device_certificate_report.config.panos_versions import MinimumPatchedVersions
+
+# Feature releases that have a separate list of fixes for GlobalProtect
+GLOBALPROTECT_RELEASES = ("10.2", "11.0", "11.1")
+
+AdvisoryResult = Tuple[bool, str]
+
+
+class _InvalidVersion(NamedTuple):
+    # Cached in place of an exception, whose traceback would grow with every
+    # re-raise; `lookup` raises a new ValueError with this message
+    message: str
+
+
+class AdvisoryIndex:
+    """
+    Compiled form of the minimum patched versions table.
+
+    Each feature release keeps its fixed versions as sorted packed-integer keys,
+    so finding the minimum required version is a single bisect. Results are
+    memoized per (version string, GlobalProtect) pair, and hit/miss counts are
+    kept for diagnostics.
+    """
+
+    def __init__(
+        self,
+        minimum_patched_versions: Dict[str, List[Version]],
+        maxsize: int = 4096,
+    ):
+        self._keys: Dict[str, List[int]] = {}
+        self._labels: Dict[str, List[str]] = {}
+        for feature_release, versions in minimum_patched_versions.items():
+            ordered = sorted(versions, key=lambda version: version.key)
+            self._keys[feature_release] = [version.key for version in ordered]
+            self._labels[feature_release] = [repr(version) for version in ordered]
+
+        self._results: Dict[
+            Tuple[str, bool], Union[AdvisoryResult, _InvalidVersion]
+        ] = {}
+        self._maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+    def _resolve(
+        self, device_version: str, is_global_protect: bool
+    ) -> Union[AdvisoryResult, _InvalidVersion]:
+        try:
+            current_version = parse_version_cached(device_version)
+        except ValueError as e:
+            return _InvalidVersion(f"Error parsing version '{device_version}': {e}")
+
+        # Check if the version is 11.2 or later
+        if current_version.major > 11 or (
+            current_version.major == 11 and current_version.feature >= 2
+        ):
+            return False, ""  # Versions 11.2 and later are not affected
+
+        # Construct the feature release string
+        feature_release = f"{current_version.major}.{current_version.feature}"
+        if is_global_protect and feature_release in GLOBALPROTECT_RELEASES:
+            feature_release += "-gp"
+
+        keys = self._keys.get(feature_release)
+        if not keys:
+            # Handle versions earlier than 8.1
+            if current_version.major < 8 or (
+                current_version.major == 8 and current_version.feature < 1
+            ):
+                return (
+                    True,
+                    "8.1.0",
+                )  # Versions earlier than 8.1 are considered affected
+            # Unknown feature release
+            return False, ""
+
+        # First fixed version strictly newer than the running one
+        position = bisect_right(keys, current_version.key)
+        if position < len(keys):
+            return True, self._labels[feature_release][position]
+        return False, ""
+
+    def _cached(
+        self, device_version: str, is_global_protect: bool
+    ) -> Union[AdvisoryResult, _InvalidVersion]:
+        cache_key = (device_version, is_global_protect)
+        result = self._results.get(cache_key)
+        if result is not None:
+            self.hits += 1
+            return result
+        self.misses += 1
+        result = self._resolve(device_version, is_global_protect)
+        if len(self._results) >= self._maxsize:
+            self._results.clear()
+        self._results[cache_key] = result
+        return result
+
+    def lookup(
+        self, device_version: str, is_global_protect: bool = False
+    ) -> AdvisoryResult:
+        """
+        Check if a software version is affected.
+        Returns a tuple (is_affected: bool, min_required_version: str) and raises
+        ValueError for version strings that cannot be parsed.
+        """
+        result = self._cached(device_version, is_global_protect)
+        if isinstance(result, _InvalidVersion):
+            raise ValueError(result.message)
+        return result
+
+    def classify_versions(
+        self, versions: Iterable[str], is_global_protect: bool = False
+    ) -> List[Optional[AdvisoryResult]]:
+        """
+        Classify many versions at once, resolving each distinct version only once.
+        Returns one result per input, in order; versions that are empty or cannot
+        be parsed map to None.
+        """
+        resolved: Dict[str, Optional[AdvisoryResult]] = {}
+        results = []
+        for device_version in versions:
+            if device_version not in resolved:
+                result = (
+                    self._cached(device_version, is_global_protect)
+                    if device_version
+                    else None
+                )
+                resolved[device_version] = (
+                    None if isinstance(result, _InvalidVersion) else result
+                )
+            results.append(resolved[device_version])
+        return results
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return hit/miss counters for the result cache and the version parser.
+        """
+        parser = parse_version_cached.cache_info()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._results),
+            "parse_hits": parser.hits,
+            "parse_misses": parser.misses,
+        }
+
+    def clear(self):
+        self._results.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+@lru_cache(maxsize=None)
+def get_advisory_index() -> AdvisoryIndex:
+    """
+    Return the shared AdvisoryIndex built from MinimumPatchedVersions.
+    """
+    return AdvisoryIndex(MinimumPatchedVersions)
+
+
+def classify_versions(
+    versions: Iterable[str], is_global_protect: bool = False
+) -> List[Optional[AdvisoryResult]]:
+    """
+    Classify many versions against the shared advisory index.
+    See `AdvisoryIndex.classify_versions`.
+    """
+    return get_advisory_index().classify_versions(versions, is_global_protect)
@@ -0,0 +1,545 @@
+# device_certificate_report/components/async_xapi.py
+
+"""
+An asyncio client for the PAN-OS XML API.
+
+pan-os-python sends each request from a blocking call, so collecting from many
+hosts at once takes one thread per request in flight. This module sends the
+same requests from a single event loop over a small pool of keep-alive
+connections per host. TLS sessions are resumed when a host's pool opens
+another connection. Only the standard library is used.
+
+    from device_certificate_report.components.async_xapi import (
+        collect_firewall,
+        run_concurrently_async,
+    )
+
+    results, failures = run_concurrently_async(
+        hostnames, collect_firewall, username, password, max_workers=500
+    )
+"""
+
+import asyncio
+import logging
+import ssl
+import xml.etree.ElementTree as ET
+
+from collections import deque
+from io import BytesIO
+from typing import (
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+from urllib.parse import urlencode
+
+from device_certificate_report.config.defaults import (
+    DEFAULT_MAX_CONNECTIONS_PER_HOST,
+    DEFAULT_MAX_WORKERS,
+    RETRY_BACKOFF,
+)
+from device_certificate_report.components.data_collection import (
+    FIREWALL_COMMANDS,
+    firewall_device_info,
+)
+from device_certificate_report.components.xml_stream import (
+    SHOW_DEVICES_ALL,
+    iter_panorama_records,
+)
+from device_certificate_report.models.device import CollectionFailure, DeviceInfo
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+USER_AGENT = "device-certificate-report"
+
+# Largest response header block accepted, in bytes
+MAX_HEADER_SIZE = 64 * 1024
+
+
+class _ResumingContext(ssl.SSLContext):
+    """
+    An SSL context that resumes the last TLS session it was given.
+
+    asyncio has no way to pass a session to a new connection, but it creates
+    every TLS connection through `wrap_bio`, which takes one.
+    """
+
+    session: Optional[ssl.SSLSession] = None
+
+    def wrap_bio(
+        self, incoming, outgoing, server_side=False, server_hostname=None, session=None
+    ):
+        return super().wrap_bio(
+            incoming,
+            outgoing,
+            server_side=server_side,
+            server_hostname=server_hostname,
+            session=session or self.session,
+        )
+
+
+def _unverified_context() -> _ResumingContext:
+    # Match pan-os-python, which does not verify certificates by default
+    context = _ResumingContext(ssl.PROTOCOL_TLS_CLIENT)
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+class _Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        # Whether a response has been read on this connection before; a
+        # connection that was reused may have been closed by the server
+        self.reused = False
+
+    def close(self):
+        self.writer.close()
+
+
+class _StaleConnection(ConnectionError):
+    """
+    A kept-alive connection was closed by the server before it answered.
+    """
+
+
+class AsyncXapi:
+    """
+    An XML API client for one PAN-OS host, with a pool of keep-alive
+    connections.
+
+    Parameters
+    ----------
+    hostname : str
+        Hostname or IP address of the Panorama appliance or firewall.
+    username, password : str, optional
+        Credentials used to retrieve an API key when none is given.
+    api_key : str, optional
+        An API key for the host.
+    port : int, optional
+        The API port; 443, or 80 without TLS.
+    timeout : float, optional
+        Seconds allowed for each request, including waiting for a connection.
+    max_connections : int, optional
+        Connections open to the host at the same time; further requests wait
+        for one to be free.
+    ssl_context : Union[ssl.SSLContext, bool], optional
+        The SSL context to connect with, or False for plain HTTP. By default
+        certificates are not verified, as with pan-os-python.
+    """
+
+    def __init__(
+        self,
+        hostname: str,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        api_key: Optional[str] = None,
+        port: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS_PER_HOST,
+        ssl_context: Union[ssl.SSLContext, bool, None] = None,
+    ):
+        self.hostname = hostname
+        self.username = username
+        self.password = password
+        self.api_key = api_key
+        if ssl_context is None or ssl_context is True:
+            ssl_context = _unverified_context()
+        self.ssl_context = ssl_context or None
+        self.port = port or (443 if self.ssl_context else 80)
+        self.timeout = timeout
+        self._slots = asyncio.Semaphore(max_connections)
+        self._idle: Deque[_Connection] = deque()
+        self._key_lock = asyncio.Lock()
+        # Connections opened and requests sent, for logging and tests
+        self.connections_opened = 0
+        self.requests_sent = 0
+
+    async def __aenter__(self) -> "AsyncXapi":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """
+        Close the idle connections.
+        """
+        while self._idle:
+            connection = self._idle.pop()
+            connection.close()
+            try:
+                await connection.writer.wait_closed()
+            except (ConnectionError, ssl.SSLError):
+                pass
+
+    async def _connect(self) -> _Connection:
+        reader, writer = await asyncio.open_connection(
+            self.hostname,
+            self.port,
+            ssl=self.ssl_context,
+            limit=MAX_HEADER_SIZE,
+        )
+        self.connections_opened += 1
+        return _Connection(reader, writer)
+
+    def _remember_session(self, connection: _Connection):
+        if isinstance(self.ssl_context, _ResumingContext):
+            ssl_object = connection.writer.get_extra_info("ssl_object")
+            # TLS 1.3 tickets arrive after the handshake, so the session is
+            # taken once a response has been read
+            if ssl_object is not None and ssl_object.session is not None:
+                self.ssl_context.session = ssl_object.session
+
+    async def _exchange(self, connection: _Connection, body: bytes) -> bytes:
+        """
+        Send one request on `connection` and return the response body. The
+        connection is put back in the pool if it can be kept alive.
+        """
+        writer = connection.writer
+        reader = connection.reader
+        writer.write(
+            (
+                "POST /api/ HTTP/1.1\r\n"
+                f"Host: {self.hostname}\r\n"
+                f"User-Agent: {USER_AGENT}\r\n"
+                "Content-Type: application/x-www-form-urlencoded\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: keep-alive\r\n"
+                "\r\n"
+            ).encode("latin-1")
+            + body
+        )
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise _StaleConnection("Connection closed by the host")
+        version, _, rest = status_line.decode("latin-1").partition(" ")
+        status = int(rest.split(" ", 1)[0])
+
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = headers.get("connection", "").lower() != "close" and (
+            version != "HTTP/1.0"
+            or headers.get("connection", "").lower() == "keep-alive"
+        )
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";", 1)[0], 16)
+                if size == 0:
+                    # Skip any trailers
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            content = b"".join(chunks)
+        elif "content-length" in headers:
+            content = await reader.readexactly(int(headers["content-length"]))
+        else:
+            content = await reader.read()
+            keep_alive = False
+
+        self._remember_session(connection)
+        if keep_alive:
+            connection.reused = True
+            self._idle.append(connection)
+        else:
+            connection.close()
+
+        # The XML API answers errors such as a bad key with an XML body and
+        # a 4xx status; the body says more than the status does
+        if status != 200 and not content.lstrip().startswith(b"<"):
+            raise ConnectionError(f"HTTP {status} from {self.hostname}")
+        return content
+
+    async def _send(self, query: Dict[str, str]) -> bytes:
+        body = urlencode(query).encode()
+        async with self._slots:
+            while True:
+                connection = self._idle.pop() if self._idle else await self._connect()
+                try:
+                    self.requests_sent += 1
+                    return await self._exchange(connection, body)
+                except (_StaleConnection, ConnectionResetError, BrokenPipeError) as e:
+                    connection.close()
+                    if not connection.reused:
+                        raise
+                    # The host closed a kept-alive connection while it was
+                    # idle; the request was not answered, so send it again
+                    logger.debug(f"Reconnecting to {self.hostname}: {e}")
+                except BaseException:
+                    # Cancelled or timed out mid-response; the connection
+                    # cannot be reused
+                    connection.close()
+                    raise
+
+    async def request(self, query: Dict[str, str]) -> bytes:
+        """
+        Send an XML API request and return the unparsed response body.
+        """
+        if self.timeout:
+            return await asyncio.wait_for(self._send(query), self.timeout)
+        return await self._send(query)
+
+    async def keygen(self) -> str:
+        """
+        Return the API key, retrieving it with the credentials on first use.
+        """
+        async with self._key_lock:
+            if self.api_key is None:
+                response = _parse_response(
+                    await self.request(
+                        {
+                            "type": "keygen",
+                            "user": self.username or "",
+                            "password": self.password or "",
+                        }
+                    ),
+                    self.hostname,
+                )
+                key = response.findtext(".//key")
+                if not key:
+                    raise ValueError(f"No API key in the response of {self.hostname}")
+                self.api_key = key
+        return self.api_key
+
+    async def op_raw(
+        self, cmd: str, extra_qs: Optional[Dict[str, str]] = None
+    ) -> bytes:
+        """
+        Send an XML operational command and return the unparsed response body.
+
+        Parameters
+        ----------
+        cmd : str
+            The XML operational command.
+        extra_qs : Dict[str, str], optional
+            Extra query parameters, such as `target`.
+
+        Returns
+        -------
+        bytes
+            The response body.
+        """
+        query = {"type": "op", "cmd": cmd, "key": await self.keygen()}
+        if extra_qs:
+            query.update(extra_qs)
+        return await self.request(query)
+
+    async def op(
+        self, cmd: str, extra_qs: Optional[Dict[str, str]] = None
+    ) -> ET.Element:
+        """
+        Send an XML operational command and return the parsed response, as
+        pan-os-python's `op(cmd, cmd_xml=False)` does.
+
+        Raises
+        ------
+        ValueError
+            If the response has an error status.
+        """
+        return _parse_response(await self.op_raw(cmd, extra_qs), self.hostname)
+
+
+def _parse_response(content: bytes, hostname: str) -> ET.Element:
+    response = ET.fromstring(content)
+    if response.get("status") == "error":
+        message = " ".join(text.strip() for text in response.itertext() if text.strip())
+        raise ValueError(f"{hostname} returned an error response: {message}")
+    return response
+
+
+async def collect_panorama(client: AsyncXapi) -> List[DeviceInfo]:
+    """
+    Collect the devices connected to a Panorama appliance; the asyncio
+    counterpart of `collect_data_from_panorama`.
+
+    Raises
+    ------
+    ValueError
+        If Panorama returns an error response.
+    """
+    content = await client.op_raw(SHOW_DEVICES_ALL)
+    devices = [
+        DeviceInfo(**record) for record in iter_panorama_records(BytesIO(content))
+    ]
+    logger.info(
+        f"Found {len(devices)} devices connected to Panorama {client.hostname}."
+    )
+    return devices
+
+
+async def collect_firewall(client: AsyncXapi) -> List[DeviceInfo]:
+    """
+    Collect a firewall's system info and device certificate status; the
+    asyncio counterpart of `collect_data_from_firewall`. Both commands are
+    sent at the same time.
+
+    Returns
+    -------
+    List[DeviceInfo]
+        The firewall, as a list so both collectors return the same type.
+    """
+    system_info, device_certificate = await asyncio.gather(
+        *(client.op(cmd) for cmd in FIREWALL_COMMANDS.values()),
+        return_exceptions=True,
+    )
+    if isinstance(system_info, BaseException):
+        logger.error(
+            f"Failed to retrieve system info from Firewall {client.hostname}: "
+            f"{system_info}"
+        )
+        raise system_info
+    if isinstance(device_certificate, BaseException):
+        logger.error(
+            "Failed to retrieve device certificate status from Firewall "
+            f"{client.hostname}: {device_certificate}"
+        )
+        device_certificate = None  # Proceed without certificate info
+    return [firewall_device_info(system_info, device_certificate)]
+
+
+async def _collect_hosts(
+    hostnames: List[str],
+    collect: Callable[[AsyncXapi], Awaitable[T]],
+    username: Optional[str],
+    password: Optional[str],
+    max_workers: int,
+    timeout: Optional[float],
+    retries: int,
+    backoff: float,
+    client_options: Dict,
+) -> List[Union[T, BaseException]]:
+    hosts = asyncio.Semaphore(max(1, max_workers))
+
+    async def collect_host(hostname: str) -> T:
+        async with hosts:
+            async with AsyncXapi(
+                hostname, username, password, timeout=timeout, **client_options
+            ) as client:
+                for attempt in range(retries + 1):
+                    try:
+                        return await collect(client)
+                    except Exception as e:
+                        if attempt == retries:
+                            raise e
+                        delay = backoff * (2**attempt)
+                        logger.warning(
+                            f"Attempt {attempt + 1} for {hostname} failed ({e}); "
+                            f"retrying in {delay:.1f}s."
+                        )
+                        await asyncio.sleep(delay)
+
+    return await asyncio.gather(
+        *(collect_host(hostname) for hostname in hostnames), return_exceptions=True
+    )
+
+
+def run_concurrently_async(
+    hostnames: List[str],
+    collect: Callable[[AsyncXapi], Awaitable[T]],
+    username: Optional[str] = None,
+    password: Optional[str] = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    timeout: Optional[float] = None,
+    retries: int = 0,
+    backoff: float = RETRY_BACKOFF,
+    **client_options,
+) -> Tuple[List[Tuple[str, T]], List[CollectionFailure]]:
+    """
+    Run `collect` once per host on an event loop in this thread; the asyncio
+    counterpart of `fleet.run_concurrently`.
+
+    Parameters
+    ----------
+    hostnames : List[str]
+        The hosts to collect from.
+    collect : Callable[[AsyncXapi], Awaitable[T]]
+        Coroutine function called with a client for each host, such as
+        `collect_panorama` or `collect_firewall`. Any exception it raises is
+        recorded as a failure for that host.
+    username, password : str, optional
+        Credentials for every host.
+    max_workers : int, optional
+        Maximum number of hosts handled at the same time. Each costs a few
+        sockets rather than a thread, so this can be in the thousands.
+    timeout : float, optional
+        Seconds allowed for each request.
+    retries : int, optional
+        Number of extra attempts for a host whose collection raised.
+    backoff : float, optional
+        Delay in seconds before the first retry; doubled for each further retry.
+    **client_options
+        Other `AsyncXapi` arguments, such as `port` or `ssl_context`.
+
+    Returns
+    -------
+    Tuple[List[Tuple[str, T]], List[CollectionFailure]]
+        The (hostname, result) pairs of the hosts that succeeded and the
+        failures of the ones that did not, both in inventory order.
+    """
+    results = []
+    failures = []
+    if not hostnames:
+        return results, failures
+    outcomes = asyncio.run(
+        _collect_hosts(
+            hostnames,
+            collect,
+            username,
+            password,
+            max_workers,
+            timeout,
+            retries,
+            backoff,
+            client_options,
+        )
+    )
+    for hostname, outcome in zip(hostnames, outcomes):
+        if isinstance(outcome, BaseException):
+            error = str(outcome) or type(outcome).__name__
+            logger.error(f"Failed to collect data from {hostname}: {error}")
+            failures.append(CollectionFailure(hostname=hostname, error=error))
+        else:
+            results.append((hostname, outcome))
+    return results, failures
+
+
+def collect_host(
+    hostname: str,
+    collect: Callable[[AsyncXapi], Awaitable[T]],
+    username: Optional[str] = None,
+    password: Optional[str] = None,
+    timeout: Optional[float] = None,
+    **client_options,
+) -> T:
+    """
+    Run `collect` for a single host and return its result, raising what it
+    raises.
+    """
+
+    async def run() -> T:
+        async with AsyncXapi(
+            hostname, username, password, timeout=timeout, **client_options
+        ) as client:
+            return await collect(client)
+
+    return asyncio.run(run())
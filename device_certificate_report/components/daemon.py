@@ -0,0 +1,404 @@
+# device_certificate_report/components/daemon.py
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from panos.firewall import Firewall
+from panos.panorama import Panorama
+
+from device_certificate_report.components.data_collection import (
+    collect_data_from_firewall,
+    collect_data_from_panorama,
+)
+from device_certificate_report.components.expiry import certificate_sections
+from device_certificate_report.components.fleet import run_concurrently
+from device_certificate_report.config.defaults import (
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_RETRIES,
+)
+from device_certificate_report.config.output_formats import OutputFormat
+from device_certificate_report.models.device import CollectionFailure, DeviceInfo
+from device_certificate_report.utilities.incremental import (
+    TRACKED_FIELDS,
+    classify_incrementally,
+)
+from device_certificate_report.utilities.renderers import render_report
+from device_certificate_report.utilities.snapshot import ClassifiedState
+
+logger = logging.getLogger(__name__)
+
+PANORAMA = "panorama"
+FIREWALL = "firewall"
+
+CONTENT_TYPES = {
+    OutputFormat.PDF: "application/pdf",
+    OutputFormat.CSV: "text/csv; charset=utf-8",
+    OutputFormat.JSONL: "application/x-ndjson; charset=utf-8",
+    OutputFormat.HTML: "text/html; charset=utf-8",
+    OutputFormat.PARQUET: "application/vnd.apache.parquet",
+}
+
+Poll = Callable[[], Tuple[List[DeviceInfo], List[CollectionFailure]]]
+
+
+class FleetPoller:
+    """
+    Collects from a fixed set of Panorama appliances and firewalls, keeping
+    one authenticated device object per host between polls.
+
+    A host's API key is retrieved when its session is first opened and reused
+    by every later poll, including the per-command connections
+    `collect_data_from_firewall` opens. A host whose collection fails has its
+    session dropped, so the next attempt authenticates again (for instance
+    after its key was revoked or the password changed).
+    """
+
+    def __init__(
+        self,
+        panoramas: List[str],
+        firewalls: List[str],
+        username: str,
+        password: str,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        timeout: Optional[int] = None,
+        retries: int = DEFAULT_RETRIES,
+        streaming: bool = False,
+    ):
+        self.panoramas = panoramas
+        self.firewalls = firewalls
+        self.username = username
+        self.password = password
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.retries = retries
+        self.streaming = streaming
+        self._sessions: Dict[Tuple[str, str], Union[Panorama, Firewall]] = {}
+        self._lock = threading.Lock()
+
+    def session(self, kind: str, hostname: str) -> Union[Panorama, Firewall]:
+        """
+        Return the warm session for a host, authenticating on first use.
+        """
+        with self._lock:
+            device = self._sessions.get((kind, hostname))
+        if device is not None:
+            return device
+
+        device_class = Panorama if kind == PANORAMA else Firewall
+        kwargs = {"timeout": self.timeout} if self.timeout else {}
+        device = device_class(hostname, self.username, self.password, **kwargs)
+        # Retrieved here rather than on the first command, so copies made for
+        # concurrent commands share the key instead of each requesting one
+        device.api_key
+        with self._lock:
+            return self._sessions.setdefault((kind, hostname), device)
+
+    def forget(self, kind: str, hostname: str):
+        with self._lock:
+            self._sessions.pop((kind, hostname), None)
+
+    def _collect_panorama(self, hostname: str) -> List[DeviceInfo]:
+        try:
+            return collect_data_from_panorama(
+                self.session(PANORAMA, hostname),
+                raise_on_error=True,
+                streaming=self.streaming,
+            )
+        except Exception:
+            self.forget(PANORAMA, hostname)
+            raise
+
+    def _collect_firewall(self, hostname: str) -> List[DeviceInfo]:
+        try:
+            return [collect_data_from_firewall(self.session(FIREWALL, hostname))]
+        except Exception:
+            self.forget(FIREWALL, hostname)
+            raise
+
+    def poll(self) -> Tuple[List[DeviceInfo], List[CollectionFailure]]:
+        """
+        Collect from every host once.
+
+        Returns
+        -------
+        Tuple[List[DeviceInfo], List[CollectionFailure]]
+            The devices, each with `source` set to the host it came from
+            (Panorama appliances first, in the order given), and the hosts
+            that could not be collected from.
+        """
+        devices = []
+        failures = []
+        for hostnames, collect in (
+            (self.panoramas, self._collect_panorama),
+            (self.firewalls, self._collect_firewall),
+        ):
+            results, kind_failures = run_concurrently(
+                hostnames, collect, self.max_workers, retries=self.retries
+            )
+            for hostname, collected in results:
+                for device in collected:
+                    device.source = hostname
+                    devices.append(device)
+            failures.extend(kind_failures)
+        return devices, failures
+
+
+class ServedReport(NamedTuple):
+    report: bytes
+    summary: bytes
+    etag: str
+
+
+def _fleet_fingerprint(
+    devices: List[DeviceInfo], failures: List[CollectionFailure]
+) -> int:
+    # The UTC date is included so the expiry histogram is redrawn daily even
+    # when nothing else changes
+    return hash(
+        (
+            time.strftime("%Y-%m-%d", time.gmtime()),
+            tuple(
+                (device.serial_number, device.source)
+                + tuple(getattr(device, field) for field in TRACKED_FIELDS)
+                for device in devices
+            ),
+            tuple((failure.hostname, failure.error) for failure in failures),
+        )
+    )
+
+
+class ReportService:
+    """
+    Keeps the classified fleet in memory and the latest report ready to serve.
+
+    Each `refresh` polls the fleet once. Only devices that are new, or whose
+    model or software version changed since the previous poll, are classified
+    again, and the report is only rendered again when the fleet or the
+    collection failures changed (or the day did, for the expiry histogram).
+    The report and the JSON summary are kept as bytes, so serving them costs
+    no more than a write to the socket.
+    """
+
+    def __init__(
+        self,
+        poll: Poll,
+        output_format: OutputFormat = OutputFormat.HTML,
+        expiring_within: Optional[int] = None,
+        include_source: bool = True,
+    ):
+        self.poll = poll
+        self.output_format = OutputFormat(output_format)
+        self.expiring_within = expiring_within
+        self.include_source = include_source
+        self.served: Optional[ServedReport] = None
+        self.polls = 0
+        self.renders = 0
+        self.last_error: Optional[str] = None
+        self._classified: Optional[ClassifiedState] = None
+        self._fingerprint: Optional[int] = None
+        self._summary: Dict[str, Any] = {}
+        # Serializes refreshes; readers only ever load `served`
+        self._lock = threading.Lock()
+
+    def refresh(self) -> bool:
+        """
+        Poll the fleet once and update the served report.
+
+        Returns
+        -------
+        bool
+            True if the report was rendered again, False if it was unchanged.
+        """
+        with self._lock:
+            self.polls += 1
+            started = time.time()
+            devices, failures = self.poll()
+            polled_seconds = time.time() - started
+
+            result, update = classify_incrementally(devices, self._classified)
+            self._classified = update.apply(self._classified)
+
+            fingerprint = _fleet_fingerprint(devices, failures)
+            rendered = fingerprint != self._fingerprint or self.served is None
+            if rendered:
+                report = self._render(result, failures, started)
+                self._fingerprint = fingerprint
+            else:
+                report = self.served.report
+
+            self._summary.update(
+                checked_at=started,
+                poll_seconds=round(polled_seconds, 3),
+                polls=self.polls,
+                renders=self.renders,
+                reclassified=result.reclassified,
+                last_error=None,
+            )
+            self.last_error = None
+            self._publish(report)
+            logger.info(
+                f"Polled {len(devices)} devices ({len(failures)} hosts failed) in "
+                f"{polled_seconds:.1f}s; re-classified {result.reclassified}; "
+                f"report {'regenerated' if rendered else 'unchanged'}."
+            )
+            return rendered
+
+    def _render(
+        self, result, failures: List[CollectionFailure], started: float
+    ) -> bytes:
+        classification = result.classification
+        sections: Dict[str, Any] = classification.sections()
+        sections.update(
+            certificate_sections(classification.certificates, self.expiring_within)
+        )
+
+        # Renderers write to a path; the report is read back and kept in memory
+        handle, path = tempfile.mkstemp(suffix=self.output_format.extension)
+        os.close(handle)
+        try:
+            render_report(
+                self.output_format,
+                output_file=path,
+                collection_failures=failures,
+                include_source=self.include_source,
+                changes=result.diff,
+                **sections,
+            )
+            with open(path, "rb") as file:
+                report = file.read()
+        finally:
+            os.unlink(path)
+        self.renders += 1
+
+        diff = result.diff
+        self._summary = {
+            "generated_at": started,
+            "format": self.output_format.value,
+            "counters": dict(classification.counters),
+            "sections": {
+                bucket: len(devices)
+                for bucket, devices in classification.buckets.items()
+            },
+            "expiry_histogram": dict(sections["expiry_histogram"]),
+            "collection_failures": [failure.model_dump() for failure in failures],
+            "changes": (
+                None
+                if diff is None
+                else {
+                    "added": len(diff.added),
+                    "changed": len(diff.changed),
+                    "removed": len(diff.removed),
+                    "unchanged": diff.unchanged,
+                }
+            ),
+        }
+        return report
+
+    def _publish(self, report: bytes):
+        summary = json.dumps(self._summary, indent=2).encode()
+        etag = f'"{self._fingerprint or 0:x}-{self.renders}"'
+        # A single reference swap, so concurrent readers see either the old
+        # or the new report and summary, never a mix
+        self.served = ServedReport(report, summary, etag)
+
+    def record_error(self, error: Exception):
+        """
+        Note a failed poll in the summary; the last good report stays served.
+        """
+        with self._lock:
+            self.last_error = str(error)
+            if self.served is not None:
+                self._summary["last_error"] = self.last_error
+                self._publish(self.served.report)
+
+    def run(self, interval: float, stop: threading.Event):
+        """
+        Refresh every `interval` seconds until `stop` is set. A poll that
+        raises is logged and retried at the next interval.
+        """
+        while not stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Polling failed: {e}")
+                self.record_error(e)
+            stop.wait(interval)
+
+
+class _ReportRequestHandler(BaseHTTPRequestHandler):
+    service: ReportService
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/healthz":
+            self._send(200, b"ok\n", "text/plain; charset=utf-8")
+            return
+        if path not in ("/", "/report", "/summary.json"):
+            self._send(404, b"not found\n", "text/plain; charset=utf-8")
+            return
+
+        served = self.service.served
+        if served is None:
+            self._send(
+                503,
+                b"the first poll has not finished yet\n",
+                "text/plain; charset=utf-8",
+                {"Retry-After": "5"},
+            )
+            return
+
+        if path == "/summary.json":
+            self._send(200, served.summary, "application/json")
+        elif self.headers.get("If-None-Match") == served.etag:
+            self._send(304, b"", None, {"ETag": served.etag})
+        else:
+            self._send(
+                200,
+                served.report,
+                CONTENT_TYPES[self.service.output_format],
+                {"ETag": served.etag},
+            )
+
+    def _send(
+        self,
+        status: int,
+        body: bytes,
+        content_type: Optional[str],
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        self.send_response(status)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+def make_server(service: ReportService, bind: str, port: int) -> ThreadingHTTPServer:
+    """
+    Create an HTTP server answering from `service`'s latest report.
+
+    Routes: `/` and `/report` (the report, honouring If-None-Match),
+    `/summary.json` and `/healthz`. Report routes answer 503 until the first
+    poll has finished. A port of 0 picks a free port.
+    """
+    handler = type(
+        "ReportRequestHandler", (_ReportRequestHandler,), {"service": service}
+    )
+    server = ThreadingHTTPServer((bind, port), handler)
+    server.daemon_threads = True
+    return server
@@ -1,19 +1,225 @@
 # device_certificate_report/components/data_collection.py
 
+import copy
 import csv
 import logging
+import time
 
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple, Union
 
-from panos.panorama import Panorama
-from panos.firewall import Firewall
+from device_certificate_report.models.device import DeviceInfo
+from device_certificate_report.models.device_table import DeviceTable
+from device_certificate_report.components.xml_stream import (
+    SHOW_DEVICES_ALL,
+    iter_panorama_records,
+    open_op_stream,
+    panorama_entry_record,
+)
+from device_certificate_report.utilities.cleaner import iter_cleaned_rows
+from device_certificate_report.utilities.metrics import (
+    CountingReader,
+    stage,
+    timed_iter,
+)
 
 logger = logging.getLogger(__name__)
 
-from device_certificate_report.models.device import DeviceInfo
+# The operational commands sent to each firewall, keyed by name
+FIREWALL_COMMANDS = {
+    "system_info": "<show><system><info/></system></show>",
+    "device_certificate": "<show><device-certificate><status/></device-certificate></show>",
+}
+
+if TYPE_CHECKING:
+    # Only needed for annotations; importing pan-os-python is deferred to the
+    # code that creates the devices, so CSV processing never loads it
+    from panos.base import PanDevice
+    from panos.firewall import Firewall
+    from panos.panorama import Panorama
+
+
+def _iter_csv_rows(csv_file: str) -> Iterator[List[str]]:
+    """
+    Yield the raw rows of an already-cleaned CSV file one at a time.
+    """
+    with open(csv_file, "r", newline="", encoding="utf-8") as file:
+        yield from csv.reader(file)
+
+
+def _explode_row(row: Dict[str, str]) -> Iterator[Dict[str, Optional[str]]]:
+    """
+    Explode a single CSV row into one device record per semicolon-separated device.
+
+    Parameters
+    ----------
+    row : Dict[str, str]
+        A CSV row keyed by column header.
+
+    Yields
+    ------
+    Dict[str, Optional[str]]
+        The device records described by the row, keyed by DeviceInfo field name.
+    """
+    # Fields that might have multiple entries
+    device_names = [name.strip() for name in row.get("Device Name", "").split(";")]
+    serial_numbers = [
+        sn.strip() for sn in row.get("IP Address Serial Number", "").split(";")
+    ]
+    ipv4_addresses = [ip.strip() for ip in row.get("IP Address IPv4", "").split(";")]
+    device_states = [
+        state.strip() for state in row.get("Status Device State", "").split(";")
+    ]
+    device_certificates = [
+        cert.strip() for cert in row.get("Status Device Certificate", "").split(";")
+    ]
+    device_certificate_expiry_dates = [
+        date.strip()
+        for date in row.get("Status Device Certificate Expiry Date", "").split(";")
+    ]
+    globalprotect_clients = [
+        gp.strip() for gp in row.get("GlobalProtect Client", "").split(";")
+    ]
+
+    # Determine the number of devices in this row
+    num_devices = len(device_names)
+
+    # Fields that may have single value
+    model = row.get("Model", "").strip()
+    software_version = row.get("Software Version", "").strip()
+
+    for i in range(num_devices):
+        yield dict(
+            device_name=device_names[i] if i < len(device_names) else None,
+            model=model or None,
+            serial_number=(serial_numbers[i] if i < len(serial_numbers) else None),
+            ipv4_address=ipv4_addresses[i] if i < len(ipv4_addresses) else None,
+            device_state=device_states[i] if i < len(device_states) else None,
+            device_certificate=(
+                device_certificates[i] if i < len(device_certificates) else None
+            ),
+            device_certificate_expiry_date=(
+                device_certificate_expiry_dates[i]
+                if i < len(device_certificate_expiry_dates)
+                else None
+            ),
+            software_version=software_version or None,
+            globalprotect_client=(
+                globalprotect_clients[i]
+                if i < len(globalprotect_clients)
+                and globalprotect_clients[i] != "0.0.0"
+                else None
+            ),
+        )
+
+
+def iter_csv_records(
+    csv_file: str,
+    clean: bool = True,
+    cleaned_csv_file: Optional[str] = None,
+    workers: int = 1,
+) -> Iterator[Dict[str, Optional[str]]]:
+    """
+    Stream device records out of a Panorama CSV export in a single pass.
+
+    Cleaning and semicolon-explode happen row by row, so memory use does not
+    grow with the size of the input file. With more than one worker, the
+    file is parsed in chunks by a process pool instead; see
+    `parallel_csv.iter_csv_chunks`.
 
+    Parameters
+    ----------
+    csv_file : str
+        Path to the CSV file.
+    clean : bool, optional
+        Strip HTML markup from each cell while reading. Disable for files that
+        have already been through `clean_csv`.
+    cleaned_csv_file : str, optional
+        When given, the cleaned rows are also written to this path as they
+        are read.
+    workers : int, optional
+        Number of processes parsing the file; 1 parses it in this process.
+
+    Yields
+    ------
+    Dict[str, Optional[str]]
+        The device records described by the CSV in file order, keyed by
+        DeviceInfo field name.
+    """
+    if workers > 1:
+        from device_certificate_report.components.parallel_csv import (
+            RECORD_FIELDS,
+            iter_csv_chunks,
+        )
+
+        for records in iter_csv_chunks(
+            csv_file, clean, workers, cleaned_csv_file=cleaned_csv_file
+        ):
+            for values in records:
+                yield dict(zip(RECORD_FIELDS, values))
+        return
 
-def process_csv_file(csv_file: str) -> List[DeviceInfo]:
+    rows = iter_cleaned_rows(csv_file) if clean else _iter_csv_rows(csv_file)
+
+    with ExitStack() as stack:
+        writer = None
+        if cleaned_csv_file:
+            outfile = stack.enter_context(
+                open(cleaned_csv_file, "w", newline="", encoding="utf-8")
+            )
+            writer = csv.writer(outfile, quoting=csv.QUOTE_MINIMAL)
+
+        header = next(rows, None)
+        if header is None:
+            return
+        if writer is not None:
+            writer.writerow(header)
+
+        for values in rows:
+            if writer is not None:
+                writer.writerow(values)
+            # Skip blank lines, matching csv.DictReader
+            if not values:
+                continue
+            yield from _explode_row(dict(zip(header, values)))
+
+
+def iter_csv_devices(
+    csv_file: str,
+    clean: bool = True,
+    cleaned_csv_file: Optional[str] = None,
+    workers: int = 1,
+) -> Iterator[DeviceInfo]:
+    """
+    Stream devices out of a Panorama CSV export in a single pass.
+
+    Cleaning, semicolon-explode and DeviceInfo construction happen row by row,
+    so memory use does not grow with the size of the input file.
+
+    Parameters
+    ----------
+    csv_file : str
+        Path to the CSV file.
+    clean : bool, optional
+        Strip HTML markup from each cell while reading.
+    cleaned_csv_file : str, optional
+        When given, the cleaned rows are also written to this path.
+    workers : int, optional
+        Number of processes parsing the file; 1 parses it in this process.
+
+    Yields
+    ------
+    DeviceInfo
+        The devices described by the CSV, in file order.
+    """
+    for record in iter_csv_records(csv_file, clean, cleaned_csv_file, workers):
+        yield DeviceInfo(**record)
+
+
+def process_csv_file(
+    csv_file: str, as_table: bool = False, workers: int = 1
+) -> Union[List[DeviceInfo], DeviceTable]:
     """
     Process the cleaned CSV file to extract device information.
 
@@ -21,82 +227,33 @@ def process_csv_file(csv_file: str) -> List[DeviceInfo]:
     ----------
     csv_file : str
         Path to the cleaned CSV file.
+    as_table : bool, optional
+        Build a columnar DeviceTable instead of a list of DeviceInfo objects.
+    workers : int, optional
+        Number of processes parsing the file; 1 parses it in this process.
 
     Returns
     -------
-    List[DeviceInfo]
-        A list of device information extracted from the CSV.
+    Union[List[DeviceInfo], DeviceTable]
+        The device information extracted from the CSV.
     """
-    devices = []
-
-    with open(csv_file, "r", newline="", encoding="utf-8") as file:
-        csv_reader = csv.DictReader(file)
-        for row in csv_reader:
-            # Fields that might have multiple entries
-            device_names = [
-                name.strip() for name in row.get("Device Name", "").split(";")
-            ]
-            serial_numbers = [
-                sn.strip() for sn in row.get("IP Address Serial Number", "").split(";")
-            ]
-            ipv4_addresses = [
-                ip.strip() for ip in row.get("IP Address IPv4", "").split(";")
-            ]
-            device_states = [
-                state.strip() for state in row.get("Status Device State", "").split(";")
-            ]
-            device_certificates = [
-                cert.strip()
-                for cert in row.get("Status Device Certificate", "").split(";")
-            ]
-            device_certificate_expiry_dates = [
-                date.strip()
-                for date in row.get("Status Device Certificate Expiry Date", "").split(
-                    ";"
-                )
-            ]
-            globalprotect_clients = [
-                gp.strip() for gp in row.get("GlobalProtect Client", "").split(";")
-            ]
-
-            # Determine the number of devices in this row
-            num_devices = len(device_names)
-
-            # Fields that may have single value
-            model = row.get("Model", "").strip()
-            software_version = row.get("Software Version", "").strip()
-
-            for i in range(num_devices):
-                device = DeviceInfo(
-                    device_name=device_names[i] if i < len(device_names) else None,
-                    model=model or None,
-                    serial_number=(
-                        serial_numbers[i] if i < len(serial_numbers) else None
-                    ),
-                    ipv4_address=ipv4_addresses[i] if i < len(ipv4_addresses) else None,
-                    device_state=device_states[i] if i < len(device_states) else None,
-                    device_certificate=(
-                        device_certificates[i] if i < len(device_certificates) else None
-                    ),
-                    device_certificate_expiry_date=(
-                        device_certificate_expiry_dates[i]
-                        if i < len(device_certificate_expiry_dates)
-                        else None
-                    ),
-                    software_version=software_version or None,
-                    globalprotect_client=(
-                        globalprotect_clients[i]
-                        if i < len(globalprotect_clients)
-                        and globalprotect_clients[i] != "0.0.0"
-                        else None
-                    ),
-                )
-                devices.append(device)
-
+    with stage("process_csv_file") as s:
+        if as_table:
+            devices = DeviceTable.from_records(
+                iter_csv_records(csv_file, clean=False, workers=workers)
+            )
+        else:
+            devices = list(iter_csv_devices(csv_file, clean=False, workers=workers))
+        s.add(items=len(devices))
     return devices
 
 
-def collect_data_from_panorama(panorama: Panorama) -> List[DeviceInfo]:
+def collect_data_from_panorama(
+    panorama: "Panorama",
+    as_table: bool = False,
+    raise_on_error: bool = False,
+    streaming: bool = False,
+) -> Union[List[DeviceInfo], DeviceTable]:
     """
     Collect data from Panorama and its connected devices.
 
@@ -104,100 +261,200 @@ def collect_data_from_panorama(panorama: Panorama) -> List[DeviceInfo]:
     ----------
     panorama : Panorama
         An authenticated Panorama instance.
+    as_table : bool, optional
+        Build a columnar DeviceTable instead of a list of DeviceInfo objects.
+    raise_on_error : bool, optional
+        Re-raise a failed operational command or an unparsable response
+        instead of returning the devices parsed so far.
+    streaming : bool, optional
+        Parse the response incrementally as it arrives instead of loading the
+        whole document, keeping memory flat for very large deployments.
 
     Returns
     -------
-    List[DeviceInfo]
-        A list of device information collected from connected firewalls.
+    Union[List[DeviceInfo], DeviceTable]
+        The device information collected from connected firewalls.
     """
-    devices = []
+    devices = DeviceTable() if as_table else []
 
     try:
         logger.info("Sending operational command to Panorama to retrieve all devices.")
-        response = panorama.op(
-            "<show><devices><all/></devices></show>",
-            cmd_xml=False,
-        )
+        with stage("panorama_op") as op_stage:
+            if streaming:
+                response = open_op_stream(panorama, SHOW_DEVICES_ALL)
+                if op_stage.active:
+                    # The body is only read while parsing; its size is added
+                    # to this stage once the parse has finished
+                    response = CountingReader(response)
+            else:
+                response = panorama.op(SHOW_DEVICES_ALL, cmd_xml=False)
+                if op_stage.active:
+                    op_stage.add(bytes=len((panorama.xapi.xml_document or "").encode()))
     except Exception as e:
         logger.error(f"Failed to retrieve devices from Panorama: {e}")
+        if raise_on_error:
+            raise e
         return devices
 
     # Parse the XML response
     try:
         logger.info("Parsing XML response from Panorama.")
-        devices_entries = response.findall(".//devices/entry")
-        logger.info(f"Found {len(devices_entries)} devices connected to Panorama.")
-
-        for entry in devices_entries:
-            # Extract required fields
-            device_name = entry.findtext("hostname")
-            model = entry.findtext("model")
-            serial_number = entry.findtext("serial")
-            ipv4_address = entry.findtext("ip-address")
-            device_state = entry.findtext("connected")
-            device_certificate = entry.findtext("device-cert-present")
-            device_certificate_expiry_date = entry.findtext("device-cert-expiry-date")
-            software_version = entry.findtext("sw-version")
-            globalprotect_client = entry.findtext(
-                "global-protect-client-package-version"
-            )
-
-            device = DeviceInfo(
-                device_name=device_name or "",
-                model=model or "",
-                serial_number=serial_number or "",
-                ipv4_address=ipv4_address or "",
-                device_state="Connected" if device_state == "yes" else "Disconnected",
-                device_certificate=device_certificate or "",
-                device_certificate_expiry_date=device_certificate_expiry_date or "",
-                software_version=software_version or "",
-                globalprotect_client=(
-                    globalprotect_client if globalprotect_client != "0.0.0" else ""
-                ),
-            )
-            devices.append(device)
+        if streaming:
+            with response, stage("build_models") as build:
+                # Parsing is timed per record, so the build stage's self time
+                # is the model construction alone
+                records = timed_iter("parse_xml", iter_panorama_records(response))
+                for record in records:
+                    if as_table:
+                        devices.append(**record)
+                    else:
+                        devices.append(DeviceInfo(**record))
+                build.add(items=len(devices))
+            if op_stage.active:
+                op_stage.add(bytes=response.bytes)
+        else:
+            with stage("parse_xml") as parse:
+                records = [
+                    panorama_entry_record(entry)
+                    for entry in response.findall(".//devices/entry")
+                ]
+                parse.add(items=len(records))
+            with stage("build_models") as build:
+                for record in records:
+                    if as_table:
+                        devices.append(**record)
+                    else:
+                        devices.append(DeviceInfo(**record))
+                build.add(items=len(devices))
+        logger.info(f"Found {len(devices)} devices connected to Panorama.")
     except Exception as e:
         logger.error(f"Error parsing devices from Panorama response: {e}")
+        if raise_on_error:
+            raise e
 
     return devices
 
 
-def collect_data_from_firewall(firewall: Firewall) -> DeviceInfo:
+def _isolated_device(device: "PanDevice") -> "PanDevice":
+    """
+    Return a shallow copy of `device` with its own XML API connection.
+
+    pan-os-python keeps the last response on the device's xapi object, so
+    concurrent `op` calls must not share it. The copy reuses the device's
+    hostname, credentials and API key; the key is retrieved first if needed,
+    so copies do not each request their own. Callers making copies from
+    several threads should retrieve it before starting them.
+    """
+    device.api_key
+    clone = copy.copy(device)
+    clone._xapi_private = None
+    return clone
+
+
+def run_ops_concurrently(
+    device: "PanDevice", commands: Dict[str, str]
+) -> Dict[str, Tuple[Any, Optional[Exception], float]]:
+    """
+    Send several operational commands to one device at the same time.
+
+    Parameters
+    ----------
+    device : PanDevice
+        An authenticated Firewall or Panorama instance.
+    commands : Dict[str, str]
+        XML operational commands keyed by a name for each.
+
+    Returns
+    -------
+    Dict[str, Tuple[Any, Optional[Exception], float]]
+        For each command name, the response (or None), the exception raised
+        (or None) and the time taken in seconds.
+    """
+
+    def run(cmd: str) -> Tuple[Any, Optional[Exception], float]:
+        start = time.perf_counter()
+        try:
+            response = _isolated_device(device).op(cmd=cmd, cmd_xml=False)
+            return response, None, time.perf_counter() - start
+        except Exception as e:
+            return None, e, time.perf_counter() - start
+
+    # Retrieved once here, as the copies made by each thread share it
+    device.api_key
+    with ThreadPoolExecutor(
+        max_workers=len(commands), thread_name_prefix="op"
+    ) as executor:
+        futures = {name: executor.submit(run, cmd) for name, cmd in commands.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
+def collect_data_from_firewall(
+    firewall: "Firewall", timings: Optional[Dict[str, float]] = None
+) -> DeviceInfo:
     """
     Collect data from a single firewall device.
 
+    The system info and device certificate status commands are sent
+    concurrently, so the firewall's latency is only paid once.
+
     Parameters
     ----------
     firewall : Firewall
         An authenticated Firewall instance.
+    timings : Dict[str, float], optional
+        When given, filled with the time in seconds taken by each operational
+        command, keyed by "system_info" and "device_certificate".
 
     Returns
     -------
     DeviceInfo
         Device information collected from the firewall.
     """
-    try:
-        logger.info("Sending operational command to Firewall to retrieve system info.")
-        system_info_response = firewall.op(
-            cmd="<show><system><info/></system></show>",
-            cmd_xml=False,
+    logger.info(
+        "Sending operational commands to Firewall to retrieve system info "
+        "and device certificate status."
+    )
+    with stage("firewall_ops") as s:
+        results = run_ops_concurrently(
+            firewall,
+            FIREWALL_COMMANDS,
         )
-    except Exception as e:
+        s.add(items=len(results))
+    for name, (_, _, elapsed) in results.items():
+        logger.info(f"Firewall {name} command took {elapsed:.3f}s.")
+        if timings is not None:
+            timings[name] = elapsed
+
+    system_info_response, e, _ = results["system_info"]
+    if e is not None:
         logger.error(f"Failed to retrieve system info from Firewall: {e}")
         raise e
 
-    try:
-        logger.info(
-            "Sending operational command to Firewall to retrieve device certificate status."
-        )
-        device_cert_response = firewall.op(
-            cmd="<show><device-certificate><status/></device-certificate></show>",
-            cmd_xml=False,
-        )
-    except Exception as e:
+    device_cert_response, e, _ = results["device_certificate"]
+    if e is not None:
         logger.error(f"Failed to retrieve device certificate status from Firewall: {e}")
         device_cert_response = None  # Proceed without certificate info
 
+    return firewall_device_info(system_info_response, device_cert_response)
+
+
+def firewall_device_info(system_info_response, device_cert_response) -> DeviceInfo:
+    """
+    Build a firewall's DeviceInfo from its operational command responses.
+
+    Parameters
+    ----------
+    system_info_response : Element
+        The `show system info` response.
+    device_cert_response : Element, optional
+        The `show device-certificate status` response, or None if it could
+        not be retrieved.
+
+    Returns
+    -------
+    DeviceInfo
+        Device information collected from the firewall.
+    """
     # Parse the system info response
     try:
         logger.info("Parsing XML response from Firewall system info.")
@@ -0,0 +1,209 @@
+# device_certificate_report/components/enrichment.py
+
+"""
+Fill in device certificate details that `show devices all` left out.
+
+Panorama's device list often has no certificate expiry date for some
+firewalls, which would leave them out of the report's certificate section.
+This asks each of those firewalls for its certificate status through
+Panorama, which forwards a command to the firewall named by the `target`
+serial number.
+"""
+
+import asyncio
+import logging
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Iterable, List, NamedTuple, Optional, Tuple
+
+from device_certificate_report.config.defaults import DEFAULT_ENRICH_WORKERS
+from device_certificate_report.components.data_collection import (
+    FIREWALL_COMMANDS,
+    _isolated_device,
+)
+from device_certificate_report.models.device import DeviceInfo
+from device_certificate_report.utilities.metrics import stage
+
+if TYPE_CHECKING:
+    from panos.panorama import Panorama
+
+    from device_certificate_report.components.async_xapi import AsyncXapi
+
+logger = logging.getLogger(__name__)
+
+SHOW_DEVICE_CERTIFICATE = FIREWALL_COMMANDS["device_certificate"]
+
+
+class EnrichmentResult(NamedTuple):
+    # Devices queried, devices given an expiry date, and failed queries
+    queried: int
+    enriched: int
+    failed: int
+
+
+def needs_certificate(device: Any) -> bool:
+    """
+    Whether `device` has no certificate expiry date and Panorama can reach it.
+    Works with DeviceInfo and DeviceTable rows alike.
+    """
+    return (
+        not device.device_certificate_expiry_date
+        and bool(device.serial_number)
+        and device.device_state == "Connected"
+    )
+
+
+def certificate_status(response) -> Optional[Tuple[Optional[str], Optional[str]]]:
+    """
+    Return the validity and expiry date from a `show device-certificate
+    status` response, or None if it has no certificate details.
+    """
+    cert_info = response.find(".//device-certificate")
+    if cert_info is None:
+        return None
+    return cert_info.findtext("validity"), cert_info.findtext("not_valid_after")
+
+
+def _merge(device: Any, status: Optional[Tuple[Optional[str], Optional[str]]]) -> bool:
+    if status is None:
+        return False
+    validity, expiry_date = status
+    if validity:
+        device.device_certificate = validity
+    if expiry_date:
+        device.device_certificate_expiry_date = expiry_date
+    return bool(expiry_date)
+
+
+def _summarize(
+    panorama: str, candidates: List[Any], enriched: int, failed: int
+) -> EnrichmentResult:
+    result = EnrichmentResult(len(candidates), enriched, failed)
+    logger.info(
+        f"Retrieved certificate expiry dates of {enriched} of {len(candidates)} "
+        f"devices through Panorama {panorama} ({failed} queries failed)."
+    )
+    return result
+
+
+def enrich_certificates(
+    panorama: "Panorama",
+    devices: Iterable[Any],
+    max_workers: int = DEFAULT_ENRICH_WORKERS,
+) -> EnrichmentResult:
+    """
+    Query the certificate status of every connected device without an expiry
+    date through Panorama and fill it in, in place.
+
+    The queries run on a bounded thread pool, each on its own XML API
+    connection. A device whose query fails is left as it was.
+
+    Parameters
+    ----------
+    panorama : Panorama
+        An authenticated Panorama instance managing the devices.
+    devices : Iterable[Any]
+        DeviceInfo objects or DeviceTable rows collected from `panorama`.
+    max_workers : int, optional
+        Maximum number of queries in flight at the same time.
+
+    Returns
+    -------
+    EnrichmentResult
+        How many devices were queried, were given an expiry date, and could
+        not be queried.
+    """
+    candidates = [device for device in devices if needs_certificate(device)]
+    if not candidates:
+        return EnrichmentResult(0, 0, 0)
+
+    def query(device: Any):
+        try:
+            return certificate_status(
+                _isolated_device(panorama).op(
+                    cmd=SHOW_DEVICE_CERTIFICATE,
+                    cmd_xml=False,
+                    extra_qs={"target": device.serial_number},
+                )
+            )
+        except Exception as e:
+            logger.warning(
+                f"Failed to retrieve the device certificate status of "
+                f"{device.serial_number}: {e}"
+            )
+            return e
+
+    try:
+        # Retrieved once here, as the copies made for each query share it
+        panorama.api_key
+    except Exception as e:
+        logger.warning(f"Failed to retrieve an API key from {panorama.hostname}: {e}")
+        return _summarize(panorama.hostname, candidates, 0, len(candidates))
+
+    enriched = failed = 0
+    with stage("enrich_certificates") as s, ThreadPoolExecutor(
+        max_workers=max(1, min(max_workers, len(candidates))),
+        thread_name_prefix="enrich",
+    ) as executor:
+        for device, status in zip(candidates, executor.map(query, candidates)):
+            if isinstance(status, Exception):
+                failed += 1
+            elif _merge(device, status):
+                enriched += 1
+        s.add(items=len(candidates))
+    return _summarize(panorama.hostname, candidates, enriched, failed)
+
+
+async def enrich_certificates_async(
+    client: "AsyncXapi",
+    devices: Iterable[Any],
+    max_workers: int = DEFAULT_ENRICH_WORKERS,
+) -> EnrichmentResult:
+    """
+    The asyncio counterpart of `enrich_certificates`, querying through an
+    `AsyncXapi` client for Panorama. Queries share the client's keep-alive
+    connections.
+    """
+    candidates = [device for device in devices if needs_certificate(device)]
+    if not candidates:
+        return EnrichmentResult(0, 0, 0)
+    in_flight = asyncio.Semaphore(max(1, max_workers))
+
+    async def query(device: Any):
+        async with in_flight:
+            try:
+                return certificate_status(
+                    await client.op(
+                        SHOW_DEVICE_CERTIFICATE,
+                        extra_qs={"target": device.serial_number},
+                    )
+                )
+            except Exception as e:
+                logger.warning(
+                    f"Failed to retrieve the device certificate status of "
+                    f"{device.serial_number}: {e}"
+                )
+                return e
+
+    enriched = failed = 0
+    statuses = await asyncio.gather(*(query(device) for device in candidates))
+    for device, status in zip(candidates, statuses):
+        if isinstance(status, Exception):
+            failed += 1
+        elif _merge(device, status):
+            enriched += 1
+    return _summarize(client.hostname, candidates, enriched, failed)
+
+
+async def collect_enriched_panorama(
+    client: "AsyncXapi", max_workers: int = DEFAULT_ENRICH_WORKERS
+) -> List[DeviceInfo]:
+    """
+    Collect the devices connected to a Panorama appliance with
+    `async_xapi.collect_panorama`, then fill in missing certificate details.
+    """
+    from device_certificate_report.components.async_xapi import collect_panorama
+
+    devices = await collect_panorama(client)
+    await enrich_certificates_async(client, devices, max_workers)
+    return devices
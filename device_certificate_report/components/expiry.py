@@ -0,0 +1,209 @@
+# device_certificate_report/components/expiry.py
+
+import re
+import time
+
+from bisect import bisect_right
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from device_certificate_report.models.device import DeviceInfo
+
+SECONDS_PER_DAY = 86400
+
+# Upper edges, in days from now, of the expiry histogram's buckets
+EXPIRY_HISTOGRAM_DAYS = (30, 60, 90, 180, 365)
+
+# "2025/03/21 12:30:00 PDT" as shown by Panorama and in its CSV export, and
+# ISO dates such as "2025-03-21" or "2025-03-21T12:30:00"
+_NUMERIC_DATE = re.compile(
+    r"(\d{4})[/-](\d{1,2})[/-](\d{1,2})(?:[ T](\d{1,2}):(\d{2})(?::(\d{2}))?)?"
+)
+
+# "Mar 21 12:30:00 2025 GMT" as in a firewall's not_valid_after
+_TEXT_DATE_FORMATS = ("%b %d %H:%M:%S %Y", "%b %d %Y")
+
+
+@lru_cache(maxsize=None)
+def _midnight(year: str, month: str, day: str) -> Optional[float]:
+    # Device certificates expire at distinct times, so whole dates are rarely
+    # repeated, but a fleet's expiry dates fall on comparatively few days
+    try:
+        moment = datetime(int(year), int(month), int(day), tzinfo=timezone.utc)
+    except ValueError:
+        return None
+    return moment.timestamp()
+
+
+def parse_expiry_date(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a certificate expiry date as reported by PAN-OS into a POSIX timestamp.
+
+    Time zone names are ignored and times are read as UTC, which is well within
+    the day-level precision expiry checks need. The timestamp of each calendar
+    day is cached, so a date only costs slicing and integer arithmetic once
+    its day has been seen.
+
+    Parameters
+    ----------
+    value : str, optional
+        The expiry date, e.g. "2025/03/21 12:30:00 PDT", "2025-03-21" or
+        "Mar 21 12:30:00 2025 GMT".
+
+    Returns
+    -------
+    float, optional
+        The timestamp, or None for an empty or unrecognized date.
+    """
+    if not value:
+        return None
+    value = value.strip()
+
+    # Fast path for the fixed-width "YYYY/MM/DD HH:MM:SS" most devices report
+    if (
+        len(value) >= 19
+        and value[4] == value[7] == "/"
+        and value[13] == value[16] == ":"
+        and value[11:13].isdigit()
+        and value[14:16].isdigit()
+        and value[17:19].isdigit()
+    ):
+        midnight = _midnight(value[:4], value[5:7], value[8:10])
+        hour, minute, second = int(value[11:13]), int(value[14:16]), int(value[17:19])
+        if midnight is None or hour > 23 or minute > 59 or second > 59:
+            return None
+        return midnight + hour * 3600 + minute * 60 + second
+
+    match = _NUMERIC_DATE.match(value)
+    if match:
+        year, month, day, hour, minute, second = match.groups(default="0")
+        midnight = _midnight(year, month, day)
+        hour, minute, second = int(hour), int(minute), int(second)
+        if midnight is None or hour > 23 or minute > 59 or second > 59:
+            return None
+        return midnight + hour * 3600 + minute * 60 + second
+
+    # Drop a trailing time zone name such as "GMT"
+    parts = value.split()
+    if parts and parts[-1].isalpha():
+        value = " ".join(parts[:-1])
+    for date_format in _TEXT_DATE_FORMATS:
+        try:
+            moment = datetime.strptime(value, date_format)
+        except ValueError:
+            continue
+        return moment.replace(tzinfo=timezone.utc).timestamp()
+    return None
+
+
+class ExpiryIndex:
+    """
+    Devices sorted by certificate expiry, earliest first.
+
+    Every expiry date is parsed once when the index is built; queries then
+    bisect the sorted timestamps instead of going through the devices.
+    Devices whose expiry date is missing or cannot be parsed are kept apart
+    in `undated`, in their original order.
+    """
+
+    def __init__(self, devices: Iterable[DeviceInfo]):
+        dated: List[Tuple[float, int, DeviceInfo]] = []
+        self.undated: List[DeviceInfo] = []
+        for position, device in enumerate(devices):
+            timestamp = parse_expiry_date(device.device_certificate_expiry_date)
+            if timestamp is None:
+                self.undated.append(device)
+            else:
+                # The position keeps devices expiring together in input order
+                dated.append((timestamp, position, device))
+        # Positions are unique, so devices themselves are never compared
+        dated.sort()
+        self.timestamps: List[float] = [timestamp for timestamp, _, _ in dated]
+        self.devices: List[DeviceInfo] = [device for _, _, device in dated]
+
+    def __len__(self) -> int:
+        return len(self.devices) + len(self.undated)
+
+    def ordered(self) -> List[DeviceInfo]:
+        """
+        All devices, earliest expiry first, followed by the undated devices.
+        """
+        return self.devices + self.undated
+
+    def expiring_before(self, timestamp: float) -> List[DeviceInfo]:
+        """
+        Devices whose certificate expires at or before `timestamp`, earliest first.
+        """
+        return self.devices[: bisect_right(self.timestamps, timestamp)]
+
+    def expiring_within(
+        self, days: float, now: Optional[float] = None
+    ) -> List[DeviceInfo]:
+        """
+        Devices whose certificate expires within `days` days of `now` (the
+        current time by default), earliest first. Certificates that have
+        already expired are included.
+        """
+        if now is None:
+            now = time.time()
+        return self.expiring_before(now + days * SECONDS_PER_DAY)
+
+    def histogram(
+        self,
+        now: Optional[float] = None,
+        days: Tuple[int, ...] = EXPIRY_HISTOGRAM_DAYS,
+    ) -> List[Tuple[str, int]]:
+        """
+        Count the devices by time left until their certificate expires.
+
+        Parameters
+        ----------
+        now : float, optional
+            The timestamp counted from; the current time by default.
+        days : Tuple[int, ...], optional
+            Increasing upper edges of the buckets, in days.
+
+        Returns
+        -------
+        List[Tuple[str, int]]
+            A label and a device count per bucket: expired, one bucket per
+            edge, after the last edge, and undated.
+        """
+        if now is None:
+            now = time.time()
+        timestamps = self.timestamps
+
+        counted = bisect_right(timestamps, now)
+        histogram = [("Expired", counted)]
+        previous = 0
+        for edge in days:
+            upto = bisect_right(timestamps, now + edge * SECONDS_PER_DAY)
+            label = (
+                f"Within {edge} days" if not previous else f"{previous + 1}-{edge} days"
+            )
+            histogram.append((label, upto - counted))
+            counted = upto
+            previous = edge
+        histogram.append((f"After {previous} days", len(timestamps) - counted))
+        histogram.append(("Unknown expiry date", len(self.undated)))
+        return histogram
+
+
+def certificate_sections(
+    devices: Iterable[DeviceInfo], expiring_within: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Return the certificate section and expiry histogram of a report, as
+    keyword arguments of `render_report`.
+
+    Certificates are listed earliest expiry first, and only those expiring
+    within `expiring_within` days when it is given. The histogram covers
+    every device.
+    """
+    index = ExpiryIndex(devices)
+    if expiring_within is None:
+        listed = index.ordered()
+    else:
+        listed = index.expiring_within(expiring_within)
+    return dict(devices_with_certificates=listed, expiry_histogram=index.histogram())
@@ -0,0 +1,384 @@
+# device_certificate_report/components/fleet.py
+
+import logging
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, List, Optional, Tuple, TypeVar
+
+from panos.firewall import Firewall
+from panos.panorama import Panorama
+
+from device_certificate_report.config.defaults import (
+    DEFAULT_ENRICH_WORKERS,
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_RETRIES,
+    RETRY_BACKOFF,
+)
+from device_certificate_report.components.data_collection import (
+    collect_data_from_firewall,
+    collect_data_from_panorama,
+)
+from device_certificate_report.components.enrichment import enrich_certificates
+from device_certificate_report.models.device import CollectionFailure, DeviceInfo
+from device_certificate_report.utilities.snapshot import SnapshotStore
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def read_inventory(inventory_file: str) -> List[str]:
+    """
+    Read a list of hostnames from an inventory file.
+
+    The file holds one hostname or IP address per line. Blank lines and lines
+    starting with `#` are ignored, as are duplicate entries.
+
+    Parameters
+    ----------
+    inventory_file : str
+        Path to the inventory file.
+
+    Returns
+    -------
+    List[str]
+        The hostnames in file order.
+    """
+    hostnames = []
+    seen = set()
+    with open(inventory_file, "r", encoding="utf-8") as file:
+        for line in file:
+            hostname = line.split("#", 1)[0].strip()
+            if hostname and hostname not in seen:
+                seen.add(hostname)
+                hostnames.append(hostname)
+    return hostnames
+
+
+def _with_retries(
+    collect: Callable[[str], T], retries: int, backoff: float
+) -> Callable[[str], T]:
+    """
+    Wrap `collect` so that a failing host is retried with exponential backoff.
+    """
+
+    def collect_with_retries(hostname: str) -> T:
+        for attempt in range(retries + 1):
+            try:
+                return collect(hostname)
+            except Exception as e:
+                if attempt == retries:
+                    raise e
+                delay = backoff * (2**attempt)
+                logger.warning(
+                    f"Attempt {attempt + 1} for {hostname} failed ({e}); "
+                    f"retrying in {delay:.1f}s."
+                )
+                time.sleep(delay)
+
+    return collect_with_retries
+
+
+def run_concurrently(
+    hostnames: List[str],
+    collect: Callable[[str], T],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    retries: int = 0,
+    backoff: float = RETRY_BACKOFF,
+) -> Tuple[List[Tuple[str, T]], List[CollectionFailure]]:
+    """
+    Run `collect` once per host on a bounded thread pool.
+
+    Parameters
+    ----------
+    hostnames : List[str]
+        The hosts to collect from.
+    collect : Callable[[str], T]
+        Function called with each hostname. Any exception it raises is recorded
+        as a failure for that host.
+    max_workers : int, optional
+        Maximum number of hosts handled at the same time.
+    retries : int, optional
+        Number of extra attempts for a host whose collection raised.
+    backoff : float, optional
+        Delay in seconds before the first retry; doubled for each further retry.
+
+    Returns
+    -------
+    Tuple[List[Tuple[str, T]], List[CollectionFailure]]
+        The (hostname, result) pairs of the hosts that succeeded and the
+        failures of the ones that did not, both in inventory order.
+    """
+    results = []
+    failures = []
+    if not hostnames:
+        return results, failures
+    if retries > 0:
+        collect = _with_retries(collect, retries, backoff)
+
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(max_workers, len(hostnames))),
+        thread_name_prefix="collect",
+    ) as executor:
+        futures = [executor.submit(collect, hostname) for hostname in hostnames]
+        for hostname, future in zip(hostnames, futures):
+            try:
+                results.append((hostname, future.result()))
+            except Exception as e:
+                logger.error(f"Failed to collect data from {hostname}: {e}")
+                failures.append(CollectionFailure(hostname=hostname, error=str(e)))
+    return results, failures
+
+
+def panorama_snapshot_source(hostname: str, enrich: bool = False) -> str:
+    """
+    Return the snapshot source name of a Panorama's devices. Collections
+    with enriched certificate details are stored apart from plain ones, so
+    a plain snapshot is never served to an enriching run.
+    """
+    return f"panorama+enriched/{hostname}" if enrich else f"panorama/{hostname}"
+
+
+def _collect_with_async_transport(
+    kind: str,
+    hostnames: List[str],
+    collect: Callable,
+    username: str,
+    password: str,
+    max_workers: int,
+    timeout: Optional[int],
+    retries: int,
+    snapshots: Optional[SnapshotStore],
+    **client_options,
+) -> Tuple[List[Tuple[str, List[DeviceInfo]]], List[CollectionFailure]]:
+    """
+    Collect from every host without a fresh snapshot on one event loop, then
+    return each host's devices in inventory order, as `run_concurrently` does.
+    """
+    from device_certificate_report.components.async_xapi import (
+        run_concurrently_async,
+    )
+
+    cached = {}
+    if snapshots is not None:
+        for hostname in hostnames:
+            devices = snapshots.fresh(f"{kind}/{hostname}")
+            if devices is not None:
+                cached[hostname] = devices
+
+    results, failures = run_concurrently_async(
+        [hostname for hostname in hostnames if hostname not in cached],
+        collect,
+        username,
+        password,
+        max_workers=max_workers,
+        timeout=timeout,
+        retries=retries,
+        **client_options,
+    )
+    collected = dict(results)
+    if snapshots is not None:
+        for hostname, devices in results:
+            # Don't let an empty collection overwrite a good snapshot
+            if devices:
+                snapshots.save(f"{kind}/{hostname}", devices)
+
+    ordered = []
+    for hostname in hostnames:
+        if hostname in cached:
+            ordered.append((hostname, cached[hostname]))
+        elif hostname in collected:
+            ordered.append((hostname, collected[hostname]))
+    return ordered, failures
+
+
+def collect_data_from_panoramas(
+    hostnames: List[str],
+    username: str,
+    password: str,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    timeout: Optional[int] = None,
+    streaming: bool = False,
+    snapshots: Optional[SnapshotStore] = None,
+    async_transport: bool = False,
+    enrich: bool = False,
+    enrich_workers: int = DEFAULT_ENRICH_WORKERS,
+) -> Tuple[List[DeviceInfo], List[CollectionFailure]]:
+    """
+    Collect data from several Panorama appliances concurrently.
+
+    Parameters
+    ----------
+    hostnames : List[str]
+        Hostnames or IP addresses of the Panorama appliances.
+    username : str
+        Username for authentication with the Panorama appliances.
+    password : str
+        Password for authentication with the Panorama appliances.
+    max_workers : int, optional
+        Maximum number of Panorama appliances queried at the same time.
+    timeout : int, optional
+        Per-request connect/read timeout in seconds for each Panorama.
+    streaming : bool, optional
+        Parse each response incrementally; see `collect_data_from_panorama`.
+    snapshots : SnapshotStore, optional
+        Serve fresh snapshots from, and store new collections in, this store.
+    async_transport : bool, optional
+        Query the appliances from one thread over keep-alive connections;
+        see `async_xapi`. `streaming` does not apply.
+    enrich : bool, optional
+        Query connected devices without a certificate expiry date for their
+        certificate status through their Panorama; see `enrichment`.
+    enrich_workers : int, optional
+        Certificate status queries in flight at the same time per Panorama.
+
+    Returns
+    -------
+    Tuple[List[DeviceInfo], List[CollectionFailure]]
+        The merged devices, each with `source` set to the Panorama it came
+        from, and the Panorama appliances that could not be queried.
+    """
+    if async_transport:
+        from device_certificate_report.components.async_xapi import (
+            collect_panorama,
+        )
+        from device_certificate_report.components.enrichment import (
+            collect_enriched_panorama,
+        )
+
+        client_options = {}
+        collect_async = collect_panorama
+        if enrich:
+            collect_async = partial(
+                collect_enriched_panorama, max_workers=enrich_workers
+            )
+            client_options["max_connections"] = enrich_workers
+        results, failures = _collect_with_async_transport(
+            "panorama+enriched" if enrich else "panorama",
+            hostnames,
+            collect_async,
+            username,
+            password,
+            max_workers,
+            timeout,
+            0,
+            snapshots,
+            **client_options,
+        )
+        return _merge_panorama_devices(results), failures
+
+    def collect(hostname: str) -> List[DeviceInfo]:
+        def collect_from_host() -> List[DeviceInfo]:
+            kwargs = {"timeout": timeout} if timeout else {}
+            panorama = Panorama(hostname, username, password, **kwargs)
+            devices = collect_data_from_panorama(
+                panorama, raise_on_error=True, streaming=streaming
+            )
+            if enrich:
+                enrich_certificates(panorama, devices, enrich_workers)
+            return devices
+
+        if snapshots is None:
+            return collect_from_host()
+        return snapshots.get_or_collect(
+            panorama_snapshot_source(hostname, enrich), collect_from_host
+        )
+
+    results, failures = run_concurrently(hostnames, collect, max_workers)
+    return _merge_panorama_devices(results), failures
+
+
+def _merge_panorama_devices(
+    results: List[Tuple[str, List[DeviceInfo]]],
+) -> List[DeviceInfo]:
+    devices = []
+    for hostname, collected in results:
+        logger.info(f"Collected {len(collected)} devices from Panorama {hostname}.")
+        for device in collected:
+            device.source = hostname
+            devices.append(device)
+    return devices
+
+
+def collect_data_from_firewalls(
+    hostnames: List[str],
+    username: str,
+    password: str,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    timeout: Optional[int] = None,
+    retries: int = DEFAULT_RETRIES,
+    snapshots: Optional[SnapshotStore] = None,
+    async_transport: bool = False,
+) -> Tuple[List[DeviceInfo], List[CollectionFailure]]:
+    """
+    Collect data directly from several firewalls concurrently.
+
+    Parameters
+    ----------
+    hostnames : List[str]
+        Hostnames or IP addresses of the firewalls.
+    username : str
+        Username for authentication with the firewalls.
+    password : str
+        Password for authentication with the firewalls.
+    max_workers : int, optional
+        Maximum number of firewalls queried at the same time.
+    timeout : int, optional
+        Per-request connect/read timeout in seconds for each firewall.
+    retries : int, optional
+        Number of extra attempts for a firewall that could not be collected from.
+    snapshots : SnapshotStore, optional
+        Serve fresh snapshots from, and store new collections in, this store.
+    async_transport : bool, optional
+        Query the firewalls from one thread over keep-alive connections; see
+        `async_xapi`.
+
+    Returns
+    -------
+    Tuple[List[DeviceInfo], List[CollectionFailure]]
+        The collected devices, each with `source` set to the hostname used to
+        reach it, and the firewalls that could not be collected from.
+    """
+    if async_transport:
+        from device_certificate_report.components.async_xapi import (
+            collect_firewall,
+        )
+
+        results, failures = _collect_with_async_transport(
+            "firewall",
+            hostnames,
+            collect_firewall,
+            username,
+            password,
+            max_workers,
+            timeout,
+            retries,
+            snapshots,
+        )
+        devices = []
+        for hostname, (device,) in results:
+            device.source = hostname
+            devices.append(device)
+        return devices, failures
+
+    def collect(hostname: str) -> DeviceInfo:
+        def collect_from_host() -> List[DeviceInfo]:
+            kwargs = {"timeout": timeout} if timeout else {}
+            firewall = Firewall(hostname, username, password, **kwargs)
+            return [collect_data_from_firewall(firewall)]
+
+        if snapshots is None:
+            return collect_from_host()[0]
+        return snapshots.get_or_collect(f"firewall/{hostname}", collect_from_host)[0]
+
+    results, failures = run_concurrently(
+        hostnames, collect, max_workers, retries=retries
+    )
+
+    devices = []
+    for hostname, device in results:
+        device.source = hostname
+        devices.append(device)
+    return devices, failures
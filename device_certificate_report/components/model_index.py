@@ -0,0 +1,144 @@
+# device_certificate_report/components/model_index.py
+
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from device_certificate_report.config.hardware_families import (
+    AffectedFamilies,
+    UnaffectedFamilies,
+)
+
+AFFECTED_MODEL = "affected"
+UNAFFECTED_MODEL = "unaffected"
+
+
+class ModelResolution(NamedTuple):
+    # The listed model the raw string resolved to, e.g. "PA-VM" for "pa-vm-50"
+    model: Optional[str]
+    family: Optional[str]
+    # AFFECTED_MODEL, UNAFFECTED_MODEL, or None for a model that is not listed
+    status: Optional[str]
+
+
+UNKNOWN_MODEL = ModelResolution(None, None, None)
+
+
+def _normalize(model: str) -> Tuple[str, List[bool]]:
+    """
+    Uppercase `model` and keep only its letters and digits. Also returns, for
+    each position of the normalized string, whether the raw string had a word
+    boundary there: a separator, or a change between letters and digits.
+    """
+    characters = []
+    boundaries = [False]
+    previous = None
+    separated = False
+    for character in model.upper():
+        if not character.isalnum():
+            separated = True
+            continue
+        if characters:
+            boundaries[-1] = separated or previous.isdigit() != character.isdigit()
+        characters.append(character)
+        boundaries.append(False)
+        previous = character
+        separated = False
+    # The end of the string always counts as a boundary
+    boundaries[-1] = True
+    return "".join(characters), boundaries
+
+
+class ModelIndex:
+    """
+    Resolves model strings as reported by devices to the listed models.
+
+    The listed models are kept in a trie of their normalized names (uppercase
+    letters and digits only), so spelling variants such as "pa-220", " PA 220 "
+    or "PA-VM (lite)" resolve exactly. A string that extends a listed model at
+    a word boundary, such as "PA-3260-ZTP", "PA-850 R2" or "PA-VM-50",
+    resolves to the longest such model; "PA-4101" does not resolve to PA-410.
+    Results are memoized per distinct raw string, and hit/miss counts are kept
+    for diagnostics.
+    """
+
+    def __init__(
+        self,
+        affected_families: Dict[str, List[str]],
+        unaffected_families: Dict[str, List[str]],
+        maxsize: int = 4096,
+    ):
+        # Each trie node maps a character to its child; the None key holds
+        # the resolution of a listed model ending at the node
+        self._root: Dict[Optional[str], object] = {}
+        for status, families in (
+            (UNAFFECTED_MODEL, unaffected_families),
+            (AFFECTED_MODEL, affected_families),
+        ):
+            for family, models in families.items():
+                for model in models:
+                    node = self._root
+                    for character in _normalize(model)[0]:
+                        node = node.setdefault(character, {})
+                    node[None] = ModelResolution(model, family, status)
+
+        self._results: Dict[Optional[str], ModelResolution] = {}
+        self._maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+    def _resolve(self, model: Optional[str]) -> ModelResolution:
+        if not model:
+            return UNKNOWN_MODEL
+        normalized, boundaries = _normalize(model)
+        resolution = UNKNOWN_MODEL
+        node = self._root
+        for position, character in enumerate(normalized, 1):
+            node = node.get(character)
+            if node is None:
+                break
+            if None in node and boundaries[position]:
+                resolution = node[None]
+        return resolution
+
+    def resolve(self, model: Optional[str]) -> ModelResolution:
+        """
+        Return the listed model, family and status a model string resolves
+        to, or UNKNOWN_MODEL.
+        """
+        result = self._results.get(model)
+        if result is not None:
+            self.hits += 1
+            return result
+        self.misses += 1
+        result = self._resolve(model)
+        if len(self._results) >= self._maxsize:
+            self._results.clear()
+        self._results[model] = result
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return hit/miss counters for the result cache.
+        """
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._results)}
+
+    def clear(self):
+        self._results.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+@lru_cache(maxsize=None)
+def get_model_index() -> ModelIndex:
+    """
+    Return the shared ModelIndex built from the hardware families.
+    """
+    return ModelIndex(AffectedFamilies, UnaffectedFamilies)
+
+
+def resolve_model(model: Optional[str]) -> ModelResolution:
+    """
+    Resolve a model string against the shared model index.
+    See `ModelIndex.resolve`.
+    """
+    return get_model_index().resolve(model)
@@ -0,0 +1,289 @@
+# device_certificate_report/components/parallel_csv.py
+
+import csv
+import io
+import mmap
+import os
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from typing import Any, Callable, Iterator, List, NamedTuple, Optional, Tuple, TypeVar
+
+from device_certificate_report.components.data_collection import _explode_row
+from device_certificate_report.utilities.cleaner import clean_html_tags
+
+# Bytes of CSV handed to a worker at a time
+DEFAULT_CHUNK_SIZE = 16 * 2**20
+
+# Chunks queued per worker ahead of the one being merged, which bounds the
+# memory held by parsed but not yet consumed records
+CHUNKS_IN_FLIGHT_PER_WORKER = 2
+
+# The keys of the records `_explode_row` yields, in order. Workers send bare
+# value tuples back, which pickle several times faster than dicts or models
+RECORD_FIELDS = (
+    "device_name",
+    "model",
+    "serial_number",
+    "ipv4_address",
+    "device_state",
+    "device_certificate",
+    "device_certificate_expiry_date",
+    "software_version",
+    "globalprotect_client",
+)
+
+_BOM = b"\xef\xbb\xbf"
+
+T = TypeVar("T")
+
+
+class ChunkResult(NamedTuple):
+    records: List[Tuple[Optional[str], ...]]
+    # The chunk's cleaned rows as CSV text, when requested
+    cleaned: Optional[str]
+
+
+def _record_end(buffer: mmap.mmap, position: int, in_quotes: bool = False) -> int:
+    """
+    Return the offset just past the first line break at or after `position`
+    that is outside a quoted field, or the buffer's size.
+
+    `in_quotes` tells whether `position` lies inside a quoted field. Doubled
+    quotes inside a field come in pairs, so counting the quotes on each line
+    is enough to follow the quoting.
+    """
+    size = len(buffer)
+    while position < size:
+        newline = buffer.find(b"\n", position)
+        if newline == -1:
+            return size
+        if buffer[position:newline].count(b'"') % 2:
+            in_quotes = not in_quotes
+        position = newline + 1
+        if not in_quotes:
+            return position
+    return size
+
+
+def split_records(
+    buffer: mmap.mmap, start: int, chunk_size: int
+) -> Iterator[Tuple[int, int]]:
+    """
+    Split `buffer[start:]` into (start, end) ranges of about `chunk_size`
+    bytes that each hold whole CSV records.
+
+    Tracking whether a cut falls inside a quoted field takes one count of the
+    quotes in each chunk, so the whole file is scanned once, at memory speed,
+    without being parsed.
+    """
+    size = len(buffer)
+    while start < size:
+        target = min(start + chunk_size, size)
+        in_quotes = bool(buffer[start:target].count(b'"') % 2)
+        end = _record_end(buffer, target, in_quotes) if target < size else size
+        yield start, end
+        start = end
+
+
+def _read_header(buffer: mmap.mmap, clean: bool) -> Tuple[List[str], int]:
+    """
+    Return the header row of a mapped CSV file and the offset just past it.
+    """
+    start = len(_BOM) if buffer[: len(_BOM)] == _BOM else 0
+    end = _record_end(buffer, start)
+    line = buffer[start:end].decode("utf-8")
+    header = next(csv.reader(io.StringIO(line, newline="")), [])
+    if clean:
+        header = [clean_html_tags(cell) for cell in header]
+    return header, end
+
+
+def _worker_count(workers: Optional[int]) -> int:
+    if workers is not None and workers < 1:
+        raise ValueError(f"workers must be at least 1 or None, not {workers}")
+    return workers or os.cpu_count() or 1
+
+
+def _map_chunks(
+    csv_file: str,
+    buffer: mmap.mmap,
+    start: int,
+    chunk_size: int,
+    workers: int,
+    task: Callable[..., T],
+    *args: Any,
+) -> Iterator[T]:
+    """
+    Call `task(csv_file, chunk_start, chunk_end, *args)` for each chunk of
+    `buffer[start:]` on a process pool and yield the results in file order.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        try:
+            for chunk_start, chunk_end in split_records(buffer, start, chunk_size):
+                pending.append(
+                    executor.submit(task, csv_file, chunk_start, chunk_end, *args)
+                )
+                if len(pending) >= workers * CHUNKS_IN_FLIGHT_PER_WORKER:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            # A consumer that stops early does not wait for chunks it will
+            # never read
+            for future in pending:
+                future.cancel()
+
+
+def _chunk_rows(
+    csv_file: str, start: int, end: int, clean: bool
+) -> Iterator[List[str]]:
+    """
+    Yield the rows of `csv_file[start:end]`, cleaned if requested.
+    Runs in a worker process.
+    """
+    with open(csv_file, "rb") as file, mmap.mmap(
+        file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as buffer:
+        text = buffer[start:end].decode("utf-8")
+    for values in csv.reader(io.StringIO(text, newline="")):
+        yield [clean_html_tags(cell) for cell in values] if clean else values
+
+
+def _parse_chunk(
+    csv_file: str, start: int, end: int, header: List[str], clean: bool, keep: bool
+) -> ChunkResult:
+    """
+    Parse, clean and explode the records in `csv_file[start:end]`.
+    Runs in a worker process.
+    """
+    records = []
+    output = io.StringIO() if keep else None
+    writer = csv.writer(output, quoting=csv.QUOTE_MINIMAL) if keep else None
+    for values in _chunk_rows(csv_file, start, end, clean):
+        if writer is not None:
+            writer.writerow(values)
+        # Skip blank lines, matching csv.DictReader
+        if not values:
+            continue
+        for record in _explode_row(dict(zip(header, values))):
+            records.append(tuple(record.values()))
+    return ChunkResult(records, output.getvalue() if keep else None)
+
+
+def _clean_chunk(csv_file: str, start: int, end: int) -> str:
+    """
+    Return the cleaned rows of `csv_file[start:end]` as CSV text.
+    Runs in a worker process.
+    """
+    output = io.StringIO()
+    csv.writer(output, quoting=csv.QUOTE_MINIMAL).writerows(
+        _chunk_rows(csv_file, start, end, True)
+    )
+    return output.getvalue()
+
+
+def iter_csv_chunks(
+    csv_file: str,
+    clean: bool = True,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    cleaned_csv_file: Optional[str] = None,
+) -> Iterator[List[Tuple[Optional[str], ...]]]:
+    """
+    Parse a Panorama CSV export in a process pool, one chunk per task.
+
+    The file is memory-mapped and cut into chunks on record boundaries,
+    taking quoted line breaks into account. Each worker maps the file again,
+    then parses, cleans and explodes its chunk; the chunks' device records
+    are yielded in file order as they complete.
+
+    Parameters
+    ----------
+    csv_file : str
+        Path to the CSV file.
+    clean : bool, optional
+        Strip HTML markup from each cell while reading.
+    workers : int, optional
+        Number of worker processes; the number of CPUs by default.
+    chunk_size : int, optional
+        Approximate size in bytes of each chunk.
+    cleaned_csv_file : str, optional
+        When given, the cleaned rows are also written to this path, in order.
+
+    Yields
+    ------
+    List[Tuple[Optional[str], ...]]
+        The device records of each chunk as value tuples in RECORD_FIELDS
+        order.
+    """
+    workers = _worker_count(workers)
+    with ExitStack() as stack:
+        file = stack.enter_context(open(csv_file, "rb"))
+        if os.fstat(file.fileno()).st_size == 0:
+            return
+        buffer = stack.enter_context(
+            mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        )
+        header, header_end = _read_header(buffer, clean)
+
+        cleaned = None
+        if cleaned_csv_file:
+            cleaned = stack.enter_context(
+                open(cleaned_csv_file, "w", newline="", encoding="utf-8")
+            )
+            csv.writer(cleaned, quoting=csv.QUOTE_MINIMAL).writerow(header)
+
+        for result in _map_chunks(
+            csv_file,
+            buffer,
+            header_end,
+            chunk_size,
+            workers,
+            _parse_chunk,
+            header,
+            clean,
+            cleaned is not None,
+        ):
+            if cleaned is not None:
+                cleaned.write(result.cleaned)
+            yield result.records
+
+
+def clean_csv_chunks(
+    input_file: str,
+    output_file: str,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+):
+    """
+    Write a cleaned copy of a CSV file, cleaning its chunks in a process pool.
+
+    Produces the same file as `cleaner.clean_csv` with one worker.
+
+    Parameters
+    ----------
+    input_file : str
+        Path to the CSV file to clean.
+    output_file : str
+        Path to write the cleaned CSV file to.
+    workers : int, optional
+        Number of worker processes; the number of CPUs by default.
+    chunk_size : int, optional
+        Approximate size in bytes of each chunk.
+    """
+    workers = _worker_count(workers)
+    with open(input_file, "rb") as file, open(
+        output_file, "w", newline="", encoding="utf-8"
+    ) as outfile:
+        if os.fstat(file.fileno()).st_size == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            header, header_end = _read_header(buffer, clean=True)
+            csv.writer(outfile, quoting=csv.QUOTE_MINIMAL).writerow(header)
+            for text in _map_chunks(
+                input_file, buffer, header_end, chunk_size, workers, _clean_chunk
+            ):
+                outfile.write(text)
@@ -1,6 +1,9 @@
 # device_certificate_report/components/version.py
 
 import re
+from functools import lru_cache
+
+_VERSION_PATTERN = re.compile(r"^(\d+)\.(\d+)\.(\d+)(?:-h(\d+))?$")
 
 
 class Version:
@@ -10,6 +13,18 @@ class Version:
         self.maintenance = maintenance
         self.hotfix = hotfix
 
+    @property
+    def key(self) -> int:
+        """
+        Pack the version into a single integer that sorts the same way as the version.
+        """
+        return (
+            (self.major << 48)
+            | (self.feature << 32)
+            | (self.maintenance << 16)
+            | self.hotfix
+        )
+
     def __lt__(self, other):
         if self.major != other.major:
             return self.major < other.major
@@ -31,7 +46,7 @@ def parse_version(version_str: str) -> Version:
     Parse a version string into a Version object.
     """
     # Example version strings: '10.2.10-h4', '9.1.13-h5', '11.1.0'
-    match = re.match(r"^(\d+)\.(\d+)\.(\d+)(?:-h(\d+))?$", version_str)
+    match = _VERSION_PATTERN.match(version_str)
     if not match:
         raise ValueError(f"Invalid version format: {version_str}")
     major = int(match.group(1))
@@ -39,3 +54,12 @@ def parse_version(version_str: str) -> Version:
     maintenance = int(match.group(3))
     hotfix = int(match.group(4)) if match.group(4) else 0
     return Version(major, feature, maintenance, hotfix)
+
+
+@lru_cache(maxsize=1024)
+def parse_version_cached(version_str: str) -> Version:
+    """
+    Memoized `parse_version` for fleets that repeat the same few versions.
+    The returned Version is shared between callers and must not be modified.
+    """
+    return parse_version(version_str)
@@ -0,0 +1,141 @@
+# device_certificate_report/components/xml_stream.py
+
+import logging
+import ssl
+
+from typing import IO, TYPE_CHECKING, Dict, Iterator, Optional, Union
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+try:
+    from lxml.etree import iterparse
+except ImportError:  # pragma: no cover - lxml is optional
+    from xml.etree.ElementTree import iterparse
+
+from device_certificate_report.models.device import DeviceInfo
+
+if TYPE_CHECKING:
+    from panos.base import PanDevice
+
+logger = logging.getLogger(__name__)
+
+SHOW_DEVICES_ALL = "<show><devices><all/></devices></show>"
+
+
+def panorama_entry_record(entry) -> Dict[str, str]:
+    """
+    Extract a device record from one `<entry>` of a `show devices all` response.
+
+    The direct children of the entry are read in a single pass rather than
+    with one `findtext` scan per field.
+    """
+    fields = {child.tag: child.text for child in entry}
+
+    connected = fields.get("connected")
+    globalprotect_client = fields.get("global-protect-client-package-version")
+
+    return dict(
+        device_name=fields.get("hostname") or "",
+        model=fields.get("model") or "",
+        serial_number=fields.get("serial") or "",
+        ipv4_address=fields.get("ip-address") or "",
+        device_state="Connected" if connected == "yes" else "Disconnected",
+        device_certificate=fields.get("device-cert-present") or "",
+        device_certificate_expiry_date=fields.get("device-cert-expiry-date") or "",
+        software_version=fields.get("sw-version") or "",
+        globalprotect_client=(
+            globalprotect_client if globalprotect_client != "0.0.0" else ""
+        ),
+    )
+
+
+def iter_panorama_records(source: Union[str, IO[bytes]]) -> Iterator[Dict[str, str]]:
+    """
+    Incrementally parse a `show devices all` response into device records.
+
+    Only one device entry is held in memory at a time: each entry is dropped
+    from the tree as soon as its record has been yielded, so memory use stays
+    flat however many devices Panorama manages. lxml is used when installed.
+
+    Parameters
+    ----------
+    source : Union[str, IO[bytes]]
+        Path to, or binary file object holding, the XML API response.
+
+    Yields
+    ------
+    Dict[str, str]
+        One record per managed device, keyed by DeviceInfo field name.
+
+    Raises
+    ------
+    ValueError
+        If the response has an error status.
+    """
+    path = []
+    status = None
+    root = None
+
+    for event, element in iterparse(source, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = element
+                status = element.get("status")
+            path.append(element)
+            continue
+
+        path.pop()
+        # Device entries sit directly under <devices>; nested entries (vsys,
+        # HA peers, ...) are handled along with the device that owns them.
+        if element.tag == "entry" and path and path[-1].tag == "devices":
+            yield panorama_entry_record(element)
+            element.clear()
+            path[-1].remove(element)
+
+    if status == "error":
+        message = " ".join(text.strip() for text in root.itertext() if text.strip())
+        raise ValueError(f"Panorama returned an error response: {message}")
+
+
+def iter_panorama_devices(source: Union[str, IO[bytes]]) -> Iterator[DeviceInfo]:
+    """
+    Incrementally parse a `show devices all` response into DeviceInfo objects.
+    See `iter_panorama_records`.
+    """
+    for record in iter_panorama_records(source):
+        yield DeviceInfo(**record)
+
+
+def open_op_stream(
+    device: "PanDevice", cmd: str, extra_qs: Optional[Dict[str, str]] = None
+) -> IO[bytes]:
+    """
+    Send an XML operational command and return the unparsed response stream.
+
+    pan-os-python parses every response into a full ElementTree before handing
+    it back; this sends the same API request but leaves the body unread so it
+    can be parsed incrementally.
+
+    Parameters
+    ----------
+    device : PanDevice
+        The Panorama or Firewall instance to query.
+    cmd : str
+        The XML operational command.
+    extra_qs : Dict[str, str], optional
+        Extra query parameters, such as `target`.
+
+    Returns
+    -------
+    IO[bytes]
+        The HTTP response, to be closed by the caller.
+    """
+    query = {"type": "op", "cmd": cmd, "key": device.api_key}
+    if extra_qs:
+        query.update(extra_qs)
+    url = f"https://{device.hostname}:{device.port}/api/"
+    request = Request(url, data=urlencode(query).encode())
+    # Match pan-os-python, which does not verify certificates by default
+    return urlopen(
+        request, context=ssl._create_unverified_context(), timeout=device.timeout
+    )
@@ -0,0 +1,29 @@
+# device_certificate_report/config/defaults.py
+
+# Kept free of third-party imports so the CLI can build its options without
+# loading pan-os-python, pydantic or reportlab.
+
+# Hosts queried at the same time in inventory mode
+DEFAULT_MAX_WORKERS = 8
+
+# Extra attempts for a host whose collection failed, and the delay in seconds
+# before the first retry (doubled for each further retry)
+DEFAULT_RETRIES = 2
+RETRY_BACKOFF = 1.0
+
+# Maximum age in seconds of a reused snapshot
+DEFAULT_CACHE_TTL = 3600
+
+# Seconds between polls of the `serve` daemon, and the address it listens on
+DEFAULT_POLL_INTERVAL = 300
+DEFAULT_SERVE_BIND = "127.0.0.1"
+DEFAULT_SERVE_PORT = 8080
+
+# Size limit in MiB of the rendered report cache
+DEFAULT_REPORT_CACHE_SIZE_MB = 512
+
+# Keep-alive connections open to each host with the asyncio transport
+DEFAULT_MAX_CONNECTIONS_PER_HOST = 4
+
+# Certificate status queries sent through each Panorama at the same time
+DEFAULT_ENRICH_WORKERS = 16
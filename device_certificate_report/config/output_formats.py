@@ -0,0 +1,23 @@
+# device_certificate_report/config/output_formats.py
+
+from enum import Enum
+
+
+class OutputFormat(str, Enum):
+    PDF = "pdf"
+    CSV = "csv"
+    JSONL = "jsonl"
+    HTML = "html"
+    PARQUET = "parquet"
+
+    @property
+    def extension(self) -> str:
+        return f".{self.value}"
+
+
+class ShardBy(str, Enum):
+    # Hardware family, per config/hardware_families.py
+    FAMILY = "family"
+    # Panorama or firewall the device was collected from
+    SOURCE = "source"
+    MODEL = "model"
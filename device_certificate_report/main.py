@@ -9,6 +9,7 @@ It supports three subcommands:
 - `csv`: Load a CSV file named "panorama.csv" to extract firewall information.
 - `panorama`: Connect to a Panorama appliance to retrieve a list of connected firewalls.
 - `firewall`: Connect directly to a firewall appliance.
+- `serve`: Poll Panorama appliances and firewalls on a schedule and serve the latest report over HTTP.
 
 Each subcommand collects necessary data and generates a PDF report.
 
@@ -27,7 +28,10 @@ Run the CLI utility with one of the subcommands:
 
     device-certificate-report csv
     device-certificate-report panorama --hostname <panorama_ip> --username <user> --password <password>
+    device-certificate-report panorama --inventory-file <panoramas.txt> --username <user> --password <password>
     device-certificate-report firewall --hostname <firewall_ip> --username <user> --password <password>
+    device-certificate-report firewall --inventory-file <firewalls.txt> --username <user> --password <password>
+    device-certificate-report serve --panorama <panorama_ip> --username <user> --password <password>
 
 Notes
 -----
@@ -37,26 +41,35 @@ Notes
 """
 
 import logging
+import os
 import sys
-from pathlib import Path
-from typing import Optional
+from functools import partial
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple, Union
 
 import typer
-from panos.firewall import Firewall
-from panos.panorama import Panorama
-
-# Import components
-from device_certificate_report.components.data_collection import (
-    process_csv_file,
-    collect_data_from_panorama,
-    collect_data_from_firewall,
-)
-from device_certificate_report.utilities.pdf_generation import generate_report
-from device_certificate_report.utilities.cleaner import clean_csv
-from device_certificate_report.utilities.filters import (
-    filter_devices_by_model,
-    split_devices_by_version,
+
+# Only lightweight modules are imported here. Everything a subcommand needs
+# (pan-os-python, pydantic models, reportlab, ...) is imported inside it, so
+# `--help` and runs that never touch the network start quickly.
+from device_certificate_report.config.defaults import (
+    DEFAULT_CACHE_TTL,
+    DEFAULT_ENRICH_WORKERS,
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_REPORT_CACHE_SIZE_MB,
+    DEFAULT_RETRIES,
+    DEFAULT_SERVE_BIND,
+    DEFAULT_SERVE_PORT,
 )
+from device_certificate_report.config.output_formats import OutputFormat, ShardBy
+
+if TYPE_CHECKING:
+    from device_certificate_report.models.device import DeviceInfo
+    from device_certificate_report.models.device_table import DeviceTable
+    from device_certificate_report.utilities.classification import Classification
+    from device_certificate_report.utilities.incremental import SnapshotDiff
+    from device_certificate_report.utilities.report_cache import ReportCache
+    from device_certificate_report.utilities.snapshot import SnapshotStore
 
 # Initialize Typer app
 app = typer.Typer(help="Generate Device Certificate Reports from PAN-OS Devices")
@@ -65,6 +78,281 @@ app = typer.Typer(help="Generate Device Certificate Reports from PAN-OS Devices"
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Options shared by the report-writing subcommands
+EXPIRING_WITHIN_OPTION = typer.Option(
+    None,
+    "--expiring-within",
+    help="Only list device certificates that expire within this many days, including expired ones",
+    min=0,
+)
+REPORT_CACHE_OPTION = typer.Option(
+    False,
+    "--report-cache",
+    help="Reuse a report rendered earlier from the same devices and options, hard-linking it to the output file",
+)
+REPORT_CACHE_DIR_OPTION = typer.Option(
+    None,
+    "--report-cache-dir",
+    help="Directory of the report cache; implies --report-cache [default: ~/.cache/device-certificate-report/reports]",
+)
+REPORT_CACHE_SIZE_OPTION = typer.Option(
+    DEFAULT_REPORT_CACHE_SIZE_MB,
+    "--report-cache-size",
+    help="Size in MiB above which the least recently used cached reports are removed",
+    min=1,
+)
+RENDER_WORKERS_OPTION = typer.Option(
+    None,
+    "--render-workers",
+    help="Render report sections in this many processes and merge them, with page numbers and a table of contents (requires pypdf); with --shard-by, the number of processes rendering shards [default: 1, or one per CPU with --shard-by]",
+    min=1,
+)
+SHARD_BY_OPTION = typer.Option(
+    None,
+    "--shard-by",
+    help="Write one report per hardware family, source appliance or model into a directory named after --output-file, with an index.html linking them; rendered by --render-workers processes",
+)
+
+
+@app.callback()
+def main(
+    ctx: typer.Context,
+    profile: Optional[str] = typer.Option(
+        None,
+        "--profile",
+        help="Profile the run with cProfile and write the statistics to this path (read them with pstats or snakeviz)",
+    ),
+    metrics_json: Optional[str] = typer.Option(
+        None,
+        "--metrics-json",
+        help="Record wall and CPU time, item and byte counts and peak memory of each stage and write them to this path as JSON",
+    ),
+):
+    """
+    Options shared by every subcommand; they go before the subcommand name.
+
+    Parameters
+    ----------
+    ctx : typer.Context
+        The invocation context, used to report once the subcommand has finished.
+    profile : str, optional
+        Path to write cProfile statistics to.
+    metrics_json : str, optional
+        Path to write the per-stage metrics to.
+    """
+    if not profile and not metrics_json:
+        # Without either option no stage is recorded and nothing is imported
+        return
+
+    from device_certificate_report.utilities import metrics
+
+    recorder = metrics.enable()
+    profiler = None
+    if profile:
+        import cProfile
+
+        # Only code on the main thread is profiled; collection threads show
+        # up as time spent waiting on them
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    def finish():
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(profile)
+            typer.echo(f"Profile written to {profile}")
+        metrics.disable()
+        logger.info(f"Stage timings:\n{recorder.summary()}")
+        if metrics_json:
+            recorder.write_json(metrics_json, command=ctx.invoked_subcommand)
+            typer.echo(f"Metrics written to {metrics_json}")
+
+    ctx.call_on_close(finish)
+
+
+def open_snapshot_store(
+    cache_file: Optional[str], cache_ttl: int, use_cache: bool, incremental: bool
+) -> Optional["SnapshotStore"]:
+    """
+    Open the snapshot store used by the collecting subcommands when
+    `--use-cache`, `--cache-file` or `--incremental` is given; without any of
+    them nothing is read from or written to disk.
+
+    A store that cannot be opened is logged and skipped rather than failing
+    the run.
+    """
+    if not (use_cache or cache_file or incremental):
+        return None
+
+    import sqlite3
+
+    from device_certificate_report.utilities.snapshot import SnapshotStore
+
+    try:
+        return SnapshotStore(cache_file, ttl=cache_ttl, refresh=not use_cache)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Snapshot cache unavailable, continuing without it: {e}")
+        return None
+
+
+def prompt_credentials(
+    kind: str,
+    username: Optional[str],
+    password: Optional[str],
+    snapshots: Optional["SnapshotStore"],
+    sources: List[str],
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Prompt for whichever of `username` and `password` was not given, unless
+    every source will be served from a fresh snapshot and no appliance is
+    contacted.
+    """
+    if snapshots is not None and all(snapshots.is_fresh(s) for s in sources):
+        return username, password
+    if username is None:
+        username = typer.prompt(f"{kind} username")
+    if password is None:
+        password = typer.prompt(f"{kind} password", hide_input=True)
+    return username, password
+
+
+def open_report_cache(
+    report_cache: bool, report_cache_dir: Optional[str], report_cache_size: int
+) -> Optional["ReportCache"]:
+    """
+    Open the rendered report cache when `--report-cache` or
+    `--report-cache-dir` is given. A cache directory that cannot be created
+    is logged and skipped rather than failing the run.
+    """
+    if not report_cache and not report_cache_dir:
+        return None
+
+    from device_certificate_report.utilities.report_cache import ReportCache
+
+    try:
+        return ReportCache(report_cache_dir, max_bytes=report_cache_size * 2**20)
+    except OSError as e:
+        logger.warning(f"Report cache unavailable, continuing without it: {e}")
+        return None
+
+
+def classify(
+    devices: Union[Iterable["DeviceInfo"], "DeviceTable"],
+    snapshots: Optional["SnapshotStore"] = None,
+    snapshot_key: Optional[str] = None,
+) -> Tuple["Classification", Optional["SnapshotDiff"]]:
+    """
+    Sort the collected devices into the report's sections in a single pass.
+
+    With a snapshot store and key, only devices that changed since the
+    snapshot saved under the key are classified again, and the changes are
+    returned for the report; otherwise the changes are None. A DeviceTable
+    is classified column by column, and its buckets are tables too.
+    """
+    from device_certificate_report.models.device_table import DeviceTable
+    from device_certificate_report.utilities.classification import (
+        classify_devices,
+        classify_table,
+    )
+    from device_certificate_report.utilities.incremental import classify_with_snapshot
+    from device_certificate_report.utilities.metrics import stage
+
+    changes = None
+    with stage("classify") as s:
+        if snapshots is not None and snapshot_key:
+            # Reuse the previous run's results for devices that did not change
+            result = classify_with_snapshot(devices, snapshots, snapshot_key)
+            classification = result.classification
+            changes = result.diff
+        elif isinstance(devices, DeviceTable):
+            classification = classify_table(devices)
+        else:
+            classification = classify_devices(devices)
+        s.add(items=classification.counters["devices"])
+    logger.info(f"Classified {classification.summary()}.")
+    return classification, changes
+
+
+def report_sections(
+    classification: "Classification", expiring_within: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Return the report's sections and expiry histogram, as keyword arguments
+    of `render_report`.
+
+    Certificates are listed earliest expiry first, and only those expiring
+    within `expiring_within` days when it is given. The histogram covers every
+    device with certificate details.
+    """
+    from device_certificate_report.components.expiry import certificate_sections
+    from device_certificate_report.utilities.metrics import stage
+
+    sections: Dict[str, Any] = classification.sections()
+    with stage("expiry_index") as s:
+        certificates = classification.certificates
+        sections.update(certificate_sections(certificates, expiring_within))
+        s.add(items=len(certificates))
+    return sections
+
+
+def write_report(
+    output_format: OutputFormat,
+    classification: "Classification",
+    output_file: str,
+    expiring_within: Optional[int] = None,
+    shard_by: Optional[ShardBy] = None,
+    render_workers: Optional[int] = None,
+    cache: Optional["ReportCache"] = None,
+    collection_failures: Optional[List[Any]] = None,
+    changes: Optional["SnapshotDiff"] = None,
+    **options,
+) -> str:
+    """
+    Render the report and return the path to show the user.
+
+    With `shard_by`, one report per shard is written into a directory named
+    after `output_file` without its extension, rendered by `render_workers`
+    processes (one per CPU when None), with an index page linking them.
+    """
+    from device_certificate_report.utilities.metrics import stage
+    from device_certificate_report.utilities.renderers import render_report
+
+    with stage("render"):
+        if shard_by is None:
+            render_report(
+                output_format,
+                output_file=output_file,
+                collection_failures=collection_failures or [],
+                changes=changes,
+                render_workers=render_workers,
+                cache=cache,
+                **options,
+                **report_sections(classification, expiring_within),
+            )
+            return output_file
+
+        from device_certificate_report.utilities.sharding import (
+            INDEX_FILE,
+            render_shards,
+        )
+
+        directory = output_file
+        if directory.endswith(output_format.extension):
+            directory = directory[: -len(output_format.extension)]
+        render_shards(
+            output_format,
+            classification,
+            directory,
+            shard_by,
+            workers=render_workers,
+            expiring_within=expiring_within,
+            changes=changes,
+            collection_failures=collection_failures,
+            cache=cache,
+            **options,
+        )
+    return os.path.join(directory, INDEX_FILE)
+
 
 # Subcommand for processing a CSV file
 @app.command()
@@ -77,10 +365,37 @@ def csv(
         prompt="CSV file path",
     ),
     output_file: Optional[str] = typer.Option(
-        "device_certificate_report.pdf",
+        "",
         "--output-file",
         "-o",
-        help="Path to the output PDF report",
+        help="Path to the output report [default: device_certificate_report.<format>]",
+    ),
+    cleaned_csv_file: Optional[str] = typer.Option(
+        None,
+        "--cleaned-csv-file",
+        help="Also write the cleaned CSV to this path (not written by default)",
+    ),
+    output_format: OutputFormat = typer.Option(
+        OutputFormat.PDF,
+        "--format",
+        help="Report format; csv, jsonl, html and parquet are written as streams of device records",
+    ),
+    render_workers: Optional[int] = RENDER_WORKERS_OPTION,
+    expiring_within: Optional[int] = EXPIRING_WITHIN_OPTION,
+    report_cache: bool = REPORT_CACHE_OPTION,
+    report_cache_dir: Optional[str] = REPORT_CACHE_DIR_OPTION,
+    report_cache_size: int = REPORT_CACHE_SIZE_OPTION,
+    csv_workers: int = typer.Option(
+        1,
+        "--csv-workers",
+        help="Parse the CSV file in this many processes, in memory-mapped chunks; 0 uses one per CPU",
+        min=0,
+    ),
+    shard_by: Optional[ShardBy] = SHARD_BY_OPTION,
+    columnar: bool = typer.Option(
+        False,
+        "--columnar",
+        help="Hold the devices in a columnar table instead of one object per device, using less memory on large exports",
     ),
 ):
     """
@@ -91,50 +406,77 @@ def csv(
     csv_file : str, optional
         The path to the CSV file containing device information.
     output_file : str, optional
-        The path to the output PDF report.
+        The path to the output report.
+    cleaned_csv_file : str, optional
+        The path to write the cleaned CSV file to, if wanted.
+    output_format : OutputFormat, optional
+        The report format.
+    render_workers : int, optional
+        Number of processes rendering a PDF report, or the shards with
+        `shard_by`; None renders a report in this process and shards in one
+        process per CPU.
+    expiring_within : int, optional
+        Limit the certificate section to certificates expiring within this
+        many days.
+    report_cache : bool, optional
+        Reuse a cached report rendered from the same input.
+    report_cache_dir : str, optional
+        Directory of the report cache.
+    report_cache_size : int, optional
+        Size limit of the report cache in MiB.
+    csv_workers : int, optional
+        Number of processes parsing the CSV file; 0 uses one per CPU.
+    shard_by : ShardBy, optional
+        Split the report by hardware family, source appliance or model.
+    columnar : bool, optional
+        Read the devices into a DeviceTable and classify it column by column.
     """
-    try:
-        # Clean the CSV file
-        cleaned_csv_file = Path.cwd() / "cleaned.csv"
-        clean_csv(csv_file, str(cleaned_csv_file))
-        typer.echo(f"Cleaned CSV file saved as: {cleaned_csv_file}")
-
-        # Process the cleaned CSV file
-        typer.echo(f"Processing cleaned CSV file: {cleaned_csv_file}")
-        devices = process_csv_file(str(cleaned_csv_file))
+    from device_certificate_report.components.data_collection import (
+        iter_csv_devices,
+        iter_csv_records,
+    )
+    from device_certificate_report.models.device_table import DeviceTable
+    from device_certificate_report.utilities.metrics import timed_iter
 
-        # Now, filter devices by model
-        affected_devices, unaffected_devices = filter_devices_by_model(devices)
-
-        # For affected devices, split by version
-        no_upgrade_required, upgrade_required = split_devices_by_version(
-            affected_devices
-        )
-
-        # Collect devices with GlobalProtect clients
-        devices_with_globalprotect = [
-            device
-            for device in devices
-            if device.globalprotect_client and device.globalprotect_client != "0"
-        ]
+    output_file = output_file or f"device_certificate_report{output_format.extension}"
+    try:
+        # Clean, explode and parse the CSV file in a single streaming pass
+        typer.echo(f"Processing CSV file: {csv_file}")
+        workers = csv_workers or os.cpu_count() or 1
+        if columnar:
+            devices = DeviceTable.from_records(
+                timed_iter(
+                    "read_csv",
+                    iter_csv_records(
+                        csv_file, cleaned_csv_file=cleaned_csv_file, workers=workers
+                    ),
+                )
+            )
+        else:
+            # The devices are classified as they are read; reading is timed
+            # per device so it is left out of the classify stage's own time
+            devices = timed_iter(
+                "read_csv",
+                iter_csv_devices(
+                    csv_file, cleaned_csv_file=cleaned_csv_file, workers=workers
+                ),
+            )
+        if cleaned_csv_file:
+            typer.echo(f"Cleaned CSV file will be saved as: {cleaned_csv_file}")
 
-        # Collect devices with certificate status and expiry
-        devices_with_certificates = [
-            device
-            for device in devices
-            if device.device_certificate and device.device_certificate_expiry_date
-        ]
+        classification, _ = classify(devices)
 
         # Generate the report
-        generate_report(
-            unaffected_devices=unaffected_devices,
-            no_upgrade_required=no_upgrade_required,
-            upgrade_required=upgrade_required,
-            devices_with_globalprotect=devices_with_globalprotect,
-            devices_with_certificates=devices_with_certificates,
-            output_file=output_file,
+        report_path = write_report(
+            output_format,
+            classification,
+            output_file,
+            expiring_within=expiring_within,
+            shard_by=shard_by,
+            render_workers=render_workers,
+            cache=open_report_cache(report_cache, report_cache_dir, report_cache_size),
         )
-        typer.echo(f"Report generated at {output_file}")
+        typer.echo(f"Report generated at {report_path}")
     except Exception as e:
         logger.error(f"An error occurred while processing the CSV file: {e}")
         typer.echo(f"An error occurred: {e}", err=True)
@@ -144,86 +486,280 @@ def csv(
 # Subcommand for connecting to a Panorama appliance
 @app.command()
 def panorama(
-    hostname: str = typer.Option(
-        ...,
+    hostname: Optional[str] = typer.Option(
+        None,
         "--hostname",
         "-h",
-        help="Hostname or IP address of Panorama appliance",
-        prompt="Panorama hostname or IP",
+        help="Hostname or IP address of Panorama appliance (prompted for unless --inventory-file is given)",
     ),
-    username: str = typer.Option(
-        ...,
+    username: Optional[str] = typer.Option(
+        None,
         "--username",
         "-u",
-        help="Username for authentication with the Panorama appliance",
-        prompt="Panorama username",
+        help="Username for authentication with the Panorama appliance (prompted for unless every device is served from --use-cache)",
     ),
-    password: str = typer.Option(
-        ...,
+    password: Optional[str] = typer.Option(
+        None,
         "--password",
         "-p",
-        help="Password for authentication with the Panorama appliance",
-        prompt="Panorama password",
-        hide_input=True,
+        help="Password for authentication with the Panorama appliance (prompted for unless every device is served from --use-cache)",
     ),
     output_file: Optional[str] = typer.Option(
-        "device_certificate_report.pdf",
+        "",
         "--output-file",
         "-o",
-        help="Path to the output PDF report",
+        help="Path to the output report [default: device_certificate_report.<format>]",
+    ),
+    inventory_file: Optional[str] = typer.Option(
+        None,
+        "--inventory-file",
+        "-i",
+        help="File listing Panorama appliances, one per line, to collect from concurrently",
+    ),
+    max_workers: int = typer.Option(
+        DEFAULT_MAX_WORKERS,
+        "--max-workers",
+        help="Maximum number of Panorama appliances queried at the same time",
+        min=1,
+    ),
+    timeout: Optional[int] = typer.Option(
+        None,
+        "--timeout",
+        help="Per-request connect/read timeout in seconds for each Panorama",
+        min=1,
+    ),
+    streaming: bool = typer.Option(
+        False,
+        "--streaming",
+        help="Parse the device list incrementally as it arrives to keep memory flat",
+    ),
+    async_transport: bool = typer.Option(
+        False,
+        "--async-transport",
+        help="Send the XML API requests from a single thread over pooled keep-alive connections instead of one blocking connection per request",
+    ),
+    enrich_certificates: bool = typer.Option(
+        False,
+        "--enrich-certificates",
+        help="Ask connected firewalls whose certificate expiry date Panorama did not report for their certificate status, through Panorama",
+    ),
+    enrich_workers: int = typer.Option(
+        DEFAULT_ENRICH_WORKERS,
+        "--enrich-workers",
+        help="Maximum number of certificate status queries in flight per Panorama",
+        min=1,
     ),
+    use_cache: bool = typer.Option(
+        False,
+        "--use-cache/--refresh",
+        help="Reuse a snapshot of the collected devices younger than --cache-ttl instead of querying again; collections are only saved with --use-cache, --cache-file or --incremental",
+    ),
+    cache_ttl: int = typer.Option(
+        DEFAULT_CACHE_TTL,
+        "--cache-ttl",
+        help="Maximum age in seconds of a snapshot reused by --use-cache",
+        min=0,
+    ),
+    cache_file: Optional[str] = typer.Option(
+        None,
+        "--cache-file",
+        help="Path to the snapshot database [default: ~/.cache/device-certificate-report/snapshots.sqlite3]",
+    ),
+    incremental: bool = typer.Option(
+        False,
+        "--incremental",
+        help="Only re-classify devices that changed since the last --incremental run and report the changes",
+    ),
+    output_format: OutputFormat = typer.Option(
+        OutputFormat.PDF,
+        "--format",
+        help="Report format; csv, jsonl, html and parquet are written as streams of device records",
+    ),
+    render_workers: Optional[int] = RENDER_WORKERS_OPTION,
+    expiring_within: Optional[int] = EXPIRING_WITHIN_OPTION,
+    report_cache: bool = REPORT_CACHE_OPTION,
+    report_cache_dir: Optional[str] = REPORT_CACHE_DIR_OPTION,
+    report_cache_size: int = REPORT_CACHE_SIZE_OPTION,
+    shard_by: Optional[ShardBy] = SHARD_BY_OPTION,
 ):
     """
     Connect to a Panorama appliance to retrieve connected firewalls and generate the device certificate report.
 
     Parameters
     ----------
-    hostname : str
+    hostname : str, optional
         Hostname or IP address of the Panorama appliance.
-    username : str
+    username : str, optional
         Username for authentication with the Panorama appliance.
-    password : str
+    password : str, optional
         Password for authentication with the Panorama appliance.
     output_file : str, optional
-        The path to the output PDF report.
+        The path to the output report.
+    inventory_file : str, optional
+        Path to a file listing several Panorama appliances. When given, they
+        are queried concurrently and merged into a single report.
+    max_workers : int, optional
+        Maximum number of Panorama appliances queried at the same time.
+    timeout : int, optional
+        Per-request connect/read timeout in seconds.
+    streaming : bool, optional
+        Parse the device list incrementally as it arrives.
+    async_transport : bool, optional
+        Query the appliances from one thread over keep-alive connections.
+    enrich_certificates : bool, optional
+        Fill in missing certificate expiry dates by querying the firewalls
+        through Panorama.
+    enrich_workers : int, optional
+        Maximum number of certificate status queries in flight per Panorama.
+    use_cache : bool, optional
+        Reuse a fresh snapshot instead of querying the appliances again.
+    cache_ttl : int, optional
+        Maximum age in seconds of a reused snapshot.
+    cache_file : str, optional
+        Path to the snapshot database.
+    incremental : bool, optional
+        Re-classify only devices that changed since the last incremental run.
+    output_format : OutputFormat, optional
+        The report format.
+    render_workers : int, optional
+        Number of processes rendering a PDF report, or the shards with
+        `shard_by`; None renders a report in this process and shards in one
+        process per CPU.
+    expiring_within : int, optional
+        Limit the certificate section to certificates expiring within this
+        many days.
+    report_cache : bool, optional
+        Reuse a cached report rendered from the same input.
+    report_cache_dir : str, optional
+        Directory of the report cache.
+    report_cache_size : int, optional
+        Size limit of the report cache in MiB.
+    shard_by : ShardBy, optional
+        Split the report by hardware family, source appliance or model.
     """
-    typer.echo(f"Connecting to Panorama at {hostname}")
+    from panos.panorama import Panorama
+
+    from device_certificate_report.components.data_collection import (
+        collect_data_from_panorama,
+    )
+    from device_certificate_report.components.fleet import (
+        collect_data_from_panoramas,
+        panorama_snapshot_source,
+        read_inventory,
+    )
+    from device_certificate_report.utilities.metrics import stage
+
+    output_file = output_file or f"device_certificate_report{output_format.extension}"
+    collection_failures = []
+    snapshots = open_snapshot_store(cache_file, cache_ttl, use_cache, incremental)
     try:
-        panorama = Panorama(hostname, username, password)
-        devices = collect_data_from_panorama(panorama)
+        if inventory_file:
+            hostnames = read_inventory(inventory_file)
+            username, password = prompt_credentials(
+                "Panorama",
+                username,
+                password,
+                snapshots,
+                [
+                    panorama_snapshot_source(hostname, enrich_certificates)
+                    for hostname in hostnames
+                ],
+            )
+            typer.echo(
+                f"Connecting to {len(hostnames)} Panorama appliances from {inventory_file}"
+            )
+            with stage("collect") as s:
+                devices, collection_failures = collect_data_from_panoramas(
+                    hostnames,
+                    username,
+                    password,
+                    max_workers=max_workers,
+                    timeout=timeout,
+                    streaming=streaming,
+                    snapshots=snapshots,
+                    async_transport=async_transport,
+                    enrich=enrich_certificates,
+                    enrich_workers=enrich_workers,
+                )
+                s.add(items=len(devices))
+        else:
+            if not hostname:
+                hostname = typer.prompt("Panorama hostname or IP")
+            username, password = prompt_credentials(
+                "Panorama",
+                username,
+                password,
+                snapshots,
+                [panorama_snapshot_source(hostname, enrich_certificates)],
+            )
 
-        # Now, filter devices by model
-        affected_devices, unaffected_devices = filter_devices_by_model(devices)
+            def collect():
+                typer.echo(f"Connecting to Panorama at {hostname}")
+                if async_transport:
+                    from device_certificate_report.components.async_xapi import (
+                        collect_host,
+                        collect_panorama,
+                    )
+                    from device_certificate_report.components.enrichment import (
+                        collect_enriched_panorama,
+                    )
 
-        # For affected devices, split by version
-        no_upgrade_required, upgrade_required = split_devices_by_version(
-            affected_devices
-        )
+                    if enrich_certificates:
+                        return collect_host(
+                            hostname,
+                            partial(
+                                collect_enriched_panorama, max_workers=enrich_workers
+                            ),
+                            username,
+                            password,
+                            timeout,
+                            max_connections=enrich_workers,
+                        )
+                    return collect_host(
+                        hostname, collect_panorama, username, password, timeout
+                    )
+                kwargs = {"timeout": timeout} if timeout else {}
+                panorama = Panorama(hostname, username, password, **kwargs)
+                devices = collect_data_from_panorama(panorama, streaming=streaming)
+                if enrich_certificates:
+                    from device_certificate_report.components.enrichment import (
+                        enrich_certificates as enrich,
+                    )
+
+                    enrich(panorama, devices, enrich_workers)
+                return devices
 
-        # Collect devices with GlobalProtect clients
-        devices_with_globalprotect = [
-            device
-            for device in devices
-            if device.globalprotect_client and device.globalprotect_client != "0"
-        ]
+            with stage("collect") as s:
+                if snapshots is None:
+                    devices = collect()
+                else:
+                    devices = snapshots.get_or_collect(
+                        panorama_snapshot_source(hostname, enrich_certificates),
+                        collect,
+                    )
+                s.add(items=len(devices))
 
-        # Collect devices with certificate status and expiry
-        devices_with_certificates = [
-            device
-            for device in devices
-            if device.device_certificate and device.device_certificate_expiry_date
-        ]
+        source = os.path.abspath(inventory_file) if inventory_file else hostname
+        classification, changes = classify(
+            devices,
+            snapshots,
+            f"classified/panorama/{source}" if incremental else None,
+        )
 
         # Generate the report
-        generate_report(
-            unaffected_devices=unaffected_devices,
-            no_upgrade_required=no_upgrade_required,
-            upgrade_required=upgrade_required,
-            devices_with_globalprotect=devices_with_globalprotect,
-            devices_with_certificates=devices_with_certificates,
-            output_file=output_file,
+        report_path = write_report(
+            output_format,
+            classification,
+            output_file,
+            expiring_within=expiring_within,
+            shard_by=shard_by,
+            render_workers=render_workers,
+            cache=open_report_cache(report_cache, report_cache_dir, report_cache_size),
+            collection_failures=collection_failures,
+            changes=changes,
+            include_source=bool(inventory_file),
         )
-        typer.echo(f"Report generated at {output_file}")
+        typer.echo(f"Report generated at {report_path}")
     except Exception as e:
         logger.error(f"Failed to process Panorama: {e}")
         sys.exit(1)
@@ -232,96 +768,433 @@ def panorama(
 # Subcommand for connecting to a Firewall appliance
 @app.command()
 def firewall(
-    hostname: str = typer.Option(
-        ...,
+    hostname: Optional[str] = typer.Option(
+        None,
         "--hostname",
         "-h",
-        help="Hostname or IP address of the Firewall appliance",
-        prompt="Firewall hostname or IP",
+        help="Hostname or IP address of the Firewall appliance (prompted for unless --inventory-file is given)",
     ),
-    username: str = typer.Option(
-        ...,
+    username: Optional[str] = typer.Option(
+        None,
         "--username",
         "-u",
-        help="Username for authentication with the Firewall appliance",
-        prompt="Firewall username",
+        help="Username for authentication with the Firewall appliance (prompted for unless every device is served from --use-cache)",
     ),
-    password: str = typer.Option(
-        ...,
+    password: Optional[str] = typer.Option(
+        None,
         "--password",
         "-p",
-        help="Password for authentication with the Firewall appliance",
-        prompt="Firewall password",
-        hide_input=True,
+        help="Password for authentication with the Firewall appliance (prompted for unless every device is served from --use-cache)",
     ),
     output_file: Optional[str] = typer.Option(
         "",
         "--output-file",
         "-o",
-        help="Path to the output PDF report",
+        help="Path to the output report [default: <hostname>.<format>, or device_certificate_report.<format> with --inventory-file]",
     ),
+    inventory_file: Optional[str] = typer.Option(
+        None,
+        "--inventory-file",
+        "-i",
+        help="File listing firewalls, one per line, to collect from concurrently",
+    ),
+    max_workers: int = typer.Option(
+        DEFAULT_MAX_WORKERS,
+        "--max-workers",
+        help="Maximum number of firewalls queried at the same time",
+        min=1,
+    ),
+    timeout: Optional[int] = typer.Option(
+        None,
+        "--timeout",
+        help="Per-request connect/read timeout in seconds for each firewall",
+        min=1,
+    ),
+    retries: int = typer.Option(
+        DEFAULT_RETRIES,
+        "--retries",
+        help="Extra attempts for a firewall that could not be collected from",
+        min=0,
+    ),
+    async_transport: bool = typer.Option(
+        False,
+        "--async-transport",
+        help="Send the XML API requests from a single thread over pooled keep-alive connections instead of one blocking connection per request",
+    ),
+    use_cache: bool = typer.Option(
+        False,
+        "--use-cache/--refresh",
+        help="Reuse a snapshot of the collected devices younger than --cache-ttl instead of querying again; collections are only saved with --use-cache, --cache-file or --incremental",
+    ),
+    cache_ttl: int = typer.Option(
+        DEFAULT_CACHE_TTL,
+        "--cache-ttl",
+        help="Maximum age in seconds of a snapshot reused by --use-cache",
+        min=0,
+    ),
+    cache_file: Optional[str] = typer.Option(
+        None,
+        "--cache-file",
+        help="Path to the snapshot database [default: ~/.cache/device-certificate-report/snapshots.sqlite3]",
+    ),
+    incremental: bool = typer.Option(
+        False,
+        "--incremental",
+        help="Only re-classify devices that changed since the last --incremental run and report the changes",
+    ),
+    output_format: OutputFormat = typer.Option(
+        OutputFormat.PDF,
+        "--format",
+        help="Report format; csv, jsonl, html and parquet are written as streams of device records",
+    ),
+    render_workers: Optional[int] = RENDER_WORKERS_OPTION,
+    expiring_within: Optional[int] = EXPIRING_WITHIN_OPTION,
+    report_cache: bool = REPORT_CACHE_OPTION,
+    report_cache_dir: Optional[str] = REPORT_CACHE_DIR_OPTION,
+    report_cache_size: int = REPORT_CACHE_SIZE_OPTION,
+    shard_by: Optional[ShardBy] = SHARD_BY_OPTION,
 ):
     """
     Connect to a Firewall appliance to retrieve device certificate information and generate the report.
 
     Parameters
     ----------
-    hostname : str
+    hostname : str, optional
         Hostname or IP address of the Firewall appliance.
-    username : str
+    username : str, optional
         Username for authentication with the Firewall appliance.
-    password : str
+    password : str, optional
         Password for authentication with the Firewall appliance.
     output_file : str, optional
-        The path to the output PDF report.
+        The path to the output report.
+    inventory_file : str, optional
+        Path to a file listing several firewalls. When given, they are
+        queried concurrently and merged into a single report; firewalls that
+        cannot be reached are listed in the report instead of ending the run.
+    max_workers : int, optional
+        Maximum number of firewalls queried at the same time.
+    timeout : int, optional
+        Per-request connect/read timeout in seconds.
+    retries : int, optional
+        Extra attempts for a firewall that could not be collected from.
+    async_transport : bool, optional
+        Query the appliances from one thread over keep-alive connections.
+    use_cache : bool, optional
+        Reuse a fresh snapshot instead of querying the appliances again.
+    cache_ttl : int, optional
+        Maximum age in seconds of a reused snapshot.
+    cache_file : str, optional
+        Path to the snapshot database.
+    incremental : bool, optional
+        Re-classify only devices that changed since the last incremental run.
+    output_format : OutputFormat, optional
+        The report format.
+    render_workers : int, optional
+        Number of processes rendering a PDF report, or the shards with
+        `shard_by`; None renders a report in this process and shards in one
+        process per CPU.
+    expiring_within : int, optional
+        Limit the certificate section to certificates expiring within this
+        many days.
+    report_cache : bool, optional
+        Reuse a cached report rendered from the same input.
+    report_cache_dir : str, optional
+        Directory of the report cache.
+    report_cache_size : int, optional
+        Size limit of the report cache in MiB.
+    shard_by : ShardBy, optional
+        Split the report by hardware family, source appliance or model.
     """
-    typer.echo(f"Connecting to Firewall at {hostname}")
-    try:
-        firewall = Firewall(hostname, username, password)
-        device = collect_data_from_firewall(firewall)
+    from panos.firewall import Firewall
 
-        # Now, filter device by model
-        affected_devices, unaffected_devices = filter_devices_by_model([device])
+    from device_certificate_report.components.data_collection import (
+        collect_data_from_firewall,
+    )
+    from device_certificate_report.components.fleet import (
+        collect_data_from_firewalls,
+        read_inventory,
+    )
+    from device_certificate_report.utilities.metrics import stage
 
-        # For affected devices, split by version
-        if affected_devices:
-            no_upgrade_required, upgrade_required = split_devices_by_version(
-                affected_devices
+    collection_failures = []
+    snapshots = open_snapshot_store(cache_file, cache_ttl, use_cache, incremental)
+    try:
+        if inventory_file:
+            hostnames = read_inventory(inventory_file)
+            username, password = prompt_credentials(
+                "Firewall",
+                username,
+                password,
+                snapshots,
+                [f"firewall/{hostname}" for hostname in hostnames],
+            )
+            typer.echo(
+                f"Connecting to {len(hostnames)} firewalls from {inventory_file}"
+            )
+            with stage("collect") as s:
+                devices, collection_failures = collect_data_from_firewalls(
+                    hostnames,
+                    username,
+                    password,
+                    max_workers=max_workers,
+                    timeout=timeout,
+                    retries=retries,
+                    snapshots=snapshots,
+                    async_transport=async_transport,
+                )
+                s.add(items=len(devices))
+            output_file = (
+                output_file or f"device_certificate_report{output_format.extension}"
             )
         else:
-            no_upgrade_required = []
-            upgrade_required = []
-
-        # Collect devices with GlobalProtect clients
-        devices_with_globalprotect = (
-            [device]
-            if device.globalprotect_client and device.globalprotect_client != "0"
-            else []
-        )
+            if not hostname:
+                hostname = typer.prompt("Firewall hostname or IP")
+            username, password = prompt_credentials(
+                "Firewall", username, password, snapshots, [f"firewall/{hostname}"]
+            )
 
-        # Collect devices with certificate status and expiry
-        devices_with_certificates = (
-            [device]
-            if device.device_certificate and device.device_certificate_expiry_date
-            else []
+            def collect():
+                typer.echo(f"Connecting to Firewall at {hostname}")
+                if async_transport:
+                    from device_certificate_report.components.async_xapi import (
+                        collect_firewall,
+                        collect_host,
+                    )
+
+                    return collect_host(
+                        hostname, collect_firewall, username, password, timeout
+                    )
+                kwargs = {"timeout": timeout} if timeout else {}
+                firewall = Firewall(hostname, username, password, **kwargs)
+                return [collect_data_from_firewall(firewall)]
+
+            with stage("collect") as s:
+                if snapshots is None:
+                    devices = collect()
+                else:
+                    devices = snapshots.get_or_collect(f"firewall/{hostname}", collect)
+                s.add(items=len(devices))
+            output_file = output_file or f"{hostname}{output_format.extension}"
+
+        source = os.path.abspath(inventory_file) if inventory_file else hostname
+        classification, changes = classify(
+            devices,
+            snapshots,
+            f"classified/firewall/{source}" if incremental else None,
         )
 
         # Generate the report
-        generate_report(
-            unaffected_devices=unaffected_devices,
-            no_upgrade_required=no_upgrade_required,
-            upgrade_required=upgrade_required,
-            devices_with_globalprotect=devices_with_globalprotect,
-            devices_with_certificates=devices_with_certificates,
-            output_file=output_file if len(output_file) > 0 else f"{hostname}.pdf",
-        )
-        typer.echo(
-            f"Report generated at {output_file if len(output_file) > 0 else f'{hostname}.pdf'}"
+        report_path = write_report(
+            output_format,
+            classification,
+            output_file,
+            expiring_within=expiring_within,
+            shard_by=shard_by,
+            render_workers=render_workers,
+            cache=open_report_cache(report_cache, report_cache_dir, report_cache_size),
+            collection_failures=collection_failures,
+            changes=changes,
+            include_source=bool(inventory_file),
         )
+        typer.echo(f"Report generated at {report_path}")
     except Exception as e:
         logger.error(f"Failed to process Firewall: {e}")
         sys.exit(1)
 
 
+# Subcommand for polling the fleet and serving the latest report
+@app.command()
+def serve(
+    panoramas: Optional[List[str]] = typer.Option(
+        None,
+        "--panorama",
+        help="Hostname or IP address of a Panorama appliance to poll; may be repeated",
+    ),
+    panorama_inventory: Optional[str] = typer.Option(
+        None,
+        "--panorama-inventory",
+        help="File listing Panorama appliances to poll, one per line",
+    ),
+    firewalls: Optional[List[str]] = typer.Option(
+        None,
+        "--firewall",
+        help="Hostname or IP address of a firewall to poll; may be repeated",
+    ),
+    firewall_inventory: Optional[str] = typer.Option(
+        None,
+        "--firewall-inventory",
+        help="File listing firewalls to poll, one per line",
+    ),
+    username: str = typer.Option(
+        ...,
+        "--username",
+        "-u",
+        help="Username for authentication with the appliances",
+        prompt="Username",
+    ),
+    password: str = typer.Option(
+        ...,
+        "--password",
+        "-p",
+        help="Password for authentication with the appliances",
+        prompt="Password",
+        hide_input=True,
+    ),
+    interval: int = typer.Option(
+        DEFAULT_POLL_INTERVAL,
+        "--interval",
+        help="Seconds between polls",
+        min=1,
+    ),
+    bind: str = typer.Option(
+        DEFAULT_SERVE_BIND,
+        "--bind",
+        help="Address the HTTP endpoint listens on",
+    ),
+    port: int = typer.Option(
+        DEFAULT_SERVE_PORT,
+        "--port",
+        help="Port the HTTP endpoint listens on",
+        min=0,
+        max=65535,
+    ),
+    max_workers: int = typer.Option(
+        DEFAULT_MAX_WORKERS,
+        "--max-workers",
+        help="Maximum number of appliances queried at the same time",
+        min=1,
+    ),
+    timeout: Optional[int] = typer.Option(
+        None,
+        "--timeout",
+        help="Per-request connect/read timeout in seconds for each appliance",
+        min=1,
+    ),
+    retries: int = typer.Option(
+        DEFAULT_RETRIES,
+        "--retries",
+        help="Extra attempts for an appliance that could not be collected from",
+        min=0,
+    ),
+    streaming: bool = typer.Option(
+        False,
+        "--streaming",
+        help="Parse Panorama device lists incrementally as they arrive to keep memory flat",
+    ),
+    output_format: OutputFormat = typer.Option(
+        OutputFormat.HTML,
+        "--format",
+        help="Format of the served report",
+    ),
+    expiring_within: Optional[int] = EXPIRING_WITHIN_OPTION,
+):
+    """
+    Poll Panorama appliances and firewalls on a schedule and serve the latest report over HTTP.
+
+    Sessions stay authenticated between polls and the classified fleet is
+    kept in memory, so each poll only re-classifies devices that changed and
+    only renders the report again when something did. The report is served
+    at `/report`, a JSON summary at `/summary.json` and a liveness check at
+    `/healthz`.
+
+    Parameters
+    ----------
+    panoramas : List[str], optional
+        Panorama appliances to poll.
+    panorama_inventory : str, optional
+        Path to a file listing more Panorama appliances.
+    firewalls : List[str], optional
+        Firewalls to poll.
+    firewall_inventory : str, optional
+        Path to a file listing more firewalls.
+    username : str
+        Username for authentication with the appliances.
+    password : str
+        Password for authentication with the appliances.
+    interval : int, optional
+        Seconds between polls.
+    bind : str, optional
+        Address the HTTP endpoint listens on.
+    port : int, optional
+        Port the HTTP endpoint listens on; 0 picks a free port.
+    max_workers : int, optional
+        Maximum number of appliances queried at the same time.
+    timeout : int, optional
+        Per-request connect/read timeout in seconds.
+    retries : int, optional
+        Extra attempts for an appliance that could not be collected from.
+    streaming : bool, optional
+        Parse Panorama device lists incrementally as they arrive.
+    output_format : OutputFormat, optional
+        The format of the served report.
+    expiring_within : int, optional
+        Limit the certificate section to certificates expiring within this
+        many days.
+    """
+    import threading
+
+    from device_certificate_report.components.daemon import (
+        FleetPoller,
+        ReportService,
+        make_server,
+    )
+    from device_certificate_report.components.fleet import read_inventory
+
+    panorama_hosts = list(panoramas or [])
+    firewall_hosts = list(firewalls or [])
+    try:
+        if panorama_inventory:
+            panorama_hosts += read_inventory(panorama_inventory)
+        if firewall_inventory:
+            firewall_hosts += read_inventory(firewall_inventory)
+    except OSError as e:
+        typer.echo(f"An error occurred: {e}", err=True)
+        raise typer.Exit(code=1)
+    if not panorama_hosts and not firewall_hosts:
+        typer.echo(
+            "Nothing to poll: give --panorama, --firewall or an inventory file.",
+            err=True,
+        )
+        raise typer.Exit(code=1)
+
+    poller = FleetPoller(
+        list(dict.fromkeys(panorama_hosts)),
+        list(dict.fromkeys(firewall_hosts)),
+        username,
+        password,
+        max_workers=max_workers,
+        timeout=timeout,
+        retries=retries,
+        streaming=streaming,
+    )
+    service = ReportService(
+        poller.poll, output_format=output_format, expiring_within=expiring_within
+    )
+    try:
+        server = make_server(service, bind, port)
+    except OSError as e:
+        typer.echo(f"Cannot listen on {bind}:{port}: {e}", err=True)
+        raise typer.Exit(code=1)
+
+    stop = threading.Event()
+    polling = threading.Thread(
+        target=service.run, args=(interval, stop), name="poll", daemon=True
+    )
+    polling.start()
+    host, bound_port = server.server_address[:2]
+    typer.echo(
+        f"Polling {len(poller.panoramas)} Panorama appliances and "
+        f"{len(poller.firewalls)} firewalls every {interval}s; "
+        f"serving the report at http://{host}:{bound_port}/report"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        typer.echo("Stopping.")
+    finally:
+        stop.set()
+        server.server_close()
+
+
 if __name__ == "__main__":
     app()
@@ -1,3 +1,4 @@
 # models/__init__.py
 
-from .device import DeviceInfo
+from .device import CollectionFailure, DeviceInfo
+from .device_table import DeviceRow, DeviceTable
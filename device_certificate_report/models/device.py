@@ -20,3 +20,13 @@ class DeviceInfo(BaseModel):
     globalprotect_client: Optional[str]
     min_required_version: Optional[str] = None
     notes: Optional[str] = None
+    source: Optional[str] = None
+
+
+class CollectionFailure(BaseModel):
+    """
+    Model representing a host that could not be collected from.
+    """
+
+    hostname: str
+    error: str
@@ -0,0 +1,234 @@
+# device_certificate_report/models/device_table.py
+
+import sys
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence
+
+from .device import DeviceInfo
+
+# Column order follows the DeviceInfo model
+DEVICE_FIELDS = tuple(DeviceInfo.model_fields)
+
+# Low-cardinality fields stored as small-int codes into a per-column category list
+CODED_FIELDS = (
+    "model",
+    "device_state",
+    "device_certificate",
+    "software_version",
+    "globalprotect_client",
+    "min_required_version",
+    "notes",
+    "source",
+)
+
+# High-cardinality fields stored as interned strings
+INTERNED_FIELDS = tuple(field for field in DEVICE_FIELDS if field not in CODED_FIELDS)
+
+
+class _Categories:
+    """
+    Append-only pool of distinct values for a coded column. Code 0 is always None.
+    """
+
+    __slots__ = ("values", "codes")
+
+    def __init__(self):
+        self.values: List[Optional[str]] = [None]
+        self.codes: Dict[Optional[str], int] = {None: 0}
+
+    def encode(self, value: Optional[str]) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            value = sys.intern(value)
+            self.values.append(value)
+            self.codes[value] = code
+        return code
+
+
+class DeviceRow:
+    """
+    Lightweight, attribute-style view of one row of a DeviceTable.
+
+    Reading or assigning a DeviceInfo field goes straight to the table's columns,
+    so code written against DeviceInfo objects also works over a table.
+    """
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: "DeviceTable", index: int):
+        object.__setattr__(self, "_table", table)
+        object.__setattr__(self, "_index", index)
+
+    def __getattr__(self, field: str) -> Optional[str]:
+        if field not in DEVICE_FIELDS:
+            raise AttributeError(field)
+        return self._table.get(self._index, field)
+
+    def __setattr__(self, field: str, value: Optional[str]):
+        if field not in DEVICE_FIELDS:
+            raise AttributeError(field)
+        self._table.set(self._index, field, value)
+
+    def to_device(self) -> DeviceInfo:
+        return self._table.device(self._index)
+
+    def __repr__(self):
+        return f"DeviceRow({self._table.record(self._index)!r})"
+
+
+class DeviceTable:
+    """
+    Columnar store of device information.
+
+    Holds the same fields as DeviceInfo without building a pydantic model per
+    device. High-cardinality fields are kept as interned strings and
+    low-cardinality fields (model, state, version, ...) as small-int codes, so
+    classifiers can work once per distinct value instead of once per device.
+    DeviceInfo objects are only built on demand.
+    """
+
+    def __init__(self):
+        self._categories: Dict[str, _Categories] = {
+            field: _Categories() for field in CODED_FIELDS
+        }
+        self._codes: Dict[str, array] = {field: array("H") for field in CODED_FIELDS}
+        self._strings: Dict[str, List[Optional[str]]] = {
+            field: [] for field in INTERNED_FIELDS
+        }
+        self._length = 0
+
+    @classmethod
+    def from_records(cls, records: Iterable[Mapping[str, Any]]) -> "DeviceTable":
+        """
+        Build a table from mappings keyed by DeviceInfo field name.
+        """
+        table = cls()
+        for record in records:
+            table.append(**record)
+        return table
+
+    @classmethod
+    def from_devices(cls, devices: Iterable[DeviceInfo]) -> "DeviceTable":
+        """
+        Build a table from existing DeviceInfo objects.
+        """
+        table = cls()
+        for device in devices:
+            table.append_device(device)
+        return table
+
+    def _store_code(self, field: str, index: Optional[int], code: int):
+        codes = self._codes[field]
+        if code > 0xFFFF and codes.typecode == "H":
+            # Widen the column once it outgrows 16-bit codes
+            codes = self._codes[field] = array("I", codes)
+        if index is None:
+            codes.append(code)
+        else:
+            codes[index] = code
+
+    def append(self, **fields: Optional[str]):
+        """
+        Append one device. Missing fields are stored as None.
+        """
+        unknown = set(fields).difference(DEVICE_FIELDS)
+        if unknown:
+            raise TypeError(f"Unknown device field(s): {', '.join(sorted(unknown))}")
+        for field in CODED_FIELDS:
+            code = self._categories[field].encode(fields.get(field))
+            self._store_code(field, None, code)
+        for field in INTERNED_FIELDS:
+            value = fields.get(field)
+            self._strings[field].append(
+                sys.intern(value) if value is not None else None
+            )
+        self._length += 1
+
+    def append_device(self, device: DeviceInfo):
+        self.append(**{field: getattr(device, field) for field in DEVICE_FIELDS})
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[DeviceRow]:
+        for index in range(self._length):
+            yield DeviceRow(self, index)
+
+    def __getitem__(self, index: int) -> DeviceRow:
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("DeviceTable index out of range")
+        return DeviceRow(self, index)
+
+    def get(self, index: int, field: str) -> Optional[str]:
+        if field in self._codes:
+            return self._categories[field].values[self._codes[field][index]]
+        return self._strings[field][index]
+
+    def set(self, index: int, field: str, value: Optional[str]):
+        if field in self._codes:
+            self._store_code(field, index, self._categories[field].encode(value))
+        else:
+            self._strings[field][index] = (
+                sys.intern(value) if value is not None else None
+            )
+
+    def codes(self, field: str) -> array:
+        """
+        Return the code column for a coded field. Decode with `categories`.
+        """
+        return self._codes[field]
+
+    def categories(self, field: str) -> List[Optional[str]]:
+        """
+        Return the distinct values of a coded field, indexed by code.
+        """
+        return self._categories[field].values
+
+    def column(self, field: str) -> List[Optional[str]]:
+        """
+        Return the decoded values of one field for every row.
+        """
+        if field in self._codes:
+            values = self._categories[field].values
+            return [values[code] for code in self._codes[field]]
+        return list(self._strings[field])
+
+    def record(self, index: int) -> Dict[str, Optional[str]]:
+        return {field: self.get(index, field) for field in DEVICE_FIELDS}
+
+    def device(self, index: int) -> DeviceInfo:
+        """
+        Materialize one row as a DeviceInfo.
+        """
+        return DeviceInfo(**self.record(index))
+
+    def to_devices(self, indices: Optional[Iterable[int]] = None) -> List[DeviceInfo]:
+        """
+        Materialize the given rows (all rows by default) as DeviceInfo objects.
+        """
+        if indices is None:
+            indices = range(self._length)
+        return [self.device(index) for index in indices]
+
+    def take(self, indices: Sequence[int]) -> "DeviceTable":
+        """
+        Return a new table holding the given rows, in the given order.
+
+        Category pools are append-only, so they are shared with this table
+        rather than copied.
+        """
+        table = DeviceTable.__new__(DeviceTable)
+        table._categories = self._categories
+        table._codes = {
+            field: array(codes.typecode, [codes[i] for i in indices])
+            for field, codes in self._codes.items()
+        }
+        table._strings = {
+            field: [values[i] for i in indices]
+            for field, values in self._strings.items()
+        }
+        table._length = len(indices)
+        return table
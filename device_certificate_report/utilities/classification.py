@@ -0,0 +1,303 @@
+# device_certificate_report/utilities/classification.py
+
+"""
+Single-pass classification of a fleet into the report's sections.
+
+Every report section is filled in one walk over the devices, which may be a
+list or a stream (e.g. `iter_csv_devices`). The subcommands use this module,
+and it can be called from other Python code:
+
+    from device_certificate_report.utilities.classification import classify_devices
+
+    classification = classify_devices(devices)
+    classification.upgrade_required  # List[DeviceInfo]
+    classification.counters          # Counter of devices per bucket and outcome
+"""
+
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from device_certificate_report.models.device import DeviceInfo
+from device_certificate_report.models.device_table import DeviceTable
+from device_certificate_report.utilities.filters import (
+    NO_UPGRADE_REQUIRED,
+    UNAFFECTED,
+    UPGRADE_REQUIRED,
+    classify_model_version,
+)
+
+__all__ = [
+    "BUCKETS",
+    "CERTIFICATES",
+    "GLOBALPROTECT",
+    "Classification",
+    "Classifier",
+    "classify_devices",
+    "classify_table",
+]
+
+# Buckets for devices with a GlobalProtect client and with certificate details;
+# a device is in these in addition to one of the three classification buckets
+GLOBALPROTECT = "globalprotect"
+CERTIFICATES = "certificates"
+
+# Every bucket, in report order
+BUCKETS = (
+    UNAFFECTED,
+    NO_UPGRADE_REQUIRED,
+    UPGRADE_REQUIRED,
+    GLOBALPROTECT,
+    CERTIFICATES,
+)
+
+# Counter keys besides the bucket names
+DEVICES = "devices"
+UNRECOGNIZED_MODEL = "unrecognized_model"
+UNKNOWN_VERSION = "unknown_version"
+
+
+class Classification(NamedTuple):
+    # Devices keyed by bucket name, each list in input order
+    buckets: Dict[str, List[DeviceInfo]]
+    # Devices per bucket, the total under "devices", and how many devices were
+    # classified from an unrecognized model or a missing or unparsable version
+    counters: Counter
+
+    @property
+    def unaffected(self) -> List[DeviceInfo]:
+        return self.buckets[UNAFFECTED]
+
+    @property
+    def no_upgrade_required(self) -> List[DeviceInfo]:
+        return self.buckets[NO_UPGRADE_REQUIRED]
+
+    @property
+    def upgrade_required(self) -> List[DeviceInfo]:
+        return self.buckets[UPGRADE_REQUIRED]
+
+    @property
+    def globalprotect(self) -> List[DeviceInfo]:
+        return self.buckets[GLOBALPROTECT]
+
+    @property
+    def certificates(self) -> List[DeviceInfo]:
+        return self.buckets[CERTIFICATES]
+
+    def sections(self) -> Dict[str, List[DeviceInfo]]:
+        """
+        The report sections, keyed like the arguments of `render_report`.
+        """
+        return dict(
+            unaffected_devices=self.unaffected,
+            no_upgrade_required=self.no_upgrade_required,
+            upgrade_required=self.upgrade_required,
+            devices_with_globalprotect=self.globalprotect,
+            devices_with_certificates=self.certificates,
+        )
+
+    def summary(self) -> str:
+        counters = self.counters
+        return (
+            f"{counters[DEVICES]} devices: {counters[UNAFFECTED]} unaffected, "
+            f"{counters[NO_UPGRADE_REQUIRED]} without and "
+            f"{counters[UPGRADE_REQUIRED]} with a software upgrade required, "
+            f"{counters[GLOBALPROTECT]} with GlobalProtect clients, "
+            f"{counters[CERTIFICATES]} with certificate details"
+        )
+
+
+class Classifier:
+    """
+    Accumulates devices into every bucket they belong to.
+
+    A device's model and software version decide its classification bucket
+    together with its `notes` and `min_required_version`, so the outcome is
+    worked out once per distinct pair and reused for the rest of the fleet.
+    """
+
+    def __init__(self, is_global_protect: bool = False):
+        self.is_global_protect = is_global_protect
+        self.buckets: Dict[str, List[DeviceInfo]] = {bucket: [] for bucket in BUCKETS}
+        self.counters: Counter = Counter()
+        self._outcomes: Dict[
+            Tuple[Optional[str], Optional[str]],
+            Tuple[str, Optional[str], Optional[str]],
+        ] = {}
+
+    def add(self, device: DeviceInfo, bucket: Optional[str] = None) -> str:
+        """
+        Add a device and return its classification bucket.
+
+        Parameters
+        ----------
+        device : DeviceInfo
+            The device; its `notes` and `min_required_version` are set as
+            `classify_device` would.
+        bucket : str, optional
+            A bucket decided elsewhere (e.g. carried over from a previous run).
+            The device is then not classified again and its fields are left
+            as they are; its `notes` still count towards the counters.
+
+        Returns
+        -------
+        str
+            UNAFFECTED, NO_UPGRADE_REQUIRED or UPGRADE_REQUIRED.
+        """
+        if bucket is None:
+            bucket = self._classify(device)
+        elif device.notes is not None:
+            self.counters[
+                UNRECOGNIZED_MODEL if bucket == UNAFFECTED else UNKNOWN_VERSION
+            ] += 1
+        buckets = self.buckets
+        buckets[bucket].append(device)
+        if device.globalprotect_client and device.globalprotect_client != "0":
+            buckets[GLOBALPROTECT].append(device)
+        if device.device_certificate and device.device_certificate_expiry_date:
+            buckets[CERTIFICATES].append(device)
+        return bucket
+
+    def extend(self, devices: Iterable[DeviceInfo]):
+        """
+        Add every device of `devices`; the same as calling `add` on each, with
+        the loop kept free of per-device method calls for large fleets.
+        """
+        outcomes = self._outcomes
+        classify = self._classify
+        append = {bucket: devices.append for bucket, devices in self.buckets.items()}
+        append_globalprotect = append[GLOBALPROTECT]
+        append_certificate = append[CERTIFICATES]
+        for device in devices:
+            outcome = outcomes.get((device.model, device.software_version))
+            if outcome is None:
+                bucket = classify(device)
+            else:
+                bucket, notes, min_required_version = outcome
+                if min_required_version is not None:
+                    device.min_required_version = min_required_version
+                elif notes is not None:
+                    # Rare; counted along with setting the notes
+                    classify(device)
+            append[bucket](device)
+            globalprotect_client = device.globalprotect_client
+            if globalprotect_client and globalprotect_client != "0":
+                append_globalprotect(device)
+            if device.device_certificate and device.device_certificate_expiry_date:
+                append_certificate(device)
+
+    def _classify(self, device: DeviceInfo) -> str:
+        key = (device.model, device.software_version)
+        outcome = self._outcomes.get(key)
+        if outcome is None:
+            outcome = self._outcomes[key] = classify_model_version(
+                *key, self.is_global_protect
+            )
+        bucket, notes, min_required_version = outcome
+        if notes is not None:
+            device.notes = notes
+            self.counters[
+                UNRECOGNIZED_MODEL if bucket == UNAFFECTED else UNKNOWN_VERSION
+            ] += 1
+        if min_required_version is not None:
+            device.min_required_version = min_required_version
+        return bucket
+
+    def result(self) -> Classification:
+        counters = Counter(self.counters)
+        for bucket, devices in self.buckets.items():
+            counters[bucket] = len(devices)
+        counters[DEVICES] = (
+            counters[UNAFFECTED]
+            + counters[NO_UPGRADE_REQUIRED]
+            + counters[UPGRADE_REQUIRED]
+        )
+        return Classification(self.buckets, counters)
+
+
+def classify_devices(
+    devices: Iterable[DeviceInfo], is_global_protect: bool = False
+) -> Classification:
+    """
+    Sort devices into every report bucket in a single pass.
+
+    Gives the same buckets, `notes` and `min_required_version` as
+    `filter_devices_by_model` followed by `split_devices_by_version`, plus the
+    GlobalProtect and certificate sections.
+
+    Parameters
+    ----------
+    devices : Iterable[DeviceInfo]
+        The devices to classify; consumed once, so a generator may be passed.
+    is_global_protect : bool, optional
+        Check versions against the fixes for devices running GlobalProtect.
+
+    Returns
+    -------
+    Classification
+        The devices by bucket, and summary counters.
+    """
+    classifier = Classifier(is_global_protect)
+    classifier.extend(devices)
+    return classifier.result()
+
+
+def classify_table(
+    table: DeviceTable, is_global_protect: bool = False
+) -> Classification:
+    """
+    Columnar counterpart of `classify_devices`.
+
+    Each distinct model and software version pair is classified once, from
+    the table's coded columns, and every bucket is a DeviceTable of the rows
+    in it, in table order. `notes` and `min_required_version` are set on the
+    rows as `classify_devices` sets them on DeviceInfo objects.
+
+    Parameters
+    ----------
+    table : DeviceTable
+        The devices to classify.
+    is_global_protect : bool, optional
+        Check versions against the fixes for devices running GlobalProtect.
+
+    Returns
+    -------
+    Classification
+        The devices by bucket, and summary counters.
+    """
+    models = table.categories("model")
+    versions = table.categories("software_version")
+    globalprotect_clients = table.column("globalprotect_client")
+    certificates = table.column("device_certificate")
+    expiry_dates = table.column("device_certificate_expiry_date")
+
+    outcomes: Dict[Tuple[int, int], Tuple[str, Optional[str], Optional[str]]] = {}
+    rows: Dict[str, List[int]] = {bucket: [] for bucket in BUCKETS}
+    counters: Counter = Counter()
+    for index, key in enumerate(
+        zip(table.codes("model"), table.codes("software_version"))
+    ):
+        outcome = outcomes.get(key)
+        if outcome is None:
+            outcome = outcomes[key] = classify_model_version(
+                models[key[0]], versions[key[1]], is_global_protect
+            )
+        bucket, notes, min_required_version = outcome
+        if notes is not None:
+            table.set(index, "notes", notes)
+            counters[
+                UNRECOGNIZED_MODEL if bucket == UNAFFECTED else UNKNOWN_VERSION
+            ] += 1
+        if min_required_version is not None:
+            table.set(index, "min_required_version", min_required_version)
+        rows[bucket].append(index)
+        globalprotect_client = globalprotect_clients[index]
+        if globalprotect_client and globalprotect_client != "0":
+            rows[GLOBALPROTECT].append(index)
+        if certificates[index] and expiry_dates[index]:
+            rows[CERTIFICATES].append(index)
+
+    buckets = {bucket: table.take(indices) for bucket, indices in rows.items()}
+    for bucket, indices in rows.items():
+        counters[bucket] = len(indices)
+    counters[DEVICES] = len(table)
+    return Classification(buckets, counters)
@@ -2,45 +2,77 @@
 
 import re
 import csv
+import html
+
+from typing import Iterator, List, Optional
+
+# Compiled once; most cells match none of these and skip them entirely
+HTML_TAG = re.compile(r"<[^>]+>")
+QUOTED_SEMICOLONS = re.compile(r'";+"')
+REPEATED_QUOTES = re.compile(r'""+')
 
 
 def clean_html_tags(text: str):
     """
     :param text: The input string that may contain HTML tags and extraneous characters.
-    :return: A cleaned string with HTML tags removed, extra quotes and semicolons normalized, and leading/trailing whitespace stripped.
+    :return: A cleaned string with HTML tags removed, HTML entities decoded, extra quotes and semicolons normalized, and leading/trailing whitespace stripped.
     """
+    # Fast path: nothing to remove or decode, which is true of most cells
+    if "<" not in text and '"' not in text and "&" not in text:
+        return text.strip()
     # Remove all HTML tags
-    cleaned = re.sub(r"<[^>]+>", "", text)
+    cleaned = HTML_TAG.sub("", text) if "<" in text else text
     # Remove extra quotes and semicolons that might have been introduced
-    cleaned = re.sub(r'";+"', ";", cleaned)
-    cleaned = re.sub(r'"+', '"', cleaned)
+    if '"' in cleaned:
+        cleaned = QUOTED_SEMICOLONS.sub(";", cleaned)
+        cleaned = REPEATED_QUOTES.sub('"', cleaned)
+    # Decode entities such as &amp; last, so decoded text is kept as is
+    if "&" in cleaned:
+        cleaned = html.unescape(cleaned)
     # Remove any leading/trailing whitespace
     return cleaned.strip()
 
 
+def iter_cleaned_rows(input_file: str) -> Iterator[List[str]]:
+    """
+    :param input_file: Path to the input CSV file that needs to be cleaned.
+    :return: An iterator over the cleaned rows, read one at a time so the file is never held in memory.
+    """
+    with open(
+        input_file,
+        "r",
+        newline="",
+        encoding="utf-8-sig",
+    ) as infile:
+        for row in csv.reader(infile):
+            yield [clean_html_tags(cell) for cell in row]
+
+
 def clean_csv(
     input_file: str,
     output_file: str,
+    workers: Optional[int] = 1,
 ):
     """
     :param input_file: Path to the input CSV file that needs to be cleaned.
     :param output_file: Path to the output CSV file where the cleaned data will be saved.
+    :param workers: Number of processes cleaning the file in chunks; 1 cleans it in this process and None uses one per CPU.
     :return: None
+    :raises ValueError: If workers is less than 1.
     """
+    if workers is not None and workers < 1:
+        raise ValueError(f"workers must be at least 1 or None, not {workers}")
+    if workers != 1:
+        from device_certificate_report.components.parallel_csv import clean_csv_chunks
+
+        clean_csv_chunks(input_file, output_file, workers)
+        return
+
     with open(
-        input_file,
-        "r",
-        newline="",
-        encoding="utf-8-sig",
-    ) as infile, open(
         output_file,
         "w",
         newline="",
         encoding="utf-8",
     ) as outfile:
-        reader = csv.reader(infile)
         writer = csv.writer(outfile, quoting=csv.QUOTE_MINIMAL)
-
-        for row in reader:
-            cleaned_row = [clean_html_tags(cell) for cell in row]
-            writer.writerow(cleaned_row)
+        writer.writerows(iter_cleaned_rows(input_file))
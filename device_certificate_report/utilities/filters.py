@@ -1,33 +1,45 @@
 # device_certificate_report/components/filters.py
 
-from typing import List, Tuple
-from device_certificate_report.config.hardware_families import (
-    AffectedModels,
-    UnaffectedModels,
-)
-from device_certificate_report.config.panos_versions import MinimumPatchedVersions
+from typing import Iterable, List, Optional, Tuple
 from device_certificate_report.models.device import DeviceInfo
-from device_certificate_report.components.version import parse_version
+from device_certificate_report.models.device_table import DeviceTable
+from device_certificate_report.components.advisory import get_advisory_index
+from device_certificate_report.components.model_index import (
+    AFFECTED_MODEL,
+    UNAFFECTED_MODEL,
+    resolve_model,
+)
+
+# Bucket names returned by classify_device
+UNAFFECTED = "unaffected"
+NO_UPGRADE_REQUIRED = "no_upgrade_required"
+UPGRADE_REQUIRED = "upgrade_required"
 
 
 def is_affected_model(model: str) -> bool:
-    return model in AffectedModels
+    return resolve_model(model).status == AFFECTED_MODEL
 
 
 def is_unaffected_model(model: str) -> bool:
-    return model in UnaffectedModels
+    return resolve_model(model).status == UNAFFECTED_MODEL
 
 
 def filter_devices_by_model(
-    devices: List[DeviceInfo],
+    devices: Iterable[DeviceInfo],
 ) -> Tuple[List[DeviceInfo], List[DeviceInfo]]:
     affected_devices = []
     unaffected_devices = []
+    # Status per distinct model string seen by this call
+    statuses = {}
     for device in devices:
         model = device.model
-        if is_affected_model(model):
+        try:
+            status = statuses[model]
+        except KeyError:
+            status = statuses[model] = resolve_model(model).status
+        if status == AFFECTED_MODEL:
             affected_devices.append(device)
-        elif is_unaffected_model(model):
+        elif status == UNAFFECTED_MODEL:
             unaffected_devices.append(device)
         else:
             # Devices not listed are considered unaffected but should be logged
@@ -43,38 +55,7 @@ def is_version_affected(
     Check if the device's software version is affected.
     Returns a tuple (is_affected: bool, min_required_version: str)
     """
-    try:
-        current_version = parse_version(device_version)
-    except ValueError as e:
-        raise ValueError(f"Error parsing version '{device_version}': {e}")
-
-    # Check if the version is 11.2 or later
-    if current_version.major > 11 or (
-        current_version.major == 11 and current_version.feature >= 2
-    ):
-        return False, ""  # Versions 11.2 and later are not affected
-
-    # Construct the feature release string
-    feature_release = f"{current_version.major}.{current_version.feature}"
-    if is_global_protect and feature_release in ["10.2", "11.0", "11.1"]:
-        feature_release += "-gp"
-
-    min_versions = MinimumPatchedVersions.get(feature_release)
-    if not min_versions:
-        # Handle versions earlier than 8.1
-        if current_version.major < 8 or (
-            current_version.major == 8 and current_version.feature < 1
-        ):
-            return True, "8.1.0"  # Versions earlier than 8.1 are considered affected
-        # Unknown feature release
-        return False, ""
-
-    for min_version in min_versions:
-        if current_version < min_version:
-            min_required_version = repr(min_version)
-            return True, min_required_version
-
-    return False, ""
+    return get_advisory_index().lookup(device_version, is_global_protect)
 
 
 def split_devices_by_version(
@@ -110,3 +91,126 @@ def split_devices_by_version(
             no_upgrade_required.append(device)
 
     return no_upgrade_required, upgrade_required
+
+
+def classify_model_version(
+    model: Optional[str],
+    software_version: Optional[str],
+    is_global_protect: bool = False,
+) -> Tuple[str, Optional[str], Optional[str]]:
+    """
+    Classify a model and software version pair.
+    Returns (bucket, notes, min_required_version); notes and
+    min_required_version are None when the device's fields are left as they are.
+    """
+    status = resolve_model(model).status
+    if status != AFFECTED_MODEL:
+        if status is None:
+            # Devices not listed are considered unaffected but should be logged
+            return UNAFFECTED, "Model not recognized; considered unaffected.", None
+        return UNAFFECTED, None, None
+
+    if not software_version:
+        return (
+            UPGRADE_REQUIRED,
+            "Software version missing; cannot determine if upgrade is required.",
+            None,
+        )
+    try:
+        affected, min_required_version = is_version_affected(
+            software_version, is_global_protect
+        )
+    except ValueError as e:
+        return UPGRADE_REQUIRED, f"Version parsing error: {e}", None
+
+    if affected:
+        return UPGRADE_REQUIRED, None, min_required_version
+    return NO_UPGRADE_REQUIRED, None, None
+
+
+def classify_device(device: DeviceInfo, is_global_protect: bool = False) -> str:
+    """
+    Classify a single device the same way `filter_devices_by_model` followed by
+    `split_devices_by_version` would, setting `notes` and `min_required_version`.
+    Returns UNAFFECTED, NO_UPGRADE_REQUIRED or UPGRADE_REQUIRED.
+    """
+    bucket, notes, min_required_version = classify_model_version(
+        device.model, device.software_version, is_global_protect
+    )
+    if notes is not None:
+        device.notes = notes
+    if min_required_version is not None:
+        device.min_required_version = min_required_version
+    return bucket
+
+
+def filter_table_by_model(table: DeviceTable) -> Tuple[DeviceTable, DeviceTable]:
+    """
+    Columnar counterpart of `filter_devices_by_model`.
+    Each distinct model is looked up once; returns (affected, unaffected) tables.
+    """
+    model_status = [
+        (status == AFFECTED_MODEL, status == UNAFFECTED_MODEL)
+        for status in (
+            resolve_model(model).status for model in table.categories("model")
+        )
+    ]
+    affected_rows = []
+    unaffected_rows = []
+    for index, code in enumerate(table.codes("model")):
+        affected, unaffected = model_status[code]
+        if affected:
+            affected_rows.append(index)
+        else:
+            if not unaffected:
+                # Devices not listed are considered unaffected but should be logged
+                table.set(
+                    index, "notes", "Model not recognized; considered unaffected."
+                )
+            unaffected_rows.append(index)
+    return table.take(affected_rows), table.take(unaffected_rows)
+
+
+def split_table_by_version(
+    table: DeviceTable, is_global_protect: bool = False
+) -> Tuple[DeviceTable, DeviceTable]:
+    """
+    Columnar counterpart of `split_devices_by_version`.
+    Each distinct software version is checked once; returns
+    (no_upgrade_required, upgrade_required) tables.
+    """
+    version_status = []
+    for device_version in table.categories("software_version"):
+        if not device_version:
+            version_status.append(
+                (
+                    True,
+                    None,
+                    "Software version missing; cannot determine if upgrade is required.",
+                )
+            )
+            continue
+        try:
+            affected, min_required_version = is_version_affected(
+                device_version, is_global_protect
+            )
+        except ValueError as e:
+            version_status.append((True, None, f"Version parsing error: {e}"))
+            continue
+        version_status.append(
+            (affected, min_required_version if affected else None, None)
+        )
+
+    no_upgrade_rows = []
+    upgrade_rows = []
+    for index, code in enumerate(table.codes("software_version")):
+        upgrade, min_required_version, notes = version_status[code]
+        if not upgrade:
+            no_upgrade_rows.append(index)
+            continue
+        if min_required_version is not None:
+            table.set(index, "min_required_version", min_required_version)
+        if notes is not None:
+            table.set(index, "notes", notes)
+        upgrade_rows.append(index)
+    return table.take(no_upgrade_rows), table.take(upgrade_rows)
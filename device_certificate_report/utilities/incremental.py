@@ -0,0 +1,287 @@
+# device_certificate_report/utilities/incremental.py
+
+import logging
+
+from operator import attrgetter
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from device_certificate_report.models.device import DeviceInfo
+from device_certificate_report.utilities.classification import (
+    Classification,
+    Classifier,
+)
+from device_certificate_report.utilities.report_cache import _advisory_digest
+from device_certificate_report.utilities.snapshot import (
+    ClassifiedRow,
+    ClassifiedState,
+    SnapshotStore,
+)
+
+logger = logging.getLogger(__name__)
+
+# Fields compared between runs; a difference in any of them marks the device changed
+TRACKED_FIELDS = (
+    "device_name",
+    "model",
+    "ipv4_address",
+    "device_state",
+    "device_certificate",
+    "device_certificate_expiry_date",
+    "software_version",
+    "globalprotect_client",
+)
+
+# Fields the classification depends on; only these force a re-classification
+CLASSIFIED_FIELDS = ("model", "software_version")
+
+_tracked_values = attrgetter(*TRACKED_FIELDS)
+_classified_positions = tuple(TRACKED_FIELDS.index(f) for f in CLASSIFIED_FIELDS)
+
+# Fingerprints join the tracked fields with a unit separator, None as NUL
+_SEPARATOR = "\x1f"
+_NONE = "\x00"
+
+
+class DeviceChange(NamedTuple):
+    serial_number: str
+    kind: str  # "added", "changed" or "removed"
+    device: DeviceInfo
+    # Changed fields mapped to their (previous, current) values; empty for
+    # added and removed devices
+    fields: Dict[str, Tuple[Optional[str], Optional[str]]]
+
+    @property
+    def details(self) -> str:
+        """
+        The changed fields as text, e.g. "software_version: 10.1.0 -> 11.0.0".
+        """
+        return "; ".join(
+            f"{field}: {before or '-'} -> {after or '-'}"
+            for field, (before, after) in self.fields.items()
+        )
+
+
+class SnapshotDiff(NamedTuple):
+    added: List[DeviceChange]
+    changed: List[DeviceChange]
+    removed: List[DeviceChange]
+    unchanged: int
+
+    @property
+    def changes(self) -> List[DeviceChange]:
+        return self.added + self.changed + self.removed
+
+
+class IncrementalResult(NamedTuple):
+    classification: Classification
+    diff: Optional[SnapshotDiff]
+    reclassified: int
+
+    @property
+    def buckets(self) -> Dict[str, List[DeviceInfo]]:
+        return self.classification.buckets
+
+
+class ClassifiedUpdate(NamedTuple):
+    """
+    The changes to apply to the stored classification results after a run.
+    """
+
+    # Rows of added and changed devices, keyed by serial number
+    upserts: Dict[str, ClassifiedRow]
+    # Serial numbers of removed devices
+    deleted: List[str]
+    advisory_digest: Optional[str]
+    # Whether `upserts` holds every row and replaces the previous results
+    replace: bool
+
+    def apply(self, state: Optional[ClassifiedState]) -> ClassifiedState:
+        """
+        Return `state` with this update applied; its rows are updated in place.
+        """
+        if state is None or self.replace:
+            return ClassifiedState(dict(self.upserts), self.advisory_digest)
+        rows = state.rows
+        rows.update(self.upserts)
+        for serial_number in self.deleted:
+            rows.pop(serial_number, None)
+        return ClassifiedState(rows, self.advisory_digest)
+
+
+def fingerprint(device: DeviceInfo) -> str:
+    """
+    Encode the tracked fields of `device` as one string, for comparing and
+    storing them without building a DeviceInfo.
+    """
+    return _SEPARATOR.join(
+        _NONE if value is None else value for value in _tracked_values(device)
+    )
+
+
+def _decode(fingerprint: str) -> Tuple[Optional[str], ...]:
+    return tuple(
+        None if value == _NONE else value for value in fingerprint.split(_SEPARATOR)
+    )
+
+
+def _removed_device(serial_number: str, row: ClassifiedRow) -> DeviceInfo:
+    return DeviceInfo(
+        serial_number=serial_number,
+        min_required_version=row.min_required_version,
+        notes=row.notes,
+        **dict(zip(TRACKED_FIELDS, _decode(row.fingerprint))),
+    )
+
+
+def classify_incrementally(
+    devices: List[DeviceInfo],
+    previous: Optional[ClassifiedState] = None,
+    advisory_digest: Optional[str] = None,
+) -> Tuple[IncrementalResult, ClassifiedUpdate]:
+    """
+    Classify devices, reusing the results recorded by a previous run.
+
+    Devices are matched to the previous results by serial number and compared
+    by fingerprint. Devices that are new, or whose model or software version
+    changed, go through the classifier, which works out each distinct model
+    and version once; every other device takes its bucket, minimum required
+    version and notes from the previous run. Devices without a serial number
+    are always classified. If the previous results were worked out against
+    other advisory tables than `advisory_digest`, nothing is reused and every
+    device is classified, though the diff is still computed.
+
+    Parameters
+    ----------
+    devices : List[DeviceInfo]
+        The newly collected devices.
+    previous : ClassifiedState, optional
+        The results of the last run over the same source.
+    advisory_digest : str, optional
+        Digest of the advisory tables in use, compared with the one recorded
+        in `previous`.
+
+    Returns
+    -------
+    Tuple[IncrementalResult, ClassifiedUpdate]
+        The classification of all devices together with the diff against the
+        previous run (None without one), and the rows to store for the next
+        run: only those of added, changed and removed devices, unless every
+        device was classified afresh.
+    """
+    classifier = Classifier()
+    add = classifier.add
+    previous_rows = previous.rows if previous is not None else {}
+    reuse = previous is not None and previous.advisory_digest == advisory_digest
+    if previous is not None and not reuse:
+        logger.info(
+            "Advisory tables changed since the last run; re-classifying all devices."
+        )
+
+    added = []
+    changed = []
+    upserts: Dict[str, ClassifiedRow] = {}
+    unchanged = 0
+    reclassified = 0
+    seen = set()
+
+    for device in devices:
+        serial_number = device.serial_number
+        if not serial_number or serial_number in seen:
+            add(device)
+            reclassified += 1
+            continue
+        seen.add(serial_number)
+        current = fingerprint(device)
+        row = previous_rows.get(serial_number)
+
+        if row is None:
+            bucket = add(device)
+            reclassified += 1
+            if previous_rows:
+                added.append(DeviceChange(serial_number, "added", device, {}))
+        elif row.fingerprint == current:
+            unchanged += 1
+            if reuse:
+                # Fresh devices carry no results, so these are rarely set
+                if row.min_required_version != device.min_required_version:
+                    device.min_required_version = row.min_required_version
+                if row.notes != device.notes:
+                    device.notes = row.notes
+                add(device, row.bucket)
+                continue
+            bucket = add(device)
+            reclassified += 1
+        else:
+            before = _decode(row.fingerprint)
+            after = _decode(current)
+            changed.append(
+                DeviceChange(
+                    serial_number,
+                    "changed",
+                    device,
+                    {
+                        field: (old, new)
+                        for field, old, new in zip(TRACKED_FIELDS, before, after)
+                        if old != new
+                    },
+                )
+            )
+            if reuse and all(
+                before[position] == after[position]
+                for position in _classified_positions
+            ):
+                bucket = row.bucket
+                device.min_required_version = row.min_required_version
+                device.notes = row.notes
+                add(device, bucket)
+            else:
+                bucket = add(device)
+                reclassified += 1
+        upserts[serial_number] = ClassifiedRow(
+            current, bucket, device.min_required_version, device.notes
+        )
+
+    diff = None
+    deleted = [
+        serial_number for serial_number in previous_rows if serial_number not in seen
+    ]
+    if previous_rows:
+        removed = [
+            DeviceChange(
+                serial_number,
+                "removed",
+                _removed_device(serial_number, previous_rows[serial_number]),
+                {},
+            )
+            for serial_number in deleted
+        ]
+        diff = SnapshotDiff(added, changed, removed, unchanged)
+        logger.info(
+            f"Since last run: {len(added)} added, {len(changed)} changed, "
+            f"{len(removed)} removed, {unchanged} unchanged; "
+            f"re-classified {reclassified} of {len(devices)} devices."
+        )
+
+    update = ClassifiedUpdate(upserts, deleted, advisory_digest, replace=not reuse)
+    return IncrementalResult(classifier.result(), diff, reclassified), update
+
+
+def classify_with_snapshot(
+    devices: List[DeviceInfo], store: SnapshotStore, key: str
+) -> IncrementalResult:
+    """
+    Classify devices against the results stored under `key`, then store the
+    rows of the devices that were added, changed or removed, together with
+    the digest of the advisory tables they were classified against.
+    """
+    advisory_digest = _advisory_digest().hex()
+    previous = store.load_classified(key)
+    result, update = classify_incrementally(devices, previous, advisory_digest)
+    store.save_classified(
+        key,
+        update.upserts,
+        update.deleted,
+        update.advisory_digest,
+        replace=update.replace,
+    )
+    return result
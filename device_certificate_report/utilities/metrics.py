@@ -0,0 +1,317 @@
+# device_certificate_report/utilities/metrics.py
+
+import json
+import sys
+import threading
+import time
+
+from typing import (
+    IO,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    TypeVar,
+)
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+T = TypeVar("T")
+
+
+def peak_rss_mib() -> Optional[float]:
+    """
+    Return the peak resident set size of this process so far, in MiB.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and KiB elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class StageRecord(NamedTuple):
+    name: str
+    thread: str
+    # Seconds since recording was enabled
+    start: float
+    wall_seconds: float
+    cpu_seconds: float
+    # Time spent in stages nested inside this one, excluded from the self times
+    self_wall_seconds: float
+    self_cpu_seconds: float
+    items: int
+    bytes: int
+    peak_rss_mib: Optional[float]
+
+
+class MetricsRecorder:
+    """
+    Collects the records of finished stages from any thread.
+    """
+
+    def __init__(self):
+        self.stages: List["_Stage"] = []
+        self.started = time.perf_counter()
+        self._started_cpu = time.process_time()
+        self._lock = threading.Lock()
+
+    def add(self, stage: "_Stage"):
+        with self._lock:
+            self.stages.append(stage)
+
+    @property
+    def records(self) -> List[StageRecord]:
+        with self._lock:
+            return [stage.record() for stage in self.stages]
+
+    def totals(self) -> Dict[str, Dict[str, float]]:
+        """
+        Aggregate the records by stage name, in order of first appearance.
+        """
+        totals: Dict[str, Dict[str, float]] = {}
+        for record in self.records:
+            total = totals.setdefault(
+                record.name,
+                dict(
+                    count=0,
+                    wall_seconds=0.0,
+                    self_wall_seconds=0.0,
+                    self_cpu_seconds=0.0,
+                    items=0,
+                    bytes=0,
+                ),
+            )
+            total["count"] += 1
+            total["wall_seconds"] += record.wall_seconds
+            total["self_wall_seconds"] += record.self_wall_seconds
+            total["self_cpu_seconds"] += record.self_cpu_seconds
+            total["items"] += record.items
+            total["bytes"] += record.bytes
+        return totals
+
+    def summary(self) -> str:
+        """
+        Format the per-stage totals as a table. Stages running in several
+        threads at once can add up to more than the elapsed time.
+        """
+        lines = [
+            f"{'stage':<20} {'count':>6} {'wall s':>9} {'self s':>9} "
+            f"{'self cpu s':>10} {'items':>9} {'bytes':>12}"
+        ]
+        for name, total in self.totals().items():
+            lines.append(
+                f"{name:<20} {total['count']:>6} {total['wall_seconds']:>9.3f} "
+                f"{total['self_wall_seconds']:>9.3f} "
+                f"{total['self_cpu_seconds']:>10.3f} {total['items']:>9} "
+                f"{total['bytes']:>12}"
+            )
+        lines.append(
+            f"{'total':<20} {'':>6} {time.perf_counter() - self.started:>9.3f} "
+            f"{'':>9} {time.process_time() - self._started_cpu:>10.3f}"
+        )
+        return "\n".join(lines)
+
+    def to_dict(self, **extra: Any) -> Dict[str, Any]:
+        return dict(
+            extra,
+            wall_seconds=time.perf_counter() - self.started,
+            cpu_seconds=time.process_time() - self._started_cpu,
+            peak_rss_mib=peak_rss_mib(),
+            totals=self.totals(),
+            stages=[record._asdict() for record in self.records],
+        )
+
+    def write_json(self, path: str, **extra: Any):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.to_dict(**extra), file, indent=2)
+
+
+class _Stage:
+    """
+    Times one stage on the current thread. A stage can be resumed and paused
+    several times (see `timed_iter`) before it is finished and recorded.
+    """
+
+    active = True
+
+    def __init__(self, recorder: MetricsRecorder, name: str):
+        self.recorder = recorder
+        self.name = name
+        self.items = 0
+        self.bytes = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.child_wall = 0.0
+        self.child_cpu = 0.0
+        self.start: Optional[float] = None
+
+    def add(self, items: int = 0, bytes: int = 0):
+        self.items += items
+        self.bytes += bytes
+
+    def resume(self):
+        if self.start is None:
+            self.start = time.perf_counter() - self.recorder.started
+        _stack().append(self)
+        self._wall0 = time.perf_counter()
+        self._cpu0 = time.thread_time()
+
+    def pause(self):
+        wall = time.perf_counter() - self._wall0
+        cpu = time.thread_time() - self._cpu0
+        self.wall += wall
+        self.cpu += cpu
+        stack = _stack()
+        stack.pop()
+        if stack:
+            stack[-1].child_wall += wall
+            stack[-1].child_cpu += cpu
+
+    def finish(self):
+        self.thread = threading.current_thread().name
+        self.peak_rss_mib = peak_rss_mib()
+        self.recorder.add(self)
+
+    def record(self) -> StageRecord:
+        # Counts may still be added after the stage has finished, e.g. the
+        # bytes of a response that is read after the request returned
+        return StageRecord(
+            name=self.name,
+            thread=self.thread,
+            start=self.start or 0.0,
+            wall_seconds=self.wall,
+            cpu_seconds=self.cpu,
+            self_wall_seconds=self.wall - self.child_wall,
+            self_cpu_seconds=self.cpu - self.child_cpu,
+            items=self.items,
+            bytes=self.bytes,
+            peak_rss_mib=self.peak_rss_mib,
+        )
+
+    def __enter__(self) -> "_Stage":
+        self.resume()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.pause()
+        self.finish()
+
+
+class _NullStage:
+    """
+    Stand-in returned while recording is disabled; every operation is a no-op.
+    """
+
+    active = False
+
+    def add(self, items: int = 0, bytes: int = 0):
+        pass
+
+    def __enter__(self) -> "_NullStage":
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+NULL_STAGE = _NullStage()
+
+_recorder: Optional[MetricsRecorder] = None
+_local = threading.local()
+
+
+def _stack() -> List[_Stage]:
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def enable() -> MetricsRecorder:
+    """
+    Start recording stages and return the recorder they are added to.
+    """
+    global _recorder
+    _recorder = MetricsRecorder()
+    return _recorder
+
+
+def disable():
+    global _recorder
+    _recorder = None
+
+
+def stage(name: str):
+    """
+    Return a context manager timing the enclosed block as stage `name`.
+
+    Wall and CPU time are measured on the calling thread, and time spent in
+    stages nested inside the block is reported separately from the block's
+    own. Item and byte counts are added with `add()`; guard anything costly
+    to compute behind the stage's `active` flag. While recording is disabled
+    a shared no-op object is returned.
+    """
+    recorder = _recorder
+    if recorder is None:
+        return NULL_STAGE
+    return _Stage(recorder, name)
+
+
+def timed_iter(name: str, iterable: Iterable[T]) -> Iterable[T]:
+    """
+    Time the production of each item of `iterable` as stage `name`, counting
+    the items. Time the consumer spends between items is not included, so a
+    streamed parse can be told apart from the work done on its output.
+    Returns `iterable` unchanged while recording is disabled.
+    """
+    recorder = _recorder
+    if recorder is None:
+        return iterable
+    return _timed_iter(_Stage(recorder, name), iter(iterable))
+
+
+def _timed_iter(record: _Stage, iterator: Iterator[T]) -> Iterator[T]:
+    try:
+        while True:
+            record.resume()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                record.pause()
+            record.items += 1
+            yield item
+    finally:
+        record.finish()
+
+
+class CountingReader:
+    """
+    Wraps a binary file object and counts the bytes read through it.
+    """
+
+    def __init__(self, file: IO[bytes]):
+        self.file = file
+        self.bytes = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.file.read(size)
+        self.bytes += len(data)
+        return data
+
+    def __enter__(self) -> "CountingReader":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.file.close()
+
+    def close(self):
+        self.file.close()
@@ -1,8 +1,21 @@
 # device_certificate_report/components/pdf_generation.py
 
-from typing import List
-from device_certificate_report.models.device import DeviceInfo
+import io
+import logging
+import math
+import os
+import tempfile
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, NamedTuple, Optional, Sequence, Tuple, Union
+from device_certificate_report.models.device import CollectionFailure, DeviceInfo
+from device_certificate_report.models.device_table import DeviceTable
+from device_certificate_report.utilities.incremental import SnapshotDiff
+from reportlab.pdfgen.canvas import Canvas
 from reportlab.platypus import (
+    Flowable,
+    Frame,
     SimpleDocTemplate,
     Paragraph,
     Spacer,
@@ -12,25 +25,318 @@ from reportlab.platypus import (
 )
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib.pagesizes import letter
+from reportlab.lib.units import inch
 from reportlab.lib import colors
 from reportlab.graphics.shapes import Drawing, Line
+from reportlab.pdfbase.pdfmetrics import stringWidth
 import importlib.resources as pkg_resources
 
+try:
+    from pypdf import PdfWriter
+except ImportError:  # pragma: no cover - pypdf is optional
+    PdfWriter = None
 
-def generate_report(
-    unaffected_devices: List[DeviceInfo],
-    no_upgrade_required: List[DeviceInfo],
-    upgrade_required: List[DeviceInfo],
-    devices_with_globalprotect: List[DeviceInfo],
-    devices_with_certificates: List[DeviceInfo],
-    output_file: str,
-):
+logger = logging.getLogger(__name__)
+
+Devices = Union[Sequence[DeviceInfo], DeviceTable]
+
+
+# Width available to tables between SimpleDocTemplate's default margins
+CONTENT_WIDTH = letter[0] - 2 * inch
+
+# Fixed row geometry, so tables never have to measure their cells
+ROW_HEIGHT = 18
+HEADER_HEIGHT = 28
+
+# reportlab's default cell font and horizontal padding
+CELL_FONT = "Helvetica"
+CELL_FONT_SIZE = 10
+CELL_PADDING = 6
+
+# Width of Helvetica's widest glyph ("@") per point of font size; cells with
+# few enough characters fit without being measured
+_WIDEST_GLYPH = 1.015
+
+ELLIPSIS = "\u2026"
+
+TABLE_STYLE = TableStyle(
+    [
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#F04E23")),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+    ]
+)
+
+# Alternate row colors, starting with the first data row
+ROW_BACKGROUNDS = [colors.white, colors.whitesmoke]
+
+
+class PagedTable(Flowable):
     """
-    Generate a PDF report based on the collected device information.
+    A device table that is laid out one page-sized chunk at a time.
+
+    Every row has the same height, so the table's size is known without
+    measuring any cell, and splitting at a page break only builds a reportlab
+    Table for the rows that fit on that page. Rendering time therefore grows
+    linearly with the number of rows. The header row is repeated on every page.
     """
-    pdf = SimpleDocTemplate(output_file, pagesize=letter)
+
+    def __init__(
+        self,
+        headers: List[str],
+        rows: List[List[str]],
+        col_widths: List[float],
+        start: int = 0,
+    ):
+        super().__init__()
+        self.headers = headers
+        self.rows = rows
+        self.col_widths = col_widths
+        self.start = start
+
+    def _chunk(self, end: int) -> Table:
+        # Rows are one line high, so each cell is kept to one line that fits
+        # its column
+        widths = [width - 2 * CELL_PADDING for width in self.col_widths]
+        limits = [
+            (width, int(width / (_WIDEST_GLYPH * CELL_FONT_SIZE))) for width in widths
+        ]
+        rows = [
+            [
+                (
+                    value
+                    if len(value) <= safe_length and "\n" not in value
+                    else _fit_cell(value, width)
+                )
+                for value, (width, safe_length) in zip(row, limits)
+            ]
+            for row in self.rows[self.start : end]
+        ]
+        table = Table(
+            [self.headers] + rows,
+            colWidths=self.col_widths,
+            rowHeights=[HEADER_HEIGHT] + [ROW_HEIGHT] * (end - self.start),
+        )
+        # Keep the zebra striping continuous across chunks
+        backgrounds = (
+            ROW_BACKGROUNDS[self.start % 2 :] + ROW_BACKGROUNDS[: self.start % 2]
+        )
+        table.setStyle(TABLE_STYLE)
+        table.setStyle([("ROWBACKGROUNDS", (0, 1), (-1, -1), backgrounds)])
+        return table
+
+    def wrap(self, availWidth, availHeight):
+        self.width = sum(self.col_widths)
+        self.height = HEADER_HEIGHT + ROW_HEIGHT * (len(self.rows) - self.start)
+        return self.width, self.height
+
+    def split(self, availWidth, availHeight):
+        fit = int((availHeight - HEADER_HEIGHT) // ROW_HEIGHT)
+        if fit < 1:
+            return []
+        end = self.start + fit
+        if end >= len(self.rows):
+            return [self._chunk(len(self.rows))]
+        return [
+            self._chunk(end),
+            PagedTable(self.headers, self.rows, self.col_widths, start=end),
+        ]
+
+    def draw(self):
+        table = self._chunk(len(self.rows))
+        table.wrapOn(self.canv, self.width, self.height)
+        table.drawOn(self.canv, 0, 0)
+
+
+def _fit_cell(value: str, width: float) -> str:
+    """
+    Return `value` on a single line, shortened with an ellipsis if it is
+    wider than `width` points in the table's cell font.
+    """
+    if "\n" in value or "\r" in value:
+        value = " ".join(value.split())
+    if stringWidth(value, CELL_FONT, CELL_FONT_SIZE) <= width:
+        return value
+    # Longest prefix that fits together with the ellipsis
+    low, high = 0, len(value)
+    while low < high:
+        middle = (low + high + 1) // 2
+        text = value[:middle].rstrip() + ELLIPSIS
+        if stringWidth(text, CELL_FONT, CELL_FONT_SIZE) <= width:
+            low = middle
+        else:
+            high = middle - 1
+    return value[:low].rstrip() + ELLIPSIS
+
+
+class ChangeRow(NamedTuple):
+    device_name: str
+    serial_number: str
+    change: str
+    details: str
+
+
+class ReportSection(NamedTuple):
+    title: str
+    headers: List[str]
+    rows: List[List[str]]
+    # Shown in place of the table when the section has no rows
+    empty_message: str
+
+
+class _RenderPart(NamedTuple):
+    # A run of consecutive pages rendered to its own PDF. Only the first part
+    # of a section carries its heading; later parts continue its table.
+    title: Optional[str]
+    empty_message: Optional[str]
+    headers: List[str]
+    rows: List[List[str]]
+    start: int
+    pages: int
+
+
+# Smallest number of pages handed to one rendering process
+MIN_PART_PAGES = 10
+
+
+def _table_rows(devices, fields: List[str]) -> List[List[str]]:
+    if isinstance(devices, DeviceTable):
+        # Read whole columns instead of going through a row object per device
+        columns = [devices.column(field) for field in fields]
+        return [[value or "" for value in row] for row in zip(*columns)]
+    return [[getattr(device, field) or "" for field in fields] for device in devices]
+
+
+def _col_widths(col_count: int) -> List[float]:
+    # Set column widths to evenly divide the page width
+    return [CONTENT_WIDTH / col_count] * col_count
+
+
+def _report_sections(
+    unaffected_devices: Devices,
+    no_upgrade_required: Devices,
+    upgrade_required: Devices,
+    devices_with_globalprotect: Devices,
+    devices_with_certificates: Devices,
+    collection_failures: Optional[Sequence[CollectionFailure]],
+    include_source: bool,
+    changes: Optional[SnapshotDiff],
+    expiry_histogram: Optional[Sequence[Tuple[str, int]]] = None,
+) -> List[ReportSection]:
+    """
+    Lay out the report's sections, in order, as headers and rows of text.
+    """
+    sections = []
+
+    def add_section(title, devices, headers, fields, empty_message, with_source):
+        if with_source:
+            headers = headers + ["Source"]
+            fields = fields + ["source"]
+        sections.append(
+            ReportSection(title, headers, _table_rows(devices, fields), empty_message)
+        )
+
+    # Changes since the previous run
+    if changes is not None:
+        rows = [
+            ChangeRow(
+                device_name=change.device.device_name,
+                serial_number=change.serial_number,
+                change=change.kind.capitalize(),
+                details=change.details,
+            )
+            for change in changes.changes
+        ]
+        add_section(
+            "Changes Since Last Run",
+            rows,
+            ["Device Name", "Serial Number", "Change", "Details"],
+            ["device_name", "serial_number", "change", "details"],
+            "No changes since the last run.",
+            with_source=False,
+        )
+
+    add_section(
+        "Unaffected Models (already supports Device Certificates)",
+        unaffected_devices,
+        ["Device Name", "Model", "Software Version"],
+        ["device_name", "model", "software_version"],
+        "No unaffected devices.",
+        include_source,
+    )
+    add_section(
+        "Affected Models (No Software Upgrade Required)",
+        no_upgrade_required,
+        ["Device Name", "Model", "Software Version"],
+        ["device_name", "model", "software_version"],
+        "No affected devices that are up-to-date.",
+        include_source,
+    )
+    add_section(
+        "Affected Models (Software Upgrade Required)",
+        upgrade_required,
+        ["Device Name", "Model", "Software Version", "Minimum Version"],
+        ["device_name", "model", "software_version", "min_required_version"],
+        "No affected devices that require software upgrade.",
+        include_source,
+    )
+    add_section(
+        "Devices with GlobalProtect Clients",
+        devices_with_globalprotect,
+        ["Device Name", "Model", "Software Version", "GlobalProtect Client"],
+        ["device_name", "model", "software_version", "globalprotect_client"],
+        "No devices with GlobalProtect clients.",
+        include_source,
+    )
+    add_section(
+        "Device Certificate Status and Expiry",
+        devices_with_certificates,
+        [
+            "Device Name",
+            "Model",
+            "Device Certificate Status",
+            "Certificate Expiry Date",
+        ],
+        [
+            "device_name",
+            "model",
+            "device_certificate",
+            "device_certificate_expiry_date",
+        ],
+        "No device certificate information available.",
+        include_source,
+    )
+
+    # Devices by time left until their certificate expires
+    if expiry_histogram is not None:
+        sections.append(
+            ReportSection(
+                "Certificate Expiry Outlook",
+                ["Certificate Expires", "Devices"],
+                [[label, str(count)] for label, count in expiry_histogram],
+                "",
+            )
+        )
+
+    # Hosts that could not be collected from
+    if collection_failures:
+        add_section(
+            "Collection Failures",
+            collection_failures,
+            ["Hostname", "Error"],
+            ["hostname", "error"],
+            "",
+            with_source=False,
+        )
+
+    return sections
+
+
+def _report_header(styles) -> List[Flowable]:
     content = []
-    styles = getSampleStyleSheet()
 
     # Optional: Include a logo if available
     try:
@@ -62,147 +368,282 @@ def generate_report(
     d.add(line)
     content.append(d)
     content.append(Spacer(1, 20))
+    return content
 
-    # Function to create a table for a list of devices
-    def create_device_table(
-        devices: List[DeviceInfo], headers: List[str], fields: List[str]
-    ) -> Table:
-        table_data = [headers]
-        for device in devices:
-            row = [getattr(device, field) or "" for field in fields]
-            table_data.append(row)
-        col_count = len(headers)
-        # Set column widths to evenly divide the page width
-        page_width = letter[0] - pdf.leftMargin - pdf.rightMargin
-        col_width = page_width / col_count
-        col_widths = [col_width] * col_count
-
-        table = Table(table_data, colWidths=col_widths, repeatRows=1)
-        # Apply styling
-        table_style = TableStyle(
-            [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#F04E23")),
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-                ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
-                ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-            ]
-        )
-        # Alternate row colors
-        for i in range(1, len(table_data)):
-            bg_color = colors.whitesmoke if i % 2 == 0 else colors.white
-            table_style.add("BACKGROUND", (0, i), (-1, i), bg_color)
-        table.setStyle(table_style)
-        return table
 
-    # Unaffected Devices
-    content.append(
-        Paragraph(
-            "Unaffected Models (already supports Device Certificates)",
-            styles["Heading2"],
+def _section_flowables(section: ReportSection, styles) -> List[Flowable]:
+    content = [Paragraph(section.title, styles["Heading2"]), Spacer(1, 12)]
+    if section.rows:
+        content.append(
+            PagedTable(section.headers, section.rows, _col_widths(len(section.headers)))
         )
-    )
-    content.append(Spacer(1, 12))
-    if unaffected_devices:
-        headers = ["Device Name", "Model", "Software Version"]
-        fields = ["device_name", "model", "software_version"]
-        table = create_device_table(unaffected_devices, headers, fields)
-        content.append(table)
-        content.append(Spacer(1, 20))
     else:
-        content.append(Paragraph("No unaffected devices.", styles["BodyText"]))
-        content.append(Spacer(1, 20))
+        content.append(Paragraph(section.empty_message, styles["BodyText"]))
+    content.append(Spacer(1, 20))
+    return content
 
-    # Affected Devices - No Software Upgrade Required
-    content.append(
-        Paragraph("Affected Models (No Software Upgrade Required)", styles["Heading2"])
-    )
-    content.append(Spacer(1, 12))
-    if no_upgrade_required:
-        headers = ["Device Name", "Model", "Software Version"]
-        fields = ["device_name", "model", "software_version"]
-        table = create_device_table(no_upgrade_required, headers, fields)
-        content.append(table)
-        content.append(Spacer(1, 20))
-    else:
-        content.append(
-            Paragraph("No affected devices that are up-to-date.", styles["BodyText"])
-        )
-        content.append(Spacer(1, 20))
 
-    # Affected Devices - Software Upgrade Required
-    content.append(
-        Paragraph("Affected Models (Software Upgrade Required)", styles["Heading2"])
+def _page_capacity(title: str, styles) -> Tuple[int, int]:
+    """
+    Return how many table rows fit on a section's first page, below its
+    heading, and on each of its later pages.
+
+    Rows have a fixed height, so this is found by laying out the heading in
+    a frame shaped like the document's and applying PagedTable's split rule
+    to the height left over.
+    """
+    doc = SimpleDocTemplate(io.BytesIO(), pagesize=letter)
+    frame = Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height)
+    canvas = Canvas(io.BytesIO(), pagesize=letter)
+    full_height = frame._y - frame._y1p
+    frame.add(Paragraph(title, styles["Heading2"]), canvas)
+    frame.add(Spacer(1, 12), canvas)
+    first_height = frame._y - frame._y1p
+    return (
+        int((first_height - HEADER_HEIGHT) // ROW_HEIGHT),
+        int((full_height - HEADER_HEIGHT) // ROW_HEIGHT),
     )
-    content.append(Spacer(1, 12))
-    if upgrade_required:
-        headers = [
-            "Device Name",
-            "Model",
-            "Software Version",
-            "Minimum Version",
-        ]
-        fields = [
-            "device_name",
-            "model",
-            "software_version",
-            "min_required_version",
+
+
+def _plan_parts(
+    section: ReportSection, styles, pages_per_part: int
+) -> List[_RenderPart]:
+    """
+    Split a section into parts of about `pages_per_part` full pages each.
+    """
+    if not section.rows:
+        return [
+            _RenderPart(section.title, section.empty_message, section.headers, [], 0, 1)
         ]
-        table = create_device_table(upgrade_required, headers, fields)
-        content.append(table)
-        content.append(Spacer(1, 20))
-    else:
-        content.append(
-            Paragraph(
-                "No affected devices that require software upgrade.", styles["BodyText"]
+
+    rows = section.rows
+    first_fit, page_fit = _page_capacity(section.title, styles)
+    end = min(len(rows), first_fit + page_fit * (pages_per_part - 1))
+    parts = [
+        _RenderPart(
+            section.title,
+            None,
+            section.headers,
+            rows[:end],
+            0,
+            1 + math.ceil(max(0, end - first_fit) / page_fit),
+        )
+    ]
+    while end < len(rows):
+        begin, end = end, min(len(rows), end + page_fit * pages_per_part)
+        # Start each slice on an even row so the zebra striping carries on
+        offset = begin % 2
+        parts.append(
+            _RenderPart(
+                None,
+                None,
+                section.headers,
+                rows[begin - offset : end],
+                offset,
+                math.ceil((end - begin) / page_fit),
             )
         )
-        content.append(Spacer(1, 20))
+    return parts
 
-    # Devices with GlobalProtect Clients
-    content.append(Paragraph("Devices with GlobalProtect Clients", styles["Heading2"]))
-    content.append(Spacer(1, 12))
-    if devices_with_globalprotect:
-        headers = ["Device Name", "Model", "Software Version", "GlobalProtect Client"]
-        fields = ["device_name", "model", "software_version", "globalprotect_client"]
-        table = create_device_table(devices_with_globalprotect, headers, fields)
-        content.append(table)
-        content.append(Spacer(1, 20))
-    else:
-        content.append(
-            Paragraph("No devices with GlobalProtect clients.", styles["BodyText"])
+
+def _build_numbered(
+    output_file: str, content: List[Flowable], first_page: int, total_pages: int
+) -> int:
+    """
+    Build a PDF whose pages are numbered from `first_page` out of
+    `total_pages`, and return how many pages it has.
+    """
+
+    def number_page(canvas, doc):
+        canvas.saveState()
+        canvas.setFont("Helvetica", 9)
+        canvas.drawRightString(
+            letter[0] - doc.rightMargin,
+            doc.bottomMargin / 2,
+            f"Page {first_page + doc.page - 1} of {total_pages}",
         )
-        content.append(Spacer(1, 20))
+        canvas.restoreState()
 
-    # Device Certificate Status and Expiry
-    content.append(
-        Paragraph("Device Certificate Status and Expiry", styles["Heading2"])
-    )
+    doc = SimpleDocTemplate(output_file, pagesize=letter)
+    doc.build(content, onFirstPage=number_page, onLaterPages=number_page)
+    return doc.page
+
+
+def _render_cover(
+    output_file: str, contents: List[Tuple[str, int]], total_pages: int
+) -> int:
+    styles = getSampleStyleSheet()
+    content = _report_header(styles)
+    content.append(Paragraph("Contents", styles["Heading2"]))
     content.append(Spacer(1, 12))
-    if devices_with_certificates:
-        headers = [
-            "Device Name",
-            "Model",
-            "Device Certificate Status",
-            "Certificate Expiry Date",
-        ]
-        fields = [
-            "device_name",
-            "model",
-            "device_certificate",
-            "device_certificate_expiry_date",
+    table = Table(
+        [[title, str(page)] for title, page in contents],
+        colWidths=[CONTENT_WIDTH - inch, inch],
+    )
+    table.setStyle(
+        [
+            ("ALIGN", (1, 0), (1, -1), "RIGHT"),
+            ("LINEBELOW", (0, 0), (-1, -1), 0.25, colors.lightgrey),
         ]
-        table = create_device_table(devices_with_certificates, headers, fields)
-        content.append(table)
-        content.append(Spacer(1, 20))
-    else:
+    )
+    content.append(table)
+    return _build_numbered(output_file, content, 1, total_pages)
+
+
+def _render_part(
+    part: _RenderPart, output_file: str, first_page: int, total_pages: int
+) -> int:
+    styles = getSampleStyleSheet()
+    content = []
+    if part.title is not None:
+        content.append(Paragraph(part.title, styles["Heading2"]))
+        content.append(Spacer(1, 12))
+    if part.rows:
         content.append(
-            Paragraph(
-                "No device certificate information available.", styles["BodyText"]
+            PagedTable(
+                part.headers,
+                part.rows,
+                _col_widths(len(part.headers)),
+                start=part.start,
             )
         )
-        content.append(Spacer(1, 20))
+    elif part.empty_message:
+        content.append(Paragraph(part.empty_message, styles["BodyText"]))
+    return _build_numbered(output_file, content, first_page, total_pages)
+
+
+class PageNumberingError(RuntimeError):
+    """
+    Raised when the parts of a report rendered in parallel keep coming out
+    with other page counts than they were numbered for.
+    """
+
+
+def _render_parallel(
+    sections: List[ReportSection], output_file: str, render_workers: int
+):
+    """
+    Render the report as separate PDFs in a process pool and merge them.
+
+    Sections are cut into parts on page boundaries, so a large section is
+    spread over several processes rather than pinning one. Every part's page
+    count follows from its row count, which lets each process number its
+    pages before the others have finished. The merged report opens with a
+    table of contents and has one bookmark per section.
+    """
+    styles = getSampleStyleSheet()
+    _, page_fit = _page_capacity("", styles)
+    estimate = sum(max(1, math.ceil(len(s.rows) / page_fit)) for s in sections)
+    pages_per_part = max(MIN_PART_PAGES, math.ceil(estimate / (render_workers * 4)))
+
+    plans = [_plan_parts(section, styles, pages_per_part) for section in sections]
+    parts = [part for plan in plans for part in plan]
+    cover_pages = 1
+    part_pages = [part.pages for part in parts]
+
+    with tempfile.TemporaryDirectory() as directory, ProcessPoolExecutor(
+        max_workers=render_workers
+    ) as executor:
+        paths = [os.path.join(directory, f"{i}.pdf") for i in range(len(parts) + 1)]
+        for attempt in range(2):
+            first_pages = []
+            page = cover_pages + 1
+            for pages in part_pages:
+                first_pages.append(page)
+                page += pages
+            total_pages = page - 1
+
+            contents = []
+            index = 0
+            for section, plan in zip(sections, plans):
+                contents.append((section.title, first_pages[index]))
+                index += len(plan)
+
+            futures = [executor.submit(_render_cover, paths[0], contents, total_pages)]
+            futures += [
+                executor.submit(_render_part, part, path, first_page, total_pages)
+                for part, path, first_page in zip(parts, paths[1:], first_pages)
+            ]
+            rendered = [future.result() for future in futures]
+            if rendered == [cover_pages] + part_pages:
+                break
+            # The layout came out differently from the plan; renumber from
+            # the page counts that were actually rendered
+            logger.debug(f"Re-rendering report parts with page counts {rendered}")
+            cover_pages, part_pages = rendered[0], rendered[1:]
+        else:
+            raise PageNumberingError(
+                f"page counts still differed from the plan after {attempt + 1} "
+                "renders"
+            )
+
+        writer = PdfWriter()
+        for path in paths:
+            writer.append(path)
+        for title, page in contents:
+            writer.add_outline_item(title, page - 1)
+        writer.write(output_file)
+
+
+def generate_report(
+    unaffected_devices: Devices,
+    no_upgrade_required: Devices,
+    upgrade_required: Devices,
+    devices_with_globalprotect: Devices,
+    devices_with_certificates: Devices,
+    output_file: str,
+    collection_failures: Optional[Sequence[CollectionFailure]] = None,
+    include_source: bool = False,
+    changes: Optional[SnapshotDiff] = None,
+    render_workers: Optional[int] = None,
+    expiry_histogram: Optional[Sequence[Tuple[str, int]]] = None,
+):
+    """
+    Generate a PDF report based on the collected device information.
+    Each section accepts either a list of DeviceInfo objects or a DeviceTable.
+    When `include_source` is set, every device table gets a "Source" column
+    naming the appliance the device was collected from, and any
+    `collection_failures` are listed in a final section. `changes`, when
+    given, adds a "Changes Since Last Run" section ahead of the device tables.
+    `expiry_histogram`, a list of (label, device count) pairs such as
+    `ExpiryIndex.histogram` returns, adds a section after the certificates.
+
+    With `render_workers` above 1 the sections are rendered in that many
+    processes and merged into one numbered PDF with a table of contents.
+    This needs pypdf; without it the report is rendered in this process.
+    """
+    sections = _report_sections(
+        unaffected_devices,
+        no_upgrade_required,
+        upgrade_required,
+        devices_with_globalprotect,
+        devices_with_certificates,
+        collection_failures,
+        include_source,
+        changes,
+        expiry_histogram,
+    )
+
+    if render_workers and render_workers > 1:
+        if PdfWriter is None:
+            logger.warning(
+                "pypdf is not installed; rendering the report in a single process."
+            )
+        else:
+            try:
+                _render_parallel(sections, output_file, render_workers)
+                return
+            except (OSError, BrokenProcessPool, PageNumberingError) as e:
+                logger.warning(
+                    f"Parallel rendering failed ({e}); "
+                    "rendering the report in a single process."
+                )
+
+    pdf = SimpleDocTemplate(output_file, pagesize=letter)
+    styles = getSampleStyleSheet()
+    content = _report_header(styles)
+    for section in sections:
+        content.extend(_section_flowables(section, styles))
 
     # Build the PDF
     pdf.build(content)
@@ -0,0 +1,498 @@
+# device_certificate_report/utilities/renderers.py
+
+import csv
+import html
+import json
+import logging
+import os
+
+from itertools import chain
+from json.encoder import encode_basestring
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
+
+from device_certificate_report.config.output_formats import OutputFormat
+from device_certificate_report.models.device import CollectionFailure, DeviceInfo
+from device_certificate_report.models.device_table import DEVICE_FIELDS, DeviceTable
+from device_certificate_report.utilities.classification import (
+    CERTIFICATES,
+    GLOBALPROTECT,
+)
+from device_certificate_report.utilities.filters import (
+    NO_UPGRADE_REQUIRED,
+    UNAFFECTED,
+    UPGRADE_REQUIRED,
+)
+
+if TYPE_CHECKING:
+    from device_certificate_report.utilities.incremental import SnapshotDiff
+    from device_certificate_report.utilities.report_cache import ReportCache
+
+logger = logging.getLogger(__name__)
+
+Devices = Union[Sequence[DeviceInfo], DeviceTable]
+
+# Report sections, in the order every renderer writes them
+SECTION_TITLES = {
+    UNAFFECTED: "Unaffected Models (already supports Device Certificates)",
+    NO_UPGRADE_REQUIRED: "Affected Models (No Software Upgrade Required)",
+    UPGRADE_REQUIRED: "Affected Models (Software Upgrade Required)",
+    GLOBALPROTECT: "Devices with GlobalProtect Clients",
+    CERTIFICATES: "Device Certificate Status and Expiry",
+}
+
+# Rows buffered per Parquet row group
+PARQUET_BATCH_SIZE = 65536
+
+# Suffix of the file, next to a device record report, listing the hosts that
+# could not be collected from and the changes since the last run
+RUN_DETAILS_SUFFIX = ".run.json"
+
+
+def _iter_rows(devices: Devices) -> Iterator[Tuple[Optional[str], ...]]:
+    """
+    Yield each device's field values in DEVICE_FIELDS order.
+    """
+    if isinstance(devices, DeviceTable):
+        yield from zip(*(devices.column(field) for field in DEVICE_FIELDS))
+    else:
+        for device in devices:
+            yield tuple(getattr(device, field) for field in DEVICE_FIELDS)
+
+
+class Renderer:
+    """
+    Writes a report one section at a time.
+
+    Used as a context manager: `write_section` is called once per section in
+    report order, then `finish`. Streaming renderers write each device as it
+    is handed over and never hold a whole document in memory.
+    """
+
+    # Whether the report lists the collection_failures and changes options
+    # itself; otherwise `render_report` writes them to a sidecar file
+    run_details = False
+
+    def __init__(self, output_file: str, **options):
+        self.output_file = output_file
+        self.options = options
+
+    def __enter__(self) -> "Renderer":
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def open(self):
+        pass
+
+    def write_section(self, section: str, devices: Devices):
+        raise NotImplementedError
+
+    def finish(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class PdfRenderer(Renderer):
+    """
+    The PDF report. Reportlab lays out the document as a whole, so sections
+    are collected and rendered by `generate_report` once all have arrived.
+    Options are passed through to `generate_report`.
+    """
+
+    run_details = True
+
+    def open(self):
+        self.sections: Dict[str, Devices] = {}
+
+    def write_section(self, section: str, devices: Devices):
+        self.sections[section] = devices
+
+    def finish(self):
+        # Imported here so the other formats never load reportlab
+        from device_certificate_report.utilities.pdf_generation import (
+            generate_report,
+        )
+
+        generate_report(
+            unaffected_devices=self.sections[UNAFFECTED],
+            no_upgrade_required=self.sections[NO_UPGRADE_REQUIRED],
+            upgrade_required=self.sections[UPGRADE_REQUIRED],
+            devices_with_globalprotect=self.sections[GLOBALPROTECT],
+            devices_with_certificates=self.sections[CERTIFICATES],
+            output_file=self.output_file,
+            **self.options,
+        )
+
+
+class CsvRenderer(Renderer):
+    """
+    One CSV row per device and section, with the section in the first column.
+    """
+
+    def open(self):
+        self.file = open(self.output_file, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(("section",) + DEVICE_FIELDS)
+
+    def write_section(self, section: str, devices: Devices):
+        self.writer.writerows(
+            (section,) + tuple("" if value is None else value for value in row)
+            for row in _iter_rows(devices)
+        )
+
+    def close(self):
+        self.file.close()
+
+
+class JsonLinesRenderer(Renderer):
+    """
+    One JSON object per device and section, keyed by DeviceInfo field name
+    plus `section`.
+    """
+
+    def open(self):
+        self.file = open(self.output_file, "w", encoding="utf-8")
+
+    def write_section(self, section: str, devices: Devices):
+        # Every value is a string or None, so each line is assembled from
+        # pre-encoded keys rather than going through a dict and JSONEncoder
+        prefix = '{"section": ' + encode_basestring(section)
+        keys = [f', "{field}": ' for field in DEVICE_FIELDS]
+        self.file.writelines(
+            prefix
+            + "".join(
+                key + ("null" if value is None else encode_basestring(value))
+                for key, value in zip(keys, row)
+            )
+            + "}\n"
+            for row in _iter_rows(devices)
+        )
+
+    def close(self):
+        self.file.close()
+
+
+class HtmlRenderer(Renderer):
+    """
+    A static, self-contained HTML page with one table per section. Like the
+    PDF report, it starts with the `changes` option and ends with the
+    `expiry_histogram` and `collection_failures` options when given.
+    """
+
+    run_details = True
+
+    STYLE = (
+        "body{font-family:Helvetica,Arial,sans-serif;color:#333;margin:2em}"
+        "h1{border-bottom:2px solid #F04E23;padding-bottom:.3em}"
+        "table{border-collapse:collapse;width:100%;margin-bottom:2em}"
+        "th{background:#F04E23;color:#fff}"
+        "th,td{border:.5px solid grey;padding:4px 8px;text-align:center}"
+        "tbody tr:nth-child(even){background:whitesmoke}"
+    )
+
+    def open(self):
+        self.file = open(self.output_file, "w", encoding="utf-8")
+        self.file.write(
+            '<!DOCTYPE html>\n<html><head><meta charset="utf-8">'
+            "<title>Device Certificate Report</title>"
+            f"<style>{self.STYLE}</style></head>\n"
+            "<body><h1>Device Certificate Report</h1>\n"
+        )
+        changes = self.options.get("changes")
+        if changes is not None:
+            self._write_table(
+                "changes",
+                "Changes Since Last Run",
+                ["Device Name", "Serial Number", "Change", "Details"],
+                [
+                    (
+                        change.device.device_name,
+                        change.serial_number,
+                        change.kind.capitalize(),
+                        change.details,
+                    )
+                    for change in changes.changes
+                ],
+                "No changes since the last run.",
+            )
+
+    def _write_table(
+        self,
+        anchor: str,
+        title: str,
+        headers: Sequence[str],
+        rows: Iterable[Tuple[Optional[str], ...]],
+        empty_message: str,
+    ):
+        write = self.file.write
+        write(f'<h2 id="{anchor}">{html.escape(title)}</h2>\n')
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            write(f"<p>{html.escape(empty_message)}</p>\n")
+            return
+        header_cells = "".join(f"<th>{html.escape(header)}</th>" for header in headers)
+        write(f"<table><thead><tr>{header_cells}</tr></thead><tbody>\n")
+        self.file.writelines(
+            "<tr>"
+            + "".join(
+                f"<td>{html.escape(value) if value else ''}</td>" for value in row
+            )
+            + "</tr>\n"
+            for row in chain([first], rows)
+        )
+        write("</tbody></table>\n")
+
+    def write_section(self, section: str, devices: Devices):
+        self._write_table(
+            section,
+            SECTION_TITLES[section],
+            [field.replace("_", " ").title() for field in DEVICE_FIELDS],
+            _iter_rows(devices),
+            "No devices.",
+        )
+
+    def finish(self):
+        write = self.file.write
+        expiry_histogram = self.options.get("expiry_histogram")
+        if expiry_histogram is not None:
+            write(
+                '<h2 id="expiry">Certificate Expiry Outlook</h2>\n<table><thead><tr>'
+                "<th>Certificate Expires</th><th>Devices</th></tr></thead><tbody>\n"
+            )
+            self.file.writelines(
+                f"<tr><td>{html.escape(label)}</td><td>{count}</td></tr>\n"
+                for label, count in expiry_histogram
+            )
+            write("</tbody></table>\n")
+        collection_failures = self.options.get("collection_failures")
+        if collection_failures:
+            self._write_table(
+                "failures",
+                "Collection Failures",
+                ["Hostname", "Error"],
+                [(failure.hostname, failure.error) for failure in collection_failures],
+                "",
+            )
+        write("</body></html>\n")
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetRenderer(Renderer):
+    """
+    A Parquet file with a `section` column and one string column per
+    DeviceInfo field, written in row groups of PARQUET_BATCH_SIZE devices.
+    Requires pyarrow.
+    """
+
+    def open(self):
+        # pyarrow is optional and slow to import, so it is only loaded here
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError(
+                "Parquet output requires pyarrow; install it with `pip install pyarrow`"
+            ) from None
+        self.pa = pa
+        self.schema = pa.schema(
+            [(field, pa.string()) for field in ("section",) + DEVICE_FIELDS]
+        )
+        self.writer = pq.ParquetWriter(self.output_file, self.schema)
+
+    def write_section(self, section: str, devices: Devices):
+        batch: List[Tuple[Optional[str], ...]] = []
+        for row in _iter_rows(devices):
+            batch.append(row)
+            if len(batch) == PARQUET_BATCH_SIZE:
+                self._write_batch(section, batch)
+                batch = []
+        if batch:
+            self._write_batch(section, batch)
+
+    def _write_batch(self, section: str, batch: List[Tuple[Optional[str], ...]]):
+        columns = [[section] * len(batch)] + [list(column) for column in zip(*batch)]
+        table = self.pa.Table.from_arrays(columns, schema=self.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        self.writer.close()
+
+
+def run_details_path(output_file: str) -> str:
+    """
+    Return the path of the run details written next to `output_file`.
+    """
+    return os.path.splitext(output_file)[0] + RUN_DETAILS_SUFFIX
+
+
+def write_run_details(
+    output_file: str,
+    collection_failures: Optional[Sequence[CollectionFailure]] = None,
+    changes: Optional["SnapshotDiff"] = None,
+) -> Optional[str]:
+    """
+    Write the hosts that could not be collected from and the changes since
+    the last run to a JSON file next to a report whose format has no place
+    for them.
+
+    Parameters
+    ----------
+    output_file : str
+        Path of the report.
+    collection_failures : Sequence[CollectionFailure], optional
+        Hosts that could not be collected from.
+    changes : SnapshotDiff, optional
+        The changes since the last run.
+
+    Returns
+    -------
+    Optional[str]
+        The path written to, or None when there was nothing to write. A file
+        left there by an earlier run is then removed.
+    """
+    path = run_details_path(output_file)
+    if not collection_failures and changes is None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        return None
+
+    details = {
+        "collection_failures": [
+            {"hostname": failure.hostname, "error": failure.error}
+            for failure in collection_failures or ()
+        ],
+        "changes": None,
+    }
+    if changes is not None:
+        details["changes"] = {
+            kind: [
+                {
+                    "serial_number": change.serial_number,
+                    "device_name": change.device.device_name,
+                    "fields": {
+                        field: [before, after]
+                        for field, (before, after) in change.fields.items()
+                    },
+                }
+                for change in getattr(changes, kind)
+            ]
+            for kind in ("added", "changed", "removed")
+        }
+        details["changes"]["unchanged"] = changes.unchanged
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(details, file, indent=2)
+    logger.info(f"Collection failures and changes written to {path}.")
+    return path
+
+
+RENDERERS: Dict[OutputFormat, Type[Renderer]] = {
+    OutputFormat.PDF: PdfRenderer,
+    OutputFormat.CSV: CsvRenderer,
+    OutputFormat.JSONL: JsonLinesRenderer,
+    OutputFormat.HTML: HtmlRenderer,
+    OutputFormat.PARQUET: ParquetRenderer,
+}
+
+
+def render_report(
+    output_format: Union[OutputFormat, str],
+    unaffected_devices: Devices,
+    no_upgrade_required: Devices,
+    upgrade_required: Devices,
+    devices_with_globalprotect: Devices,
+    devices_with_certificates: Devices,
+    output_file: str,
+    cache: Optional["ReportCache"] = None,
+    **options,
+) -> bool:
+    """
+    Write the report's five sections in the given format.
+
+    Parameters
+    ----------
+    output_format : Union[OutputFormat, str]
+        One of pdf, csv, jsonl, html or parquet.
+    unaffected_devices, no_upgrade_required, upgrade_required : Devices
+        The classification buckets.
+    devices_with_globalprotect, devices_with_certificates : Devices
+        Devices with GlobalProtect clients and with certificate information.
+    output_file : str
+        Path to write the report to.
+    cache : ReportCache, optional
+        Reuse the report from this cache when one was rendered from the same
+        devices and options, and add the report to it otherwise.
+    **options
+        Options passed to `generate_report` for PDF (collection_failures,
+        include_source, changes, render_workers, expiry_histogram). HTML
+        also shows collection_failures, changes and expiry_histogram; the
+        other formats write collection_failures and changes to a
+        `<report>.run.json` file next to the report (see
+        `write_run_details`) and ignore the rest.
+
+    Returns
+    -------
+    bool
+        True if the report was taken from the cache, False if it was rendered.
+    """
+    output_format = OutputFormat(output_format)
+    renderer_class = RENDERERS[output_format]
+    if not renderer_class.run_details:
+        write_run_details(
+            output_file, options.get("collection_failures"), options.get("changes")
+        )
+    sections = {
+        UNAFFECTED: unaffected_devices,
+        NO_UPGRADE_REQUIRED: no_upgrade_required,
+        UPGRADE_REQUIRED: upgrade_required,
+        GLOBALPROTECT: devices_with_globalprotect,
+        CERTIFICATES: devices_with_certificates,
+    }
+
+    key = None
+    if cache is not None:
+        from device_certificate_report.utilities.report_cache import (
+            detach,
+            report_key,
+        )
+
+        key = report_key(output_format, sections, options)
+        try:
+            if cache.fetch(key, output_format.extension, output_file):
+                logger.info(f"Reused cached report {key[:12]} for {output_file}.")
+                return True
+        except OSError as e:
+            logger.warning(f"Cached report unavailable, rendering it again: {e}")
+        # The previous report may still be linked to a cache entry
+        detach(output_file)
+
+    with renderer_class(output_file, **options) as renderer:
+        for section, devices in sections.items():
+            renderer.write_section(section, devices)
+        renderer.finish()
+
+    if cache is not None:
+        try:
+            cache.store(key, output_format.extension, output_file)
+        except OSError as e:
+            logger.warning(f"Could not add the report to the cache: {e}")
+    return False
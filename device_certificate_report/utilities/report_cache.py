@@ -0,0 +1,263 @@
+# device_certificate_report/utilities/report_cache.py
+
+import hashlib
+import logging
+import os
+import shutil
+
+from functools import lru_cache
+from importlib.metadata import PackageNotFoundError, version
+from itertools import islice
+from operator import attrgetter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from device_certificate_report.config.defaults import DEFAULT_REPORT_CACHE_SIZE_MB
+from device_certificate_report.config.hardware_families import (
+    AffectedFamilies,
+    UnaffectedFamilies,
+)
+from device_certificate_report.config.panos_versions import MinimumPatchedVersions
+from device_certificate_report.models.device_table import DEVICE_FIELDS, DeviceTable
+from device_certificate_report.utilities.renderers import Devices
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever a renderer's output changes for the same input, so reports
+# rendered by older code are never served
+REPORT_CACHE_VERSION = 3
+
+# Rows hashed per update call
+_ROWS_PER_UPDATE = 4096
+
+# A device's field values in DEVICE_FIELDS order
+_device_row = attrgetter(*DEVICE_FIELDS)
+
+
+def default_report_cache_dir() -> Path:
+    """
+    Return the default report cache directory under the user's cache directory.
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "device-certificate-report" / "reports"
+
+
+@lru_cache(maxsize=None)
+def _advisory_digest() -> bytes:
+    # The tables that decide how devices are classified, together with the
+    # code that renders them
+    try:
+        package_version = version("device-certificate-report")
+    except PackageNotFoundError:
+        package_version = "unknown"
+    tables = (
+        REPORT_CACHE_VERSION,
+        package_version,
+        sorted(AffectedFamilies.items()),
+        sorted(UnaffectedFamilies.items()),
+        sorted(MinimumPatchedVersions.items()),
+    )
+    return hashlib.sha256(repr(tables).encode()).digest()
+
+
+def _normalize_option(name: str, value: Any) -> Any:
+    if name == "collection_failures":
+        return [(failure.hostname, failure.error) for failure in value or ()]
+    if name == "changes":
+        if value is None:
+            return None
+        return (
+            [
+                (
+                    change.kind,
+                    change.serial_number,
+                    sorted(change.fields.items()),
+                    _device_row(change.device),
+                )
+                for change in value.changes
+            ],
+            value.unchanged,
+        )
+    if name == "render_workers":
+        # A single process and no workers render the same document
+        return value if value and value > 1 else None
+    if name == "expiry_histogram":
+        return [tuple(bucket) for bucket in value] if value is not None else None
+    return value
+
+
+def report_key(
+    output_format: str, sections: Dict[str, Devices], options: Dict[str, Any]
+) -> str:
+    """
+    Return a key identifying the report `render_report` would write.
+
+    The key is a SHA-256 over the advisory tables, the output format, every
+    section's device rows in order and the renderer options, so two calls
+    share a key only if they would produce the same report.
+
+    Parameters
+    ----------
+    output_format : str
+        The report format.
+    sections : Dict[str, Devices]
+        The report sections keyed by section name, in report order.
+    options : Dict[str, Any]
+        The renderer options passed to `render_report`.
+
+    Returns
+    -------
+    str
+        The key as a hexadecimal string.
+    """
+    hasher = hashlib.sha256(_advisory_digest())
+    hasher.update(repr(str(output_format)).encode())
+    for name, devices in sections.items():
+        hasher.update(f"\x1e{name}\x1e".encode())
+        if isinstance(devices, DeviceTable):
+            rows = zip(*(devices.column(field) for field in DEVICE_FIELDS))
+        else:
+            rows = map(_device_row, devices)
+        # The repr of a batch of tuples of strings and None is unambiguous
+        while True:
+            batch = list(islice(rows, _ROWS_PER_UPDATE))
+            if not batch:
+                break
+            hasher.update(repr(batch).encode())
+    # Options left at their defaults (None, False, empty) are skipped, so
+    # passing one explicitly does not change the key
+    normalized = sorted(
+        (name, value)
+        for name, value in (
+            (name, _normalize_option(name, value)) for name, value in options.items()
+        )
+        if value
+    )
+    hasher.update(f"\x1e{normalized!r}".encode())
+    return hasher.hexdigest()
+
+
+def _replace_with_link(source: Path, target: str):
+    """
+    Make `target` a hard link to `source`, or a copy of it where linking is
+    not possible (another file system, or no hard link support). The target
+    is replaced atomically, so it is never seen half written.
+    """
+    if os.path.exists(target) and os.path.samefile(source, target):
+        return
+    temporary = f"{target}.{os.getpid()}.tmp"
+    try:
+        os.link(source, temporary)
+    except OSError:
+        shutil.copyfile(source, temporary)
+    try:
+        os.replace(temporary, target)
+    except OSError:
+        os.unlink(temporary)
+        raise
+
+
+def detach(output_file: str):
+    """
+    Remove `output_file` if it is a hard link to another file, such as a
+    cached report, so writing a new report there cannot change the other.
+    """
+    try:
+        if os.stat(output_file).st_nlink > 1:
+            os.unlink(output_file)
+    except FileNotFoundError:
+        pass
+
+
+class ReportCache:
+    """
+    Directory of rendered reports named by their `report_key`.
+
+    A cached report is placed at the requested output path as a hard link,
+    falling back to a copy, so reusing even a large PDF costs a few system
+    calls. Entries are evicted least recently used first once the directory
+    grows past `max_bytes`.
+
+    Because the output file and the cache entry share their contents, reports
+    written by this tool replace rather than overwrite an output file that is
+    still linked to the cache.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Union[str, Path]] = None,
+        max_bytes: int = DEFAULT_REPORT_CACHE_SIZE_MB * 2**20,
+    ):
+        self.directory = Path(directory) if directory else default_report_cache_dir()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+    def path(self, key: str, extension: str) -> Path:
+        return self.directory / f"{key}{extension}"
+
+    def fetch(self, key: str, extension: str, output_file: str) -> bool:
+        """
+        Place the cached report for `key` at `output_file`.
+
+        Returns
+        -------
+        bool
+            True if the report was cached, False if it has to be rendered.
+        """
+        entry = self.path(key, extension)
+        try:
+            # The modification time orders entries for eviction
+            os.utime(entry)
+        except FileNotFoundError:
+            return False
+        _replace_with_link(entry, output_file)
+        return True
+
+    def store(self, key: str, extension: str, report_file: str):
+        """
+        Add the report just written to `report_file` under `key`, then evict
+        old entries if the cache is over its size limit.
+        """
+        entry = self.path(key, extension)
+        _replace_with_link(Path(report_file), str(entry))
+        self.evict(keep=entry)
+
+    def entries(self) -> List[Tuple[Path, os.stat_result]]:
+        """
+        Return the cached reports with their stat results, least recently
+        used first.
+        """
+        entries = []
+        for path in self.directory.iterdir():
+            if path.suffix == ".tmp" or not path.is_file():
+                continue
+            try:
+                entries.append((path, path.stat()))
+            except FileNotFoundError:
+                # Evicted by another process meanwhile
+                continue
+        entries.sort(key=lambda entry: entry[1].st_mtime)
+        return entries
+
+    def evict(self, keep: Optional[Path] = None) -> int:
+        """
+        Remove the least recently used reports until the cache fits in
+        `max_bytes`, never removing `keep`. Returns the number removed.
+        """
+        entries = self.entries()
+        total = sum(stat.st_size for _, stat in entries)
+        removed = 0
+        for path, stat in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= stat.st_size
+            removed += 1
+        if removed:
+            logger.info(f"Evicted {removed} cached reports.")
+        return removed
@@ -0,0 +1,355 @@
+# device_certificate_report/utilities/sharding.py
+
+import html
+import logging
+import os
+import re
+
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Union,
+)
+
+from device_certificate_report.components.expiry import certificate_sections
+from device_certificate_report.components.model_index import resolve_model
+from device_certificate_report.config.output_formats import OutputFormat, ShardBy
+from device_certificate_report.models.device import CollectionFailure, DeviceInfo
+from device_certificate_report.models.device_table import DeviceRow
+from device_certificate_report.utilities.classification import (
+    BUCKETS,
+    DEVICES,
+    Classification,
+)
+from device_certificate_report.utilities.filters import (
+    NO_UPGRADE_REQUIRED,
+    UNAFFECTED,
+    UPGRADE_REQUIRED,
+)
+from device_certificate_report.utilities.incremental import SnapshotDiff
+from device_certificate_report.utilities.renderers import (
+    SECTION_TITLES,
+    HtmlRenderer,
+    render_report,
+)
+
+if TYPE_CHECKING:
+    from device_certificate_report.utilities.report_cache import ReportCache
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.html"
+
+# Shard names for devices the key does not place
+UNRECOGNIZED_FAMILY = "unrecognized"
+UNKNOWN_SOURCE = "unknown source"
+UNKNOWN_MODEL_NAME = "unknown model"
+
+
+class Shard(NamedTuple):
+    name: str
+    classification: Classification
+    changes: Optional[SnapshotDiff] = None
+
+
+class ShardReport(NamedTuple):
+    name: str
+    # Path of the shard's report, relative to the output directory
+    file_name: str
+    counters: Dict[str, int]
+    cached: bool
+
+
+def _family(device: DeviceInfo) -> str:
+    return resolve_model(device.model).family or UNRECOGNIZED_FAMILY
+
+
+def _source(device: DeviceInfo) -> str:
+    return device.source or UNKNOWN_SOURCE
+
+
+def _model(device: DeviceInfo) -> str:
+    # Spelling variants of a listed model land in the same shard
+    return (
+        resolve_model(device.model).model
+        or (device.model or "").strip()
+        or UNKNOWN_MODEL_NAME
+    )
+
+
+SHARD_KEYS: Dict[ShardBy, Callable[[DeviceInfo], str]] = {
+    ShardBy.FAMILY: _family,
+    ShardBy.SOURCE: _source,
+    ShardBy.MODEL: _model,
+}
+
+
+def shard_file_name(name: str, output_format: Union[OutputFormat, str]) -> str:
+    """
+    Return a file name for the shard called `name`, safe on every platform.
+    """
+    stem = re.sub(r"[^A-Za-z0-9._-]+", "_", name).strip("._") or "shard"
+    return f"{stem}{OutputFormat(output_format).extension}"
+
+
+def split_classification(
+    classification: Classification,
+    shard_by: Union[ShardBy, str],
+    changes: Optional[SnapshotDiff] = None,
+) -> List[Shard]:
+    """
+    Split a classified fleet into one classification per shard.
+
+    Every device stays in the same buckets, in the same order, within its
+    shard. Changes since the last run, when given, go to the shard of the
+    device they concern.
+
+    Parameters
+    ----------
+    classification : Classification
+        The classified fleet.
+    shard_by : ShardBy
+        Split by hardware family, source appliance or model.
+    changes : SnapshotDiff, optional
+        The changes since the last run.
+
+    Returns
+    -------
+    List[Shard]
+        The shards sorted by name.
+    """
+    key = SHARD_KEYS[ShardBy(shard_by)]
+    # Devices appear in several buckets; their key is worked out once
+    keys: Dict[int, str] = {}
+
+    def shard_of(device: DeviceInfo) -> str:
+        if isinstance(device, DeviceRow):
+            # Rows of a DeviceTable are made afresh on each pass, so their ids
+            # can be reused by other rows
+            return key(device)
+        name = keys.get(id(device))
+        if name is None:
+            name = keys[id(device)] = key(device)
+        return name
+
+    buckets: Dict[str, Dict[str, List[DeviceInfo]]] = {}
+    for bucket in BUCKETS:
+        for device in classification.buckets[bucket]:
+            name = shard_of(device)
+            shard = buckets.get(name)
+            if shard is None:
+                shard = buckets[name] = {bucket: [] for bucket in BUCKETS}
+            shard[bucket].append(device)
+
+    shard_changes: Dict[str, Dict[str, list]] = {}
+    if changes is not None:
+        for kind in ("added", "changed", "removed"):
+            for change in getattr(changes, kind):
+                name = shard_of(change.device)
+                shard_changes.setdefault(
+                    name, {"added": [], "changed": [], "removed": []}
+                )[kind].append(change)
+
+    shards = []
+    for name in sorted(set(buckets) | set(shard_changes)):
+        shard_buckets = buckets.get(name) or {bucket: [] for bucket in BUCKETS}
+        counters = Counter(
+            {bucket: len(devices) for bucket, devices in shard_buckets.items()}
+        )
+        counters[DEVICES] = (
+            counters[UNAFFECTED]
+            + counters[NO_UPGRADE_REQUIRED]
+            + counters[UPGRADE_REQUIRED]
+        )
+        shard_diff = None
+        if changes is not None:
+            kinds = shard_changes.get(name, {"added": [], "changed": [], "removed": []})
+            unchanged = counters[DEVICES] - len(kinds["added"]) - len(kinds["changed"])
+            shard_diff = SnapshotDiff(
+                kinds["added"], kinds["changed"], kinds["removed"], max(unchanged, 0)
+            )
+        shards.append(Shard(name, Classification(shard_buckets, counters), shard_diff))
+    return shards
+
+
+def _render_shard(
+    output_format: OutputFormat,
+    shard: Shard,
+    output_file: str,
+    expiring_within: Optional[int],
+    cache: Optional["ReportCache"],
+    options: Dict[str, Any],
+) -> bool:
+    sections = shard.classification.sections()
+    sections.update(
+        certificate_sections(shard.classification.certificates, expiring_within)
+    )
+    return render_report(
+        output_format,
+        output_file=output_file,
+        cache=cache,
+        changes=shard.changes,
+        **sections,
+        **options,
+    )
+
+
+def write_index(
+    directory: str,
+    shard_by: Union[ShardBy, str],
+    reports: Sequence[ShardReport],
+    collection_failures: Optional[Sequence[CollectionFailure]] = None,
+) -> str:
+    """
+    Write an HTML page listing every shard's report with its section counts,
+    followed by the collection failures, and return its path.
+    """
+    path = os.path.join(directory, INDEX_FILE)
+    columns = (DEVICES, *BUCKETS)
+    headers = "".join(
+        f"<th>{html.escape(SECTION_TITLES.get(column, 'Devices'))}</th>"
+        for column in columns
+    )
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(
+            '<!DOCTYPE html>\n<html><head><meta charset="utf-8">'
+            "<title>Device Certificate Report</title>"
+            f"<style>{HtmlRenderer.STYLE}</style></head>\n"
+            "<body><h1>Device Certificate Report</h1>\n"
+            f"<p>One report per {html.escape(ShardBy(shard_by).value)}.</p>\n"
+            f"<table><thead><tr><th>Report</th>{headers}</tr></thead><tbody>\n"
+        )
+        for report in reports:
+            link = html.escape(report.file_name, quote=True)
+            counts = "".join(
+                f"<td>{report.counters.get(column, 0)}</td>" for column in columns
+            )
+            file.write(
+                f'<tr><td><a href="{link}">{html.escape(report.name)}</a></td>'
+                f"{counts}</tr>\n"
+            )
+        file.write("</tbody></table>\n")
+        if collection_failures:
+            file.write(
+                '<h2 id="failures">Collection Failures</h2>\n<table><thead><tr>'
+                "<th>Hostname</th><th>Error</th></tr></thead><tbody>\n"
+            )
+            file.writelines(
+                f"<tr><td>{html.escape(failure.hostname)}</td>"
+                f"<td>{html.escape(failure.error)}</td></tr>\n"
+                for failure in collection_failures
+            )
+            file.write("</tbody></table>\n")
+        file.write("</body></html>\n")
+    return path
+
+
+def render_shards(
+    output_format: Union[OutputFormat, str],
+    classification: Classification,
+    directory: str,
+    shard_by: Union[ShardBy, str],
+    workers: Optional[int] = None,
+    expiring_within: Optional[int] = None,
+    changes: Optional[SnapshotDiff] = None,
+    collection_failures: Optional[Sequence[CollectionFailure]] = None,
+    cache: Optional["ReportCache"] = None,
+    **options,
+) -> List[ShardReport]:
+    """
+    Write one report per shard of the fleet into `directory`, rendering the
+    shards concurrently in a process pool, then an index page linking them.
+
+    Parameters
+    ----------
+    output_format : Union[OutputFormat, str]
+        The format of every shard's report.
+    classification : Classification
+        The classified fleet.
+    directory : str
+        The directory the reports and the index are written to; created if
+        missing.
+    shard_by : ShardBy
+        Split by hardware family, source appliance or model.
+    workers : int, optional
+        Number of rendering processes; one per CPU by default.
+    expiring_within : int, optional
+        Limit each certificate section to certificates expiring within this
+        many days.
+    changes : SnapshotDiff, optional
+        Changes since the last run, split across the shards.
+    collection_failures : Sequence[CollectionFailure], optional
+        Hosts that could not be collected from, listed on the index page.
+    cache : ReportCache, optional
+        Reuse shards whose report is already cached.
+    **options
+        Other `render_report` options applied to every shard.
+
+    Returns
+    -------
+    List[ShardReport]
+        The shards' reports, sorted by shard name. The index page is
+        written to `directory`/index.html.
+    """
+    output_format = OutputFormat(output_format)
+    os.makedirs(directory, exist_ok=True)
+    shards = split_classification(classification, shard_by, changes)
+    file_names = []
+    for shard in shards:
+        file_name = shard_file_name(shard.name, output_format)
+        # Distinct shard names can map to the same safe file name
+        while file_name in file_names:
+            stem = file_name[: -len(output_format.extension)]
+            file_name = f"{stem}_{output_format.extension}"
+        file_names.append(file_name)
+
+    tasks = [
+        (
+            output_format,
+            shard,
+            os.path.join(directory, file_name),
+            expiring_within,
+            cache,
+            options,
+        )
+        for shard, file_name in zip(shards, file_names)
+    ]
+    workers = workers or os.cpu_count() or 1
+    cached: Optional[List[bool]] = None
+    if workers > 1 and len(tasks) > 1:
+        try:
+            # The largest shards start first, so none is left running alone
+            order = sorted(
+                range(len(tasks)),
+                key=lambda i: -shards[i].classification.counters[DEVICES],
+            )
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+                futures = {i: executor.submit(_render_shard, *tasks[i]) for i in order}
+                cached = [futures[i].result() for i in range(len(tasks))]
+        except (OSError, BrokenProcessPool) as e:
+            logger.warning(
+                f"Parallel rendering failed ({e}); rendering the shards in a "
+                "single process."
+            )
+    if cached is None:
+        cached = [_render_shard(*task) for task in tasks]
+
+    reports = [
+        ShardReport(shard.name, file_name, dict(shard.classification.counters), hit)
+        for shard, file_name, hit in zip(shards, file_names, cached)
+    ]
+    write_index(directory, shard_by, reports, collection_failures)
+    logger.info(
+        f"Wrote {len(reports)} reports by {ShardBy(shard_by).value} to {directory} "
+        f"({sum(cached)} from the cache)."
+    )
+    return reports
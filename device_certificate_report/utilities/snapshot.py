@@ -0,0 +1,265 @@
+# device_certificate_report/utilities/snapshot.py
+
+import logging
+import os
+import sqlite3
+import time
+
+from contextlib import closing
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional
+
+from device_certificate_report.config.defaults import DEFAULT_CACHE_TTL
+from device_certificate_report.models.device import DeviceInfo
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    source TEXT PRIMARY KEY,
+    collected_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS devices (
+    source TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    serial_number TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (source, position)
+);
+CREATE TABLE IF NOT EXISTS classified_snapshots (
+    source TEXT PRIMARY KEY,
+    classified_at REAL NOT NULL,
+    advisory_digest TEXT
+);
+CREATE TABLE IF NOT EXISTS classified_devices (
+    source TEXT NOT NULL,
+    serial_number TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    min_required_version TEXT,
+    notes TEXT,
+    PRIMARY KEY (source, serial_number)
+) WITHOUT ROWID;
+"""
+
+
+def default_snapshot_path() -> Path:
+    """
+    Return the default snapshot database path under the user's cache directory.
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "device-certificate-report" / "snapshots.sqlite3"
+
+
+class Snapshot(NamedTuple):
+    source: str
+    collected_at: float
+    devices: List[DeviceInfo]
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.collected_at
+
+
+class ClassifiedRow(NamedTuple):
+    # The device's tracked fields, encoded by `incremental.fingerprint`
+    fingerprint: str
+    bucket: str
+    min_required_version: Optional[str]
+    notes: Optional[str]
+
+
+class ClassifiedState(NamedTuple):
+    # Classification results of the last run, keyed by serial number
+    rows: Dict[str, ClassifiedRow]
+    # Digest of the advisory tables the results were worked out against
+    advisory_digest: Optional[str] = None
+
+
+class SnapshotStore:
+    """
+    On-disk store of collected devices, keyed by the source they came from.
+
+    Each `save` replaces the previous snapshot for that source. `get_or_collect`
+    serves a snapshot younger than `ttl` seconds (unless `refresh` is set) and
+    otherwise collects afresh and stores the result.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: float = DEFAULT_CACHE_TTL,
+        refresh: bool = False,
+    ):
+        self.path = Path(path) if path else default_snapshot_path()
+        self.ttl = ttl
+        self.refresh = refresh
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # One short-lived connection per call keeps the store usable from threads
+        return sqlite3.connect(str(self.path), timeout=30)
+
+    def save(
+        self,
+        source: str,
+        devices: List[DeviceInfo],
+        collected_at: Optional[float] = None,
+    ):
+        """
+        Store the devices collected from `source`, replacing any earlier snapshot.
+        """
+        collected_at = time.time() if collected_at is None else collected_at
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM devices WHERE source = ?", (source,))
+            conn.execute(
+                "INSERT OR REPLACE INTO snapshots (source, collected_at) VALUES (?, ?)",
+                (source, collected_at),
+            )
+            conn.executemany(
+                "INSERT INTO devices (source, position, serial_number, data) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    (source, position, device.serial_number, device.model_dump_json())
+                    for position, device in enumerate(devices)
+                ),
+            )
+
+    def load(self, source: str, max_age: Optional[float] = None) -> Optional[Snapshot]:
+        """
+        Return the snapshot for `source`, or None if there is none or it is
+        older than `max_age` seconds.
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT collected_at FROM snapshots WHERE source = ?", (source,)
+            ).fetchone()
+            if row is None:
+                return None
+            collected_at = row[0]
+            if max_age is not None and time.time() - collected_at > max_age:
+                return None
+            devices = [
+                DeviceInfo.model_validate_json(data)
+                for (data,) in conn.execute(
+                    "SELECT data FROM devices WHERE source = ? ORDER BY position",
+                    (source,),
+                )
+            ]
+        return Snapshot(source, collected_at, devices)
+
+    def delete(self, source: str):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM devices WHERE source = ?", (source,))
+            conn.execute("DELETE FROM snapshots WHERE source = ?", (source,))
+            conn.execute("DELETE FROM classified_devices WHERE source = ?", (source,))
+            conn.execute("DELETE FROM classified_snapshots WHERE source = ?", (source,))
+
+    def load_classified(self, source: str) -> Optional[ClassifiedState]:
+        """
+        Return the classification results stored for `source`, or None if
+        there are none.
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT advisory_digest FROM classified_snapshots WHERE source = ?",
+                (source,),
+            ).fetchone()
+            if row is None:
+                return None
+            results = conn.execute(
+                "SELECT serial_number, fingerprint, bucket, min_required_version, "
+                "notes FROM classified_devices WHERE source = ?",
+                (source,),
+            ).fetchall()
+        rows = {
+            serial_number: ClassifiedRow(fingerprint, bucket, version, notes)
+            for serial_number, fingerprint, bucket, version, notes in results
+        }
+        return ClassifiedState(rows, row[0])
+
+    def save_classified(
+        self,
+        source: str,
+        upserts: Mapping[str, ClassifiedRow],
+        deleted: Iterable[str] = (),
+        advisory_digest: Optional[str] = None,
+        replace: bool = False,
+    ):
+        """
+        Record classification results for `source`: the rows in `upserts` are
+        added or replace those of the same serial number, and the serial
+        numbers in `deleted` are dropped. With `replace`, every earlier row is
+        dropped first.
+        """
+        with closing(self._connect()) as conn, conn:
+            if replace:
+                conn.execute(
+                    "DELETE FROM classified_devices WHERE source = ?", (source,)
+                )
+            conn.execute(
+                "INSERT OR REPLACE INTO classified_snapshots "
+                "(source, classified_at, advisory_digest) VALUES (?, ?, ?)",
+                (source, time.time(), advisory_digest),
+            )
+            conn.executemany(
+                "DELETE FROM classified_devices WHERE source = ? AND serial_number = ?",
+                ((source, serial_number) for serial_number in deleted),
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO classified_devices (source, serial_number, "
+                "fingerprint, bucket, min_required_version, notes) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (source, serial_number, *row)
+                    for serial_number, row in upserts.items()
+                ),
+            )
+
+    def is_fresh(self, source: str) -> bool:
+        """
+        Return whether `fresh` would serve a snapshot for `source`, without
+        loading its devices.
+        """
+        if self.refresh:
+            return False
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT collected_at FROM snapshots WHERE source = ?", (source,)
+            ).fetchone()
+        return row is not None and time.time() - row[0] <= self.ttl
+
+    def fresh(self, source: str) -> Optional[List[DeviceInfo]]:
+        """
+        Return the cached devices for `source` if fresh enough and reuse is
+        allowed, otherwise None.
+        """
+        if self.refresh:
+            return None
+        snapshot = self.load(source, max_age=self.ttl)
+        if snapshot is None:
+            return None
+        logger.info(
+            f"Using snapshot of {source} taken {snapshot.age:.0f}s ago "
+            f"({len(snapshot.devices)} devices)."
+        )
+        return snapshot.devices
+
+    def get_or_collect(
+        self, source: str, collect: Callable[[], List[DeviceInfo]]
+    ) -> List[DeviceInfo]:
+        """
+        Return the cached devices for `source` if fresh enough, otherwise call
+        `collect` and store what it returns.
+        """
+        devices = self.fresh(source)
+        if devices is not None:
+            return devices
+        devices = collect()
+        # Collectors log and return nothing on failure; don't let that
+        # overwrite a good snapshot
+        if devices:
+            self.save(source, devices)
+        return devices
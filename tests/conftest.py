@@ -2,7 +2,26 @@
 
 import pytest
 from tests.factories import DeviceInfoFactory
+from tests.xml_api import (
+    TlsXmlApiHandler,
+    self_signed_context,
+    start_server,
+    stop_server,
+)
 
 @pytest.fixture
 def sample_device():
-    return DeviceInfoFactory()
\ No newline at end of file
+    return DeviceInfoFactory()
+
+@pytest.fixture
+def xml_api():
+    server = start_server()
+    yield server
+    stop_server(server)
+
+@pytest.fixture
+def tls_xml_api(tmp_path):
+    server = start_server(TlsXmlApiHandler, self_signed_context(tmp_path))
+    server.drop_connections = True
+    yield server
+    stop_server(server)
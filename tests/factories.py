@@ -17,4 +17,5 @@ class DeviceInfoFactory(factory.Factory):
     software_version = "10.0.0"
     globalprotect_client = "5.2.6"
     min_required_version = None
-    notes = None
\ No newline at end of file
+    notes = None
+    source = None
\ No newline at end of file
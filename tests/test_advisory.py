@@ -0,0 +1,70 @@
+# tests/test_advisory.py
+
+import traceback
+
+import pytest
+from device_certificate_report.components.advisory import AdvisoryIndex
+from device_certificate_report.components.version import parse_version
+from device_certificate_report.config.panos_versions import MinimumPatchedVersions
+
+def linear_lookup(device_version, is_global_protect=False):
+    current = parse_version(device_version)
+    if current.major > 11 or (current.major == 11 and current.feature >= 2):
+        return False, ""
+    feature_release = f"{current.major}.{current.feature}"
+    if is_global_protect and feature_release in ["10.2", "11.0", "11.1"]:
+        feature_release += "-gp"
+    min_versions = MinimumPatchedVersions.get(feature_release)
+    if not min_versions:
+        if current.major < 8 or (current.major == 8 and current.feature < 1):
+            return True, "8.1.0"
+        return False, ""
+    for min_version in min_versions:
+        if current < min_version:
+            return True, repr(min_version)
+    return False, ""
+
+def test_lookup_matches_linear_scan():
+    index = AdvisoryIndex(MinimumPatchedVersions)
+    versions = [
+        f"{major}.{feature}.{maintenance}" + (f"-h{hotfix}" if hotfix else "")
+        for major, feature in [(7, 1), (8, 1), (9, 0), (9, 1), (10, 0), (10, 1),
+                               (10, 2), (11, 0), (11, 1), (11, 2)]
+        for maintenance in range(0, 28, 3)
+        for hotfix in (0, 3, 8, 13)
+    ]
+    for version in versions:
+        for gp in (False, True):
+            assert index.lookup(version, gp) == linear_lookup(version, gp)
+
+def test_lookup_invalid_version():
+    index = AdvisoryIndex(MinimumPatchedVersions)
+    errors = []
+    for _ in range(3):
+        with pytest.raises(ValueError, match="Error parsing version 'bogus'") as e:
+            index.lookup("bogus")
+        errors.append(e.value)
+    # A new error each time, so tracebacks do not pile up on a cached one
+    assert len({id(error) for error in errors}) == 3
+    depth = [len(traceback.extract_tb(error.__traceback__)) for error in errors]
+    assert depth[0] == depth[-1]
+
+def test_classify_versions_resolves_each_version_once():
+    index = AdvisoryIndex(MinimumPatchedVersions)
+    versions = ["9.1.10", "11.2.0", "9.1.10", "bogus", "", "9.1.10"]
+
+    results = index.classify_versions(versions)
+
+    assert results == [
+        (True, "9.1.11-h5"),
+        (False, ""),
+        (True, "9.1.11-h5"),
+        None,
+        None,
+        (True, "9.1.11-h5"),
+    ]
+    assert index.stats()["misses"] == 3
+    assert index.stats()["hits"] == 0
+
+    index.classify_versions(["9.1.10"])
+    assert index.stats()["hits"] == 1
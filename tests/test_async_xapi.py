@@ -0,0 +1,102 @@
+# tests/test_async_xapi.py
+
+import asyncio
+
+from device_certificate_report.components.async_xapi import (
+    AsyncXapi,
+    collect_firewall,
+    collect_panorama,
+    run_concurrently_async,
+)
+from device_certificate_report.components.data_collection import FIREWALL_COMMANDS
+
+
+def client(server, **kwargs):
+    return AsyncXapi(
+        "127.0.0.1",
+        "admin",
+        "secret",
+        port=server.server_address[1],
+        ssl_context=False,
+        **kwargs,
+    )
+
+
+def test_concurrent_requests_share_keep_alive_connections(xml_api):
+    async def run():
+        async with client(xml_api, max_connections=2) as api:
+            responses = await asyncio.gather(
+                *(api.op(FIREWALL_COMMANDS["system_info"]) for _ in range(40))
+            )
+            (device,) = await collect_firewall(api)
+            return api, responses, device
+
+    api, responses, device = asyncio.run(run())
+
+    assert {r.findtext(".//hostname") for r in responses} == {"fw1"}
+    assert api.requests_sent == 43
+    assert api.connections_opened <= 2 and xml_api.connections <= 2
+    assert device.device_certificate == "Valid"
+    assert device.device_certificate_expiry_date == "2030/01/01 00:00:00"
+    assert device.globalprotect_client == ""
+
+
+def test_dropped_idle_connection_is_replaced(xml_api):
+    xml_api.drop_connections = True
+
+    async def run():
+        async with client(xml_api, max_connections=1) as api:
+            return api, await collect_panorama(api)
+
+    api, devices = asyncio.run(run())
+
+    assert [(d.device_name, d.device_state) for d in devices] == [
+        ("fw1", "Connected"),
+        ("fw2", "Disconnected"),
+    ]
+    # keygen on the first connection, the command retried on a second
+    assert api.connections_opened == 2
+
+
+def test_failures_are_recorded_per_host(xml_api):
+    results, failures = run_concurrently_async(
+        ["127.0.0.1", "localhost", "127.0.0.1"],
+        collect_firewall,
+        "admin",
+        "secret",
+        port=xml_api.server_address[1],
+        ssl_context=False,
+    )
+    assert [hostname for hostname, _ in results] == ["127.0.0.1", "127.0.0.1"]
+    assert [failure.hostname for failure in failures] == ["localhost"]
+
+    _, failures = run_concurrently_async(
+        ["127.0.0.1"],
+        collect_panorama,
+        "admin",
+        "wrong",
+        port=xml_api.server_address[1],
+        ssl_context=False,
+    )
+    assert "Invalid Credential" in failures[0].error
+
+
+def test_new_connections_resume_the_tls_session(tls_xml_api):
+    async def run():
+        # The default context, which does not verify the certificate
+        async with AsyncXapi(
+            "127.0.0.1",
+            "admin",
+            "secret",
+            port=tls_xml_api.server_address[1],
+            max_connections=1,
+        ) as api:
+            return api, await collect_panorama(api)
+
+    api, devices = asyncio.run(run())
+
+    assert len(devices) == 2
+    # Every response closes its connection, so keygen and the command each
+    # open one; the second resumes the session of the first
+    assert api.connections_opened == 2
+    assert tls_xml_api.session_reused == [False, True]
@@ -0,0 +1,124 @@
+# tests/test_classification.py
+
+from typer.testing import CliRunner
+
+from benchmarks.synthetic import write_panorama_csv
+from device_certificate_report.main import app
+from device_certificate_report.models.device import DeviceInfo
+from device_certificate_report.models.device_table import DeviceTable
+from device_certificate_report.utilities.classification import (
+    BUCKETS,
+    classify_devices,
+    classify_table,
+)
+from device_certificate_report.utilities.filters import (
+    filter_devices_by_model,
+    split_devices_by_version,
+)
+
+
+def device(serial_number, **fields):
+    # Built directly rather than with DeviceInfoFactory, whose name sequence
+    # other tests depend on
+    values = dict(
+        device_name=serial_number,
+        model="PA-220",
+        serial_number=serial_number,
+        ipv4_address="192.0.2.1",
+        device_state="Connected",
+        device_certificate="Valid",
+        device_certificate_expiry_date="2024-12-31",
+        software_version="10.0.0",
+        globalprotect_client="5.2.6",
+    )
+    values.update(fields)
+    return DeviceInfo(**values)
+
+
+def fleet():
+    return [
+        device("sn1", software_version="9.1.10"),
+        device("sn2", model="PA-460", globalprotect_client="0"),
+        device("sn3", software_version="11.2.0"),
+        device("sn4", model="UnknownModel"),
+        device("sn5", software_version=None),
+        device("sn6", software_version="9.1.10"),
+        device("sn7", device_certificate_expiry_date=None),
+    ]
+
+
+def serials(devices):
+    return [device.serial_number for device in devices]
+
+
+def test_classify_devices_matches_filter_and_split():
+    expected = fleet()
+    affected, unaffected = filter_devices_by_model(expected)
+    no_upgrade_required, upgrade_required = split_devices_by_version(affected)
+
+    devices = fleet()
+    classification = classify_devices(iter(devices))
+
+    assert serials(classification.unaffected) == serials(unaffected)
+    assert serials(classification.no_upgrade_required) == serials(
+        no_upgrade_required
+    )
+    assert serials(classification.upgrade_required) == serials(upgrade_required)
+    assert [(d.notes, d.min_required_version) for d in devices] == [
+        (d.notes, d.min_required_version) for d in expected
+    ]
+
+
+def test_classify_devices_fills_every_section_and_counters():
+    classification = classify_devices(fleet())
+
+    assert serials(classification.globalprotect) == [
+        "sn1", "sn3", "sn4", "sn5", "sn6", "sn7"
+    ]
+    assert "sn7" not in serials(classification.certificates)
+    assert classification.counters["devices"] == 7
+    assert serials(classification.upgrade_required) == ["sn1", "sn5", "sn6", "sn7"]
+    assert classification.counters["upgrade_required"] == 4
+    assert classification.counters["unrecognized_model"] == 1
+    assert classification.counters["unknown_version"] == 1
+    assert list(classification.sections()) == [
+        "unaffected_devices",
+        "no_upgrade_required",
+        "upgrade_required",
+        "devices_with_globalprotect",
+        "devices_with_certificates",
+    ]
+
+
+def test_classify_table_matches_classify_devices():
+    expected = classify_devices(fleet())
+    classification = classify_table(DeviceTable.from_devices(fleet()))
+
+    assert classification.counters == expected.counters
+    for bucket in BUCKETS:
+        assert isinstance(classification.buckets[bucket], DeviceTable)
+        assert classification.buckets[bucket].to_devices() == expected.buckets[bucket]
+
+
+def test_columnar_csv_report_matches_default(tmp_path):
+    csv_file = tmp_path / "panorama.csv"
+    write_panorama_csv(str(csv_file), 200, seed=3)
+
+    reports = {}
+    for options in ([], ["--columnar"], ["--columnar", "--shard-by", "family"]):
+        output_file = tmp_path / f"report{len(reports)}.jsonl"
+        result = CliRunner().invoke(
+            app,
+            ["csv", "--csv-file", str(csv_file), "--format", "jsonl"]
+            + ["--output-file", str(output_file)]
+            + options,
+        )
+        assert result.exit_code == 0, result.output
+        reports[tuple(options)] = output_file
+
+    assert reports[("--columnar",)].read_bytes() == reports[()].read_bytes()
+    shards = sorted((tmp_path / "report2").glob("*.jsonl"))
+    assert len(shards) > 1
+    assert sum(len(shard.read_text().splitlines()) for shard in shards) == len(
+        reports[()].read_text().splitlines()
+    )
@@ -1,9 +1,12 @@
 # tests/test_cleaner.py
 
+from device_certificate_report.components.parallel_csv import clean_csv_chunks
 from device_certificate_report.utilities.cleaner import clean_html_tags, clean_csv
 import csv
 import io
 
+import pytest
+
 def test_clean_html_tags():
     text = '<p>"Some;Text";</p>'
     cleaned = clean_html_tags(text)
@@ -25,4 +28,39 @@ def test_clean_csv(tmp_path):
         rows = list(reader)
         assert rows[0] == ['Column1', 'Column2']
         assert rows[1] == ['Data1', 'Data2']
-        assert rows[2] == ['Data;3', 'Data;4']
\ No newline at end of file
+        assert rows[2] == ['Data;3', 'Data;4']
+
+def test_clean_html_tags_decodes_entities():
+    assert clean_html_tags("  PA-220  ") == "PA-220"
+    assert clean_html_tags("<td>R&amp;D &lt;lab&gt;</td>") == "R&D <lab>"
+    assert clean_html_tags('<b>fw1</b>";;"<b>fw2</b>') == "fw1;fw2"
+
+def test_clean_csv_in_parallel_chunks(tmp_path):
+    rows = [["Device Name", "Model"]] + [
+        [f'<span class="x">fw{i}</span>', "PA-220 &amp; lab" if i % 7 else "PA\n460"]
+        for i in range(500)
+    ]
+    input_file = tmp_path / "input.csv"
+    with open(input_file, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f, quoting=csv.QUOTE_ALL).writerows(rows)
+
+    clean_csv(str(input_file), str(tmp_path / "serial.csv"))
+    clean_csv(str(input_file), str(tmp_path / "parallel.csv"), workers=2)
+    clean_csv_chunks(
+        str(input_file), str(tmp_path / "chunked.csv"), workers=3, chunk_size=1024
+    )
+
+    serial = (tmp_path / "serial.csv").read_bytes()
+    assert (tmp_path / "parallel.csv").read_bytes() == serial
+    assert (tmp_path / "chunked.csv").read_bytes() == serial
+    assert b"fw499,PA-220 & lab" in serial
+
+def test_clean_csv_rejects_invalid_worker_counts(tmp_path):
+    input_file = tmp_path / "input.csv"
+    input_file.write_text("Column1\nData1\n")
+
+    for workers in (0, -2):
+        with pytest.raises(ValueError, match="workers must be at least 1"):
+            clean_csv(str(input_file), str(tmp_path / "output.csv"), workers=workers)
+        with pytest.raises(ValueError, match="workers must be at least 1"):
+            clean_csv_chunks(str(input_file), str(tmp_path / "output.csv"), workers)
@@ -0,0 +1,159 @@
+# tests/test_daemon.py
+
+import json
+import threading
+import urllib.error
+import urllib.request
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from device_certificate_report.components import daemon
+from device_certificate_report.components.daemon import (
+    FleetPoller,
+    ReportService,
+    make_server,
+)
+from device_certificate_report.models.device import CollectionFailure, DeviceInfo
+
+
+def device(name, software_version="10.1.0"):
+    return DeviceInfo(
+        device_name=name,
+        model="PA-220",
+        serial_number=f"{name}-serial",
+        ipv4_address="192.0.2.1",
+        device_state="Connected",
+        device_certificate="Valid",
+        device_certificate_expiry_date="2030/01/01 00:00:00",
+        software_version=software_version,
+        globalprotect_client=None,
+    )
+
+
+@pytest.fixture
+def server():
+    servers = []
+
+    def start(service):
+        server = make_server(service, "127.0.0.1", 0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def get(url, headers=None):
+    request = urllib.request.Request(url, headers=headers or {})
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, dict(response.headers), response.read()
+    except urllib.error.HTTPError as e:
+        with e:
+            return e.code, dict(e.headers), e.read()
+
+
+def test_report_service_only_renders_changes(server):
+    fleet = {"fw1": "10.1.0", "fw2": "10.1.0"}
+    failures = []
+
+    def poll():
+        return [device(name, version) for name, version in fleet.items()], failures
+
+    service = ReportService(poll, output_format="jsonl")
+    url = server(service)
+    assert get(f"{url}/report")[0] == 503
+    assert get(f"{url}/healthz")[0] == 200
+
+    assert service.refresh()
+    status, headers, first = get(f"{url}/report")
+    assert status == 200
+    assert headers["Content-Type"].startswith("application/x-ndjson")
+    assert b"fw1" in first
+
+    # Nothing changed: no classification, no rendering, same report
+    assert not service.refresh()
+    assert service.renders == 1
+    assert get(f"{url}/report", {"If-None-Match": headers["ETag"]})[0] == 304
+    summary = json.loads(get(f"{url}/summary.json")[2])
+    assert summary["polls"] == 2
+    assert summary["reclassified"] == 0
+    assert summary["counters"]["devices"] == 2
+
+    fleet["fw2"] = "11.0.0"
+    failures.append(CollectionFailure(hostname="fw3", error="timed out"))
+    assert service.refresh()
+    status, _, report = get(f"{url}/report", {"If-None-Match": headers["ETag"]})
+    assert status == 200
+    summary = json.loads(get(f"{url}/summary.json")[2])
+    assert summary["reclassified"] == 1
+    assert summary["changes"] == {
+        "added": 0,
+        "changed": 1,
+        "removed": 0,
+        "unchanged": 1,
+    }
+    assert summary["collection_failures"] == [
+        {"hostname": "fw3", "error": "timed out"}
+    ]
+
+
+def test_failed_poll_keeps_last_report():
+    stop = threading.Event()
+    reports = []
+
+    def poll():
+        if service.served is not None:
+            reports.append(service.served.report)
+            stop.set()
+            raise RuntimeError("inventory unavailable")
+        return [device("fw1")], []
+
+    service = ReportService(poll, output_format="csv")
+    service.run(0, stop)
+
+    assert service.polls == 2
+    assert service.served.report == reports[0]
+    assert json.loads(service.served.summary)["last_error"] == "inventory unavailable"
+
+
+def test_fleet_poller_reuses_sessions(monkeypatch):
+    opened = []
+
+    class FakePanorama:
+        def __init__(self, hostname, username, password, **kwargs):
+            self.hostname = hostname
+            self.keys = 0
+            opened.append(self)
+
+        @property
+        def api_key(self):
+            self.keys += 1
+            return "key"
+
+        def op(self, cmd, cmd_xml=False):
+            if self.hostname == "down":
+                raise ConnectionError("unreachable")
+            return ET.fromstring(
+                "<response><result><devices><entry>"
+                "<hostname>fw1</hostname><model>PA-220</model>"
+                "<serial>fw1-serial</serial><sw-version>10.1.0</sw-version>"
+                "</entry></devices></result></response>"
+            )
+
+    monkeypatch.setattr(daemon, "Panorama", FakePanorama)
+    poller = FleetPoller(["pano1", "down"], [], "admin", "secret", retries=0)
+
+    for _ in range(3):
+        devices, failures = poller.poll()
+        assert [(d.device_name, d.source) for d in devices] == [("fw1", "pano1")]
+        assert [f.hostname for f in failures] == ["down"]
+
+    # One session for the healthy host; the failing one re-authenticates
+    assert [p.hostname for p in opened].count("pano1") == 1
+    assert [p.hostname for p in opened].count("down") == 3
+    assert opened[0].keys == 1
@@ -1,8 +1,10 @@
 # tests/test_data_collection.py
 
 import pytest
+import threading
 from unittest.mock import MagicMock
 from device_certificate_report.components.data_collection import (
+    iter_csv_devices,
     process_csv_file,
     collect_data_from_panorama,
     collect_data_from_firewall,
@@ -32,7 +34,9 @@ def test_process_csv_file(tmp_path):
     csv_file.write_text(csv_content)
 
     devices = process_csv_file(str(csv_file))
+    table = process_csv_file(str(csv_file), as_table=True)
 
+    assert table.to_devices() == devices
     assert len(devices) == 2
     assert devices[0].device_name == device1.device_name
     assert devices[0].model == device1.model
@@ -40,6 +44,28 @@ def test_process_csv_file(tmp_path):
     assert devices[1].device_name == device2.device_name
     assert devices[1].globalprotect_client is None  # Should be None because it's "0.0.0"
 
+def test_iter_csv_devices(tmp_path):
+    csv_content = """Device Name,IP Address Serial Number,IP Address IPv4,Model,Software Version,GlobalProtect Client
+"<p>fw1</p>;<p>fw2</p>","<p>sn1</p>;<p>sn2</p>","10.0.0.1;10.0.0.2","<b>PA-220</b>","10.1.0","0.0.0;5.2.6"
+"""
+    csv_file = tmp_path / "raw.csv"
+    csv_file.write_text(csv_content)
+    cleaned_file = tmp_path / "cleaned.csv"
+
+    devices = iter_csv_devices(str(csv_file))
+    assert not isinstance(devices, list)
+
+    devices = list(devices)
+    assert [d.device_name for d in devices] == ["fw1", "fw2"]
+    assert [d.serial_number for d in devices] == ["sn1", "sn2"]
+    assert devices[0].model == "PA-220"
+    assert devices[0].globalprotect_client is None
+    assert devices[1].globalprotect_client == "5.2.6"
+    assert not cleaned_file.exists()
+
+    list(iter_csv_devices(str(csv_file), cleaned_csv_file=str(cleaned_file)))
+    assert process_csv_file(str(cleaned_file)) == devices
+
 def test_collect_data_from_panorama(monkeypatch):
     # Mock Panorama instance
     panorama = Panorama("hostname", "username", "password")
@@ -96,6 +122,7 @@ def test_collect_data_from_panorama(monkeypatch):
     monkeypatch.setattr(panorama, "op", mock_op)
 
     devices = collect_data_from_panorama(panorama)
+    assert collect_data_from_panorama(panorama, as_table=True).to_devices() == devices
 
     assert len(devices) == 2
     assert devices[0].device_name == device1.device_name
@@ -103,9 +130,19 @@ def test_collect_data_from_panorama(monkeypatch):
     assert devices[1].device_name == device2.device_name
     assert devices[1].device_state == device2.device_state
 
+def test_collect_data_from_panorama_parse_errors(monkeypatch):
+    panorama = Panorama("hostname", "username", "password")
+    response = MagicMock()
+    response.findall.side_effect = ValueError("malformed response")
+    monkeypatch.setattr(panorama, "op", lambda cmd, cmd_xml=False: response)
+
+    assert collect_data_from_panorama(panorama) == []
+    with pytest.raises(ValueError, match="malformed response"):
+        collect_data_from_panorama(panorama, raise_on_error=True)
+
 def test_collect_data_from_firewall(monkeypatch):
     # Mock Firewall instance
-    firewall = Firewall("hostname", "username", "password")
+    firewall = Firewall("hostname", "username", "password", api_key="KEY")
 
     # Create a sample device using factory
     device = DeviceInfoFactory()
@@ -151,4 +188,54 @@ def test_collect_data_from_firewall(monkeypatch):
     assert collected_device.device_name == device.device_name
     assert collected_device.model == device.model
     assert collected_device.device_certificate == device.device_certificate
-    assert collected_device.device_certificate_expiry_date == device.device_certificate_expiry_date
\ No newline at end of file
+    assert collected_device.device_certificate_expiry_date == device.device_certificate_expiry_date
+
+def test_collect_data_from_firewall_overlaps_commands(monkeypatch):
+    firewall = Firewall("hostname", "username", "password", api_key="KEY")
+    # Both commands must be in flight at once for either to return
+    barrier = threading.Barrier(2, timeout=5)
+
+    def mock_op(cmd, cmd_xml=False):
+        barrier.wait()
+        if "system" in cmd:
+            return ET.fromstring(
+                "<response><result><system><hostname>fw1</hostname>"
+                "<model>PA-220</model></system></result></response>"
+            )
+        raise ConnectionError("certificate status unavailable")
+
+    monkeypatch.setattr(firewall, "op", mock_op)
+
+    timings = {}
+    collected_device = collect_data_from_firewall(firewall, timings=timings)
+
+    assert collected_device.device_name == "fw1"
+    assert collected_device.device_certificate_expiry_date == ""
+    assert set(timings) == {"system_info", "device_certificate"}
+
+def test_concurrent_commands_share_one_api_key(monkeypatch):
+    firewall = Firewall("hostname", "username", "password")
+    keygens = []
+    barrier = threading.Barrier(2, timeout=5)
+
+    def mock_retrieve_api_key(self):
+        keygens.append(threading.current_thread().name)
+        return "KEY"
+
+    def mock_op(self, cmd, cmd_xml=False):
+        # Each copy is sent with the key, as pan-os-python does
+        assert self.api_key == "KEY"
+        barrier.wait()
+        if "system" in cmd:
+            return ET.fromstring(
+                "<response><result><system><hostname>fw1</hostname>"
+                "<model>PA-220</model></system></result></response>"
+            )
+        raise ConnectionError("certificate status unavailable")
+
+    monkeypatch.setattr(Firewall, "_retrieve_api_key", mock_retrieve_api_key)
+    monkeypatch.setattr(Firewall, "op", mock_op)
+
+    collect_data_from_firewall(firewall)
+
+    assert len(keygens) == 1
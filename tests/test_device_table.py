@@ -0,0 +1,73 @@
+# tests/test_device_table.py
+
+from device_certificate_report.models.device_table import DeviceTable
+from device_certificate_report.utilities.filters import (
+    filter_devices_by_model,
+    filter_table_by_model,
+    split_devices_by_version,
+    split_table_by_version,
+)
+from device_certificate_report.utilities.pdf_generation import generate_report
+from tests.factories import DeviceInfoFactory
+
+def test_device_table_round_trip():
+    devices = [DeviceInfoFactory() for _ in range(3)]
+    table = DeviceTable.from_devices(devices)
+
+    assert len(table) == 3
+    assert table.to_devices() == devices
+    assert table.column("device_name") == [d.device_name for d in devices]
+    assert table[1].serial_number == devices[1].serial_number
+    assert table.device(2) == devices[2]
+
+def test_device_table_codes_are_shared():
+    table = DeviceTable.from_devices(
+        DeviceInfoFactory(model=model) for model in ["PA-220", "PA-460", "PA-220"]
+    )
+
+    assert table.categories("model") == [None, "PA-220", "PA-460"]
+    assert list(table.codes("model")) == [1, 2, 1]
+
+    table[2].notes = "checked"
+    assert table.get(2, "notes") == "checked"
+    assert table.get(0, "notes") is None
+
+def test_table_classifiers_match_list_classifiers():
+    kwargs = [
+        dict(model="PA-220", software_version="9.1.10"),
+        dict(model="PA-220", software_version="11.2.0"),
+        dict(model="PA-460", software_version="10.1.0"),
+        dict(model="UnknownModel", software_version="10.1.0"),
+        dict(model="PA-3020", software_version="bogus"),
+    ]
+    devices = [DeviceInfoFactory(**kw) for kw in kwargs]
+    table = DeviceTable.from_devices(DeviceInfoFactory(**kw) for kw in kwargs)
+    for device, row in zip(devices, table):
+        row.device_name = device.device_name
+        row.serial_number = device.serial_number
+        row.ipv4_address = device.ipv4_address
+
+    affected, unaffected = filter_devices_by_model(devices)
+    no_upgrade, upgrade = split_devices_by_version(affected)
+
+    affected_table, unaffected_table = filter_table_by_model(table)
+    no_upgrade_table, upgrade_table = split_table_by_version(affected_table)
+
+    assert unaffected_table.to_devices() == unaffected
+    assert no_upgrade_table.to_devices() == no_upgrade
+    assert upgrade_table.to_devices() == upgrade
+
+def test_generate_report_from_table(tmp_path):
+    table = DeviceTable.from_devices([DeviceInfoFactory(), DeviceInfoFactory()])
+    output_file = tmp_path / "report.pdf"
+
+    generate_report(
+        unaffected_devices=table,
+        no_upgrade_required=DeviceTable(),
+        upgrade_required=table,
+        devices_with_globalprotect=table,
+        devices_with_certificates=[],
+        output_file=str(output_file),
+    )
+
+    assert output_file.stat().st_size > 0
@@ -0,0 +1,126 @@
+# tests/test_enrichment.py
+
+import asyncio
+import threading
+import time
+import xml.etree.ElementTree as ET
+
+from device_certificate_report.components.async_xapi import AsyncXapi
+from device_certificate_report.components.enrichment import (
+    SHOW_DEVICE_CERTIFICATE,
+    collect_enriched_panorama,
+    enrich_certificates,
+)
+from device_certificate_report.models.device import DeviceInfo
+from device_certificate_report.models.device_table import DeviceTable
+from tests.xml_api import DEVICE_CERTIFICATE
+
+
+def device(serial, expiry_date="", state="Connected"):
+    return DeviceInfo(
+        device_name=f"fw-{serial}",
+        model="PA-220",
+        serial_number=serial,
+        ipv4_address="192.0.2.1",
+        device_state=state,
+        device_certificate="",
+        device_certificate_expiry_date=expiry_date,
+        software_version="10.1.0",
+        globalprotect_client=None,
+    )
+
+
+class FakePanorama:
+    """
+    Answers certificate status queries for a target serial, like Panorama
+    proxying them to its firewalls.
+    """
+
+    hostname = "pano1"
+
+    def __init__(self):
+        # Shared with the copies each query is sent from
+        self.lock = threading.Lock()
+        self.in_flight = [0, 0]
+        self.targets = []
+        self.keygens = []
+        self._api_key = None
+
+    @property
+    def peak(self):
+        return self.in_flight[1]
+
+    @property
+    def api_key(self):
+        if self._api_key is None:
+            self.keygens.append(threading.current_thread().name)
+            self._api_key = "KEY"
+        return self._api_key
+
+    def op(self, cmd, cmd_xml=True, extra_qs=None):
+        assert cmd == SHOW_DEVICE_CERTIFICATE and not cmd_xml
+        serial = extra_qs["target"]
+        with self.lock:
+            self.targets.append(serial)
+            self.in_flight[0] += 1
+            self.in_flight[1] = max(self.in_flight)
+        time.sleep(0.01)
+        with self.lock:
+            self.in_flight[0] -= 1
+        if serial == "bad":
+            raise ValueError("Device not connected")
+        return ET.fromstring(DEVICE_CERTIFICATE)
+
+
+def test_missing_expiry_dates_are_filled_in_with_bounded_concurrency():
+    devices = [device(str(i)) for i in range(20)]
+    devices += [
+        device("known", "2031/01/01 00:00:00"),
+        device("offline", state="Disconnected"),
+        device("bad"),
+    ]
+    panorama = FakePanorama()
+
+    result = enrich_certificates(panorama, devices, max_workers=4)
+
+    assert result == (21, 20, 1)
+    assert sorted(panorama.targets) == sorted([str(i) for i in range(20)] + ["bad"])
+    assert 1 < panorama.peak <= 4
+    # One key for all the copies the queries are sent from
+    assert len(panorama.keygens) == 1
+    assert devices[0].device_certificate == "Valid"
+    assert devices[0].device_certificate_expiry_date == "2030/01/01 00:00:00"
+    assert devices[20].device_certificate_expiry_date == "2031/01/01 00:00:00"
+    assert devices[22].device_certificate_expiry_date == ""
+
+
+def test_device_table_rows_are_enriched():
+    table = DeviceTable.from_devices([device("1"), device("2", "2031/01/01 00:00:00")])
+
+    enrich_certificates(FakePanorama(), table)
+
+    assert table.column("device_certificate_expiry_date") == [
+        "2030/01/01 00:00:00",
+        "2031/01/01 00:00:00",
+    ]
+
+
+def test_async_collection_enriches_through_the_same_client(xml_api):
+    async def run():
+        async with AsyncXapi(
+            "127.0.0.1",
+            "admin",
+            "secret",
+            port=xml_api.server_address[1],
+            ssl_context=False,
+        ) as client:
+            return client, await collect_enriched_panorama(client)
+
+    client, devices = asyncio.run(run())
+
+    # Only the connected device is queried; the other keeps its blank date
+    assert [d.device_certificate_expiry_date for d in devices] == [
+        "2030/01/01 00:00:00",
+        "",
+    ]
+    assert client.requests_sent == 3
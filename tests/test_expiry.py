@@ -0,0 +1,86 @@
+# tests/test_expiry.py
+
+from datetime import datetime, timezone
+
+from device_certificate_report.components.expiry import (
+    SECONDS_PER_DAY,
+    ExpiryIndex,
+    parse_expiry_date,
+)
+from device_certificate_report.models.device import DeviceInfo
+from device_certificate_report.utilities.pdf_generation import _report_sections
+
+NOW = datetime(2025, 1, 1, tzinfo=timezone.utc).timestamp()
+
+
+def device(name, expiry_date):
+    return DeviceInfo(
+        device_name=name,
+        model="PA-220",
+        serial_number=name,
+        ipv4_address="192.0.2.1",
+        device_state="Connected",
+        device_certificate="Valid",
+        device_certificate_expiry_date=expiry_date,
+        software_version="10.0.0",
+        globalprotect_client=None,
+    )
+
+
+def test_parse_expiry_date_formats():
+    expected = datetime(2025, 3, 21, 12, 30, tzinfo=timezone.utc).timestamp()
+
+    assert parse_expiry_date("2025/03/21 12:30:00 PDT") == expected
+    assert parse_expiry_date("2025-03-21T12:30:00") == expected
+    assert parse_expiry_date("Mar 21 12:30:00 2025 GMT") == expected
+    assert parse_expiry_date("2025-03-21") == expected - 12.5 * 3600
+    assert parse_expiry_date("") is None
+    assert parse_expiry_date("N/A") is None
+    assert parse_expiry_date("2025/13/40") is None
+
+
+def test_expiry_index_queries():
+    devices = [
+        device("in-60-days", "2025/03/02 00:00:00"),
+        device("undated", ""),
+        device("expired", "2024/12/01 00:00:00"),
+        device("in-10-days", "Jan 11 00:00:00 2025 GMT"),
+        device("also-in-10-days", "2025-01-11"),
+        device("in-2-years", "2027-01-01"),
+    ]
+    index = ExpiryIndex(devices)
+
+    assert [d.device_name for d in index.ordered()] == [
+        "expired",
+        "in-10-days",
+        "also-in-10-days",
+        "in-60-days",
+        "in-2-years",
+        "undated",
+    ]
+    assert [d.device_name for d in index.expiring_within(30, now=NOW)] == [
+        "expired",
+        "in-10-days",
+        "also-in-10-days",
+    ]
+    assert index.expiring_before(NOW - SECONDS_PER_DAY) == [devices[2]]
+    assert index.histogram(now=NOW) == [
+        ("Expired", 1),
+        ("Within 30 days", 2),
+        ("31-60 days", 1),
+        ("61-90 days", 0),
+        ("91-180 days", 0),
+        ("181-365 days", 0),
+        ("After 365 days", 1),
+        ("Unknown expiry date", 1),
+    ]
+
+
+def test_expiry_histogram_report_section():
+    histogram = ExpiryIndex([device("fw1", "2024-06-01")]).histogram(now=NOW)
+    sections = _report_sections(
+        [], [], [], [], [], None, False, None, expiry_histogram=histogram
+    )
+
+    assert sections[-1].title == "Certificate Expiry Outlook"
+    assert sections[-1].rows[0] == ["Expired", "1"]
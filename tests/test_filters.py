@@ -29,4 +29,14 @@ def test_split_devices_by_version():
     assert len(no_upgrade_required) == 2
     assert len(upgrade_required) == 1
     assert upgrade_required[0].device_name == device1.device_name
-    assert upgrade_required[0].min_required_version == "9.1.11-h5"
\ No newline at end of file
+    assert upgrade_required[0].min_required_version == "9.1.11-h5"
+
+def test_filter_devices_by_model_resolves_variant_spellings():
+    device1 = DeviceInfoFactory(model=" pa-220-ztp")
+    device2 = DeviceInfoFactory(device_name="device2", model="PA-VM-50")
+    device3 = DeviceInfoFactory(device_name="device3", model="pa-460")
+
+    affected, unaffected = filter_devices_by_model([device1, device2, device3])
+    assert affected == [device1, device2]
+    assert unaffected == [device3]
+    assert device3.notes is None
@@ -0,0 +1,157 @@
+# tests/test_fleet.py
+
+import threading
+import xml.etree.ElementTree as ET
+
+from device_certificate_report.components import fleet
+from device_certificate_report.components.fleet import (
+    collect_data_from_firewalls,
+    collect_data_from_panoramas,
+    read_inventory,
+    run_concurrently,
+)
+from device_certificate_report.utilities.snapshot import SnapshotStore
+
+def devices_response(*hostnames):
+    entries = "".join(
+        f"""<entry>
+            <hostname>{name}</hostname>
+            <model>PA-220</model>
+            <serial>{name}-serial</serial>
+            <ip-address>10.0.0.1</ip-address>
+            <connected>yes</connected>
+            <sw-version>10.1.0</sw-version>
+        </entry>"""
+        for name in hostnames
+    )
+    return ET.fromstring(
+        f"<response><result><devices>{entries}</devices></result></response>"
+    )
+
+def test_read_inventory(tmp_path):
+    inventory = tmp_path / "inventory.txt"
+    inventory.write_text("# Panoramas\npano1\n\n pano2  # EMEA\npano1\n")
+    assert read_inventory(str(inventory)) == ["pano1", "pano2"]
+
+def test_run_concurrently_overlaps_hosts():
+    barrier = threading.Barrier(3, timeout=5)
+
+    def collect(hostname):
+        # Only returns if all three hosts are in flight at the same time
+        barrier.wait()
+        return hostname.upper()
+
+    results, failures = run_concurrently(["a", "b", "c"], collect, max_workers=3)
+    assert results == [("a", "A"), ("b", "B"), ("c", "C")]
+    assert failures == []
+
+def test_collect_data_from_panoramas(monkeypatch):
+    class FakePanorama:
+        api_key = "KEY"
+
+        def __init__(self, hostname, username, password, **kwargs):
+            self.hostname = hostname
+            self.kwargs = kwargs
+
+        def op(self, cmd, cmd_xml=False):
+            assert self.kwargs == {"timeout": 30}
+            if self.hostname == "down":
+                raise ConnectionError("unreachable")
+            return devices_response(f"{self.hostname}-fw1", f"{self.hostname}-fw2")
+
+    monkeypatch.setattr(fleet, "Panorama", FakePanorama)
+
+    devices, failures = collect_data_from_panoramas(
+        ["pano1", "down", "pano2"], "admin", "secret", max_workers=2, timeout=30
+    )
+
+    assert [d.device_name for d in devices] == [
+        "pano1-fw1",
+        "pano1-fw2",
+        "pano2-fw1",
+        "pano2-fw2",
+    ]
+    assert [d.source for d in devices] == ["pano1", "pano1", "pano2", "pano2"]
+    assert len(failures) == 1
+    assert failures[0].hostname == "down"
+    assert "unreachable" in failures[0].error
+
+
+def test_collect_data_from_firewalls(monkeypatch):
+    attempts = {}
+
+    class FakeFirewall:
+        api_key = "KEY"
+
+        def __init__(self, hostname, username, password, **kwargs):
+            self.hostname = hostname
+
+        def op(self, cmd, cmd_xml=False):
+            if "system" in cmd:
+                attempts[self.hostname] = attempts.get(self.hostname, 0) + 1
+                if self.hostname == "down":
+                    raise ConnectionError("unreachable")
+                if self.hostname == "flaky" and attempts["flaky"] == 1:
+                    raise ConnectionError("reset by peer")
+                return ET.fromstring(
+                    f"""<response><result><system>
+                        <hostname>{self.hostname}</hostname>
+                        <model>PA-220</model>
+                        <sw-version>10.1.0</sw-version>
+                    </system></result></response>"""
+                )
+            return ET.fromstring("<response><result/></response>")
+
+    monkeypatch.setattr(fleet, "Firewall", FakeFirewall)
+    monkeypatch.setattr(fleet.time, "sleep", lambda seconds: None)
+
+    devices, failures = collect_data_from_firewalls(
+        ["fw1", "down", "flaky"], "admin", "secret", retries=1
+    )
+
+    assert [(d.device_name, d.source) for d in devices] == [
+        ("fw1", "fw1"),
+        ("flaky", "flaky"),
+    ]
+    assert [f.hostname for f in failures] == ["down"]
+    assert attempts["down"] == 2
+
+
+def test_enriched_collection_does_not_reuse_plain_snapshot(monkeypatch, tmp_path):
+    commands = []
+
+    class FakePanorama:
+        api_key = "KEY"
+
+        def __init__(self, hostname, username, password, **kwargs):
+            self.hostname = hostname
+
+        def op(self, cmd, cmd_xml=False, extra_qs=None):
+            commands.append(cmd)
+            if extra_qs:
+                return ET.fromstring(
+                    "<response><result><device-certificate>"
+                    "<validity>Valid</validity>"
+                    "<not_valid_after>2030/01/01 00:00:00</not_valid_after>"
+                    "</device-certificate></result></response>"
+                )
+            return devices_response("fw1")
+
+    monkeypatch.setattr(fleet, "Panorama", FakePanorama)
+    snapshots = SnapshotStore(str(tmp_path / "snapshots.sqlite3"))
+
+    plain, _ = collect_data_from_panoramas(
+        ["pano1"], "admin", "secret", snapshots=snapshots
+    )
+    enriched, _ = collect_data_from_panoramas(
+        ["pano1"], "admin", "secret", snapshots=snapshots, enrich=True
+    )
+    cached, _ = collect_data_from_panoramas(
+        ["pano1"], "admin", "secret", snapshots=snapshots, enrich=True
+    )
+
+    assert plain[0].device_certificate_expiry_date == ""
+    assert enriched[0].device_certificate_expiry_date == "2030/01/01 00:00:00"
+    assert cached[0].device_certificate_expiry_date == "2030/01/01 00:00:00"
+    # Both collections queried Panorama once; the third run was served cached
+    assert len(commands) == 3
@@ -0,0 +1,220 @@
+# tests/test_incremental.py
+
+import sqlite3
+
+from contextlib import closing
+
+from typer.testing import CliRunner
+
+from device_certificate_report.components import data_collection
+from device_certificate_report.main import app
+from device_certificate_report.utilities import classification, incremental
+from device_certificate_report.utilities.filters import (
+    NO_UPGRADE_REQUIRED,
+    UNAFFECTED,
+    UPGRADE_REQUIRED,
+    classify_device,
+    classify_model_version,
+)
+from device_certificate_report.utilities.incremental import (
+    DeviceChange,
+    classify_incrementally,
+    classify_with_snapshot,
+)
+from device_certificate_report.utilities.pdf_generation import generate_report
+from device_certificate_report.utilities.report_cache import _advisory_digest
+from device_certificate_report.utilities.snapshot import SnapshotStore
+from tests.factories import DeviceInfoFactory
+
+
+def fleet():
+    return [
+        DeviceInfoFactory(
+            device_name=f"fw{n}",
+            serial_number=f"sn{n}",
+            ipv4_address=f"10.0.0.{n}",
+            model=model,
+            software_version=version,
+        )
+        for n, (model, version) in enumerate(
+            [
+                ("PA-220", "9.1.10"),
+                ("PA-220", "11.2.0"),
+                ("PA-460", "10.1.0"),
+                ("Mystery", "10.1.0"),
+            ],
+            start=1,
+        )
+    ]
+
+
+def test_classify_device():
+    devices = fleet()
+    assert [classify_device(d) for d in devices] == [
+        UPGRADE_REQUIRED,
+        NO_UPGRADE_REQUIRED,
+        UNAFFECTED,
+        UNAFFECTED,
+    ]
+    assert devices[0].min_required_version == "9.1.11-h5"
+    assert devices[3].notes == "Model not recognized; considered unaffected."
+
+
+def test_classify_incrementally_reuses_unchanged_devices(tmp_path, monkeypatch):
+    store = SnapshotStore(str(tmp_path / "snapshots.sqlite3"))
+    first = classify_with_snapshot(fleet(), store, "classified/test")
+    assert first.diff is None
+    assert first.reclassified == 4
+
+    calls = []
+    monkeypatch.setattr(
+        classification,
+        "classify_model_version",
+        lambda *key: calls.append(key[:2]) or classify_model_version(*key),
+    )
+    saved = []
+    save_classified = store.save_classified
+    monkeypatch.setattr(
+        store,
+        "save_classified",
+        lambda *args, **kwargs: saved.append(args) or save_classified(*args, **kwargs),
+    )
+
+    devices = fleet()
+    devices[1].software_version = "10.1.0"  # sn2 downgraded
+    devices[2].device_certificate_expiry_date = "2030-01-01"  # sn3 renewed
+    devices.pop()  # sn4 gone
+    devices.append(DeviceInfoFactory(serial_number="sn5", model="PA-3020"))
+
+    second = classify_with_snapshot(devices, store, "classified/test")
+
+    assert sorted(calls) == [("PA-220", "10.1.0"), ("PA-3020", "10.0.0")]
+    assert second.reclassified == 2
+    # Only the rows of added, changed and removed devices are written
+    ((_, upserts, deleted, _),) = saved
+    assert sorted(upserts) == ["sn2", "sn3", "sn5"]
+    assert deleted == ["sn4"]
+    assert [c.serial_number for c in second.diff.added] == ["sn5"]
+    assert [c.serial_number for c in second.diff.changed] == ["sn2", "sn3"]
+    assert [c.serial_number for c in second.diff.removed] == ["sn4"]
+    assert second.diff.unchanged == 1
+    assert second.diff.changed[0].fields == {"software_version": ("11.2.0", "10.1.0")}
+
+    # Reused results carry over the previous minimum required version
+    assert second.buckets[UPGRADE_REQUIRED][0].serial_number == "sn1"
+    assert second.buckets[UPGRADE_REQUIRED][0].min_required_version == "9.1.11-h5"
+    assert [d.serial_number for d in second.buckets[UNAFFECTED]] == ["sn3"]
+    assert second.diff.removed[0].device.model == "Mystery"
+
+    third = classify_with_snapshot(devices, store, "classified/test")
+    assert third.reclassified == 0
+    assert third.diff.unchanged == 4
+    assert third.classification.counters == second.classification.counters
+
+
+def test_changed_advisory_tables_force_a_full_classification(tmp_path, monkeypatch):
+    store = SnapshotStore(str(tmp_path / "snapshots.sqlite3"))
+    classify_with_snapshot(fleet(), store, "classified/test")
+    state = store.load_classified("classified/test")
+    assert state.advisory_digest == _advisory_digest().hex()
+
+    monkeypatch.setattr(incremental, "_advisory_digest", lambda: b"new tables")
+    devices = fleet()
+    devices[2].device_certificate_expiry_date = "2030-01-01"
+
+    result = classify_with_snapshot(devices, store, "classified/test")
+
+    assert result.reclassified == 4
+    assert [c.serial_number for c in result.diff.changed] == ["sn3"]
+    state = store.load_classified("classified/test")
+    assert state.advisory_digest == b"new tables".hex()
+    assert sorted(state.rows) == ["sn1", "sn2", "sn3", "sn4"]
+
+
+def test_panorama_incremental_snapshot_key(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        data_collection, "collect_data_from_panorama", lambda panorama, **_: fleet()
+    )
+    cache_file = tmp_path / "snapshots.sqlite3"
+    args = [
+        "panorama",
+        "--hostname",
+        "pano1",
+        "--username",
+        "admin",
+        "--password",
+        "secret",
+        "--cache-file",
+        str(cache_file),
+        "--incremental",
+        "--format",
+        "jsonl",
+        "--output-file",
+        str(tmp_path / "report.jsonl"),
+    ]
+
+    for _ in range(2):
+        result = CliRunner().invoke(app, args)
+        assert result.exit_code == 0, result.output
+
+    with closing(sqlite3.connect(str(cache_file))) as conn:
+        sources = [row[0] for row in conn.execute("SELECT source FROM snapshots")]
+        classified = [
+            row[0] for row in conn.execute("SELECT source FROM classified_snapshots")
+        ]
+    assert sources == ["panorama/pano1"]
+    assert classified == ["classified/panorama/pano1"]
+    state = SnapshotStore(str(cache_file)).load_classified(classified[0])
+    assert [state.rows[f"sn{n}"].bucket for n in range(1, 5)] == [
+        UPGRADE_REQUIRED,
+        NO_UPGRADE_REQUIRED,
+        UNAFFECTED,
+        UNAFFECTED,
+    ]
+
+
+def test_classify_incrementally_without_previous_snapshot():
+    result, update = classify_incrementally(fleet())
+    assert result.diff is None
+    assert result.reclassified == 4
+    assert [update.upserts[f"sn{n}"].bucket for n in range(1, 5)] == [
+        UPGRADE_REQUIRED,
+        NO_UPGRADE_REQUIRED,
+        UNAFFECTED,
+        UNAFFECTED,
+    ]
+    assert update.replace and not update.deleted
+
+
+def test_unchanged_fleet_writes_nothing():
+    devices = fleet()
+    _, update = classify_incrementally(devices)
+    result, rerun = classify_incrementally(fleet(), update.apply(None))
+    assert result.reclassified == 0
+    assert result.diff.unchanged == 4
+    assert rerun.upserts == {} and rerun.deleted == []
+    assert not rerun.replace
+
+
+def test_device_changes_have_no_shared_default_fields():
+    assert "fields" not in DeviceChange._field_defaults
+
+
+def test_generate_report_with_changes(tmp_path):
+    store = SnapshotStore(str(tmp_path / "snapshots.sqlite3"))
+    classify_with_snapshot(fleet(), store, "classified/test")
+    devices = fleet()
+    devices[0].software_version = "9.1.12"
+    result = classify_with_snapshot(devices, store, "classified/test")
+
+    output_file = tmp_path / "report.pdf"
+    generate_report(
+        unaffected_devices=result.buckets[UNAFFECTED],
+        no_upgrade_required=result.buckets[NO_UPGRADE_REQUIRED],
+        upgrade_required=result.buckets[UPGRADE_REQUIRED],
+        devices_with_globalprotect=[],
+        devices_with_certificates=[],
+        output_file=str(output_file),
+        changes=result.diff,
+    )
+    assert output_file.stat().st_size > 0
@@ -0,0 +1,91 @@
+# tests/test_metrics.py
+
+import json
+
+import pytest
+from typer.testing import CliRunner
+
+from benchmarks.synthetic import write_panorama_csv
+from device_certificate_report.main import app
+from device_certificate_report.utilities import metrics
+
+
+@pytest.fixture
+def recorder():
+    yield metrics.enable()
+    metrics.disable()
+
+
+def test_disabled_stages_are_no_ops():
+    items = [1, 2, 3]
+
+    with metrics.stage("anything") as s:
+        s.add(items=3)
+
+    assert s is metrics.NULL_STAGE
+    assert not s.active
+    assert metrics.timed_iter("anything", items) is items
+
+
+def test_nested_stage_time_is_excluded_from_self_time(recorder):
+    with metrics.stage("outer") as outer:
+        with metrics.stage("inner") as inner:
+            inner.add(items=2, bytes=10)
+            sum(range(200_000))
+
+    records = {record.name: record for record in recorder.records}
+    assert list(records) == ["inner", "outer"]
+    assert records["inner"].items == 2
+    assert records["inner"].bytes == 10
+    assert records["outer"].wall_seconds >= records["inner"].wall_seconds
+    assert records["outer"].self_wall_seconds == pytest.approx(
+        records["outer"].wall_seconds - records["inner"].wall_seconds
+    )
+    assert outer.active
+
+
+def test_timed_iter_counts_items_and_excludes_consumer_time(recorder):
+    with metrics.stage("consume"):
+        for _ in metrics.timed_iter("produce", range(5)):
+            sum(range(50_000))
+
+    produce, consume = recorder.records
+    assert produce.name == "produce"
+    assert produce.items == 5
+    assert consume.self_wall_seconds > produce.wall_seconds
+
+
+def test_counts_added_after_a_stage_finished_are_reported(recorder):
+    with metrics.stage("request") as s:
+        pass
+    s.add(bytes=42)
+
+    assert recorder.totals()["request"]["bytes"] == 42
+
+
+def test_metrics_json_cli_option(tmp_path):
+    csv_file = tmp_path / "panorama.csv"
+    metrics_file = tmp_path / "metrics.json"
+    write_panorama_csv(str(csv_file), 50, seed=1)
+
+    result = CliRunner().invoke(
+        app,
+        [
+            "--metrics-json",
+            str(metrics_file),
+            "csv",
+            "--csv-file",
+            str(csv_file),
+            "--output-file",
+            str(tmp_path / "report.jsonl"),
+            "--format",
+            "jsonl",
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    data = json.loads(metrics_file.read_text())
+    assert data["command"] == "csv"
+    assert list(data["totals"]) == ["read_csv", "classify", "expiry_index", "render"]
+    assert data["totals"]["read_csv"]["items"] == 50
+    assert metrics.stage("after") is metrics.NULL_STAGE
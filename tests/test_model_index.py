@@ -0,0 +1,59 @@
+# tests/test_model_index.py
+
+import pytest
+
+from device_certificate_report.components.model_index import (
+    AFFECTED_MODEL,
+    UNAFFECTED_MODEL,
+    UNKNOWN_MODEL,
+    ModelIndex,
+    get_model_index,
+)
+from device_certificate_report.config.hardware_families import (
+    AffectedFamilies,
+    UnaffectedFamilies,
+)
+
+
+@pytest.mark.parametrize(
+    "raw, model, family, status",
+    [
+        ("PA-220", "PA-220", "220", AFFECTED_MODEL),
+        ("pa-220", "PA-220", "220", AFFECTED_MODEL),
+        ("  PA 220-ztp ", "PA-220-ZTP", "220", AFFECTED_MODEL),
+        ("PA-3260-ZTP", "PA-3260", "3200", AFFECTED_MODEL),
+        ("PA-VM-50", "PA-VM", "vm", AFFECTED_MODEL),
+        ("pa-vm (lite)", "PA-VM (lite)", "vm", AFFECTED_MODEL),
+        ("PA-VM-ARM", "PA-VMARM", "vmarm", AFFECTED_MODEL),
+        ("PA-415-5G", "PA-415-5G", "400", UNAFFECTED_MODEL),
+        ("PA-4155G", "PA-415-5G", "400", UNAFFECTED_MODEL),
+        ("PA-460 ", "PA-460", "400", UNAFFECTED_MODEL),
+    ],
+)
+def test_resolve_variant_spellings(raw, model, family, status):
+    assert get_model_index().resolve(raw) == (model, family, status)
+
+
+@pytest.mark.parametrize("raw", ["PA-4101", "PA-22", "PA", "", None, "UnknownModel"])
+def test_resolve_unknown_models(raw):
+    assert get_model_index().resolve(raw) is UNKNOWN_MODEL
+
+
+def test_listed_models_resolve_to_themselves():
+    index = ModelIndex(AffectedFamilies, UnaffectedFamilies)
+    for families, status in (
+        (AffectedFamilies, AFFECTED_MODEL),
+        (UnaffectedFamilies, UNAFFECTED_MODEL),
+    ):
+        for family, models in families.items():
+            for model in models:
+                assert index.resolve(model) == (model, family, status)
+
+
+def test_resolve_is_memoized_per_raw_string():
+    index = ModelIndex(AffectedFamilies, UnaffectedFamilies)
+    for _ in range(3):
+        index.resolve("pa-220")
+    index.resolve("PA-220")
+
+    assert index.stats() == {"hits": 2, "misses": 2, "size": 2}
@@ -0,0 +1,75 @@
+# tests/test_parallel_csv.py
+
+import mmap
+
+from benchmarks.synthetic import write_panorama_csv
+from device_certificate_report.components.data_collection import iter_csv_records
+from device_certificate_report.components.parallel_csv import (
+    RECORD_FIELDS,
+    iter_csv_chunks,
+    split_records,
+)
+
+QUOTED_CSV = (
+    "\ufeffDevice Name,Model,IP Address Serial Number,Software Version\r\n"
+    '"fw1;fw2",PA-220,"0001;0002",10.1.0\r\n'
+    '"fw3\r\nsecond line ""quoted""\r\n",PA-460,0003,11.0.0\r\n'
+    "\r\n"
+    '"<b>fw4</b>",PA-850,0004,"10.2.3"\r\n'
+)
+
+
+def parallel_records(csv_file, **kwargs):
+    return [
+        dict(zip(RECORD_FIELDS, values))
+        for records in iter_csv_chunks(str(csv_file), **kwargs)
+        for values in records
+    ]
+
+
+def test_split_records_respects_quoted_line_breaks(tmp_path):
+    csv_file = tmp_path / "quoted.csv"
+    csv_file.write_bytes(QUOTED_CSV.encode())
+
+    with open(csv_file, "rb") as file, mmap.mmap(
+        file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as buffer:
+        ranges = list(split_records(buffer, 0, 1))
+        lines = [buffer[start:end] for start, end in ranges]
+
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(QUOTED_CSV.encode())
+    assert lines[2] == b'"fw3\r\nsecond line ""quoted""\r\n",PA-460,0003,11.0.0\r\n'
+    assert len(lines) == 5
+
+
+def test_chunked_parse_matches_serial_parse(tmp_path):
+    csv_file = tmp_path / "quoted.csv"
+    csv_file.write_bytes(QUOTED_CSV.encode())
+
+    serial = list(iter_csv_records(str(csv_file)))
+    assert [record["device_name"] for record in serial] == [
+        "fw1",
+        "fw2",
+        'fw3\r\nsecond line "quoted"',
+        "fw4",
+    ]
+    assert parallel_records(csv_file, workers=2, chunk_size=16) == serial
+
+
+def test_parallel_ingestion_of_synthetic_export(tmp_path):
+    csv_file = tmp_path / "panorama.csv"
+    write_panorama_csv(str(csv_file), 300, seed=3)
+    serial_cleaned = tmp_path / "serial.csv"
+    parallel_cleaned = tmp_path / "parallel.csv"
+
+    serial = list(iter_csv_records(str(csv_file), cleaned_csv_file=str(serial_cleaned)))
+    parallel = parallel_records(
+        csv_file,
+        workers=3,
+        chunk_size=2048,
+        cleaned_csv_file=str(parallel_cleaned),
+    )
+
+    assert parallel == serial
+    assert parallel_cleaned.read_bytes() == serial_cleaned.read_bytes()
+    assert list(iter_csv_records(str(csv_file), workers=2)) == serial
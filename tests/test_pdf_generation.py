@@ -1,6 +1,18 @@
 # tests/test_pdf_generation.py
 
-from device_certificate_report.utilities.pdf_generation import generate_report
+import pytest
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from typer.testing import CliRunner
+
+from device_certificate_report.utilities import pdf_generation
+from device_certificate_report.utilities.pdf_generation import (
+    HEADER_HEIGHT,
+    ROW_HEIGHT,
+    PagedTable,
+    generate_report,
+)
+from device_certificate_report.main import app
+from device_certificate_report.models.device import CollectionFailure
 from tests.factories import DeviceInfoFactory
 import os
 
@@ -29,4 +41,121 @@ def test_generate_report(tmp_path):
     )
 
     assert os.path.exists(output_file)
-    assert os.path.getsize(output_file) > 0
\ No newline at end of file
+    assert os.path.getsize(output_file) > 0
+
+
+def test_generate_report_with_sources_and_failures(tmp_path):
+    device = DeviceInfoFactory(source="pano1")
+    output_file = tmp_path / "report.pdf"
+    generate_report(
+        unaffected_devices=[device],
+        no_upgrade_required=[],
+        upgrade_required=[],
+        devices_with_globalprotect=[device],
+        devices_with_certificates=[],
+        output_file=str(output_file),
+        collection_failures=[CollectionFailure(hostname="pano2", error="timed out")],
+        include_source=True,
+    )
+
+    assert os.path.getsize(output_file) > 0
+
+
+def test_paged_table_splits_into_page_sized_chunks():
+    rows = [[f"fw{i}", "PA-220"] for i in range(100)]
+    table = PagedTable(["Device Name", "Model"], rows, [100, 100])
+
+    first, rest = table.split(200, HEADER_HEIGHT + ROW_HEIGHT * 30)
+
+    assert len(first._cellvalues) == 31  # header + 30 rows
+    assert rest.start == 30
+    assert rest.wrap(200, 1000)[1] == HEADER_HEIGHT + ROW_HEIGHT * 70
+
+
+def test_paged_table_keeps_cells_within_their_columns():
+    error = "Traceback (most recent call last):\n  " + "x" * 200
+    table = PagedTable(["Hostname", "Error"], [["fw1", error], ["fw2", "ok"]], [100, 100])
+
+    chunk = table.split(200, 1000)[0]
+
+    (_, fitted), (_, short) = chunk._cellvalues[1:]
+    assert "\n" not in fitted and fitted.endswith(pdf_generation.ELLIPSIS)
+    assert fitted.startswith("Traceback (most")
+    assert stringWidth(fitted, "Helvetica", 10) <= 100 - 2 * pdf_generation.CELL_PADDING
+    assert short == "ok"
+
+
+def test_generate_report_parallel_render(tmp_path):
+    pypdf = pytest.importorskip("pypdf")
+    devices = [DeviceInfoFactory(model="PA-220") for _ in range(120)]
+    output_file = tmp_path / "report.pdf"
+    generate_report(
+        unaffected_devices=devices,
+        no_upgrade_required=[],
+        upgrade_required=[],
+        devices_with_globalprotect=[],
+        devices_with_certificates=devices,
+        output_file=str(output_file),
+        render_workers=2,
+    )
+
+    reader = pypdf.PdfReader(str(output_file))
+    section_pages = [
+        reader.get_destination_page_number(item) for item in reader.outline
+    ]
+    # Cover page first, then each of the five sections on pages of its own
+    assert len(section_pages) == 5
+    assert section_pages[0] == 1
+    assert section_pages == sorted(set(section_pages))
+    last_page = reader.pages[-1].extract_text()
+    assert f"Page {len(reader.pages)} of {len(reader.pages)}" in last_page
+
+
+def test_generate_report_parallel_render_without_pypdf(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_generation, "PdfWriter", None)
+    output_file = tmp_path / "report.pdf"
+    generate_report(
+        unaffected_devices=[DeviceInfoFactory()],
+        no_upgrade_required=[],
+        upgrade_required=[],
+        devices_with_globalprotect=[],
+        devices_with_certificates=[],
+        output_file=str(output_file),
+        render_workers=2,
+    )
+
+    assert os.path.getsize(output_file) > 0
+
+
+def miscounted_part(part, output_file, first_page, total_pages):
+    # Grows with every renumbering, so the page counts never settle
+    pdf_generation._build_numbered(output_file, [], first_page, total_pages)
+    return total_pages
+
+
+def test_generate_report_falls_back_when_page_counts_keep_changing(
+    tmp_path, monkeypatch, caplog
+):
+    pytest.importorskip("pypdf")
+    monkeypatch.setattr(pdf_generation, "_render_part", miscounted_part)
+    output_file = tmp_path / "report.pdf"
+    generate_report(
+        unaffected_devices=[DeviceInfoFactory()],
+        no_upgrade_required=[],
+        upgrade_required=[],
+        devices_with_globalprotect=[],
+        devices_with_certificates=[],
+        output_file=str(output_file),
+        render_workers=2,
+    )
+
+    assert "rendering the report in a single process" in caplog.text
+    assert os.path.getsize(output_file) > 0
+
+
+@pytest.mark.parametrize("command", ["csv", "panorama", "firewall"])
+def test_render_workers_must_be_positive(command):
+    result = CliRunner().invoke(app, [command, "--render-workers", "0"])
+
+    assert result.exit_code == 2
+    assert "--render-workers" in result.output
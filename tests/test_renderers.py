@@ -0,0 +1,157 @@
+# tests/test_renderers.py
+
+import csv
+import json
+
+import pytest
+
+from device_certificate_report.models.device import CollectionFailure
+from device_certificate_report.models.device_table import DEVICE_FIELDS, DeviceTable
+from device_certificate_report.utilities.incremental import DeviceChange, SnapshotDiff
+from device_certificate_report.utilities.renderers import (
+    OutputFormat,
+    render_report,
+    run_details_path,
+)
+from tests.factories import DeviceInfoFactory
+
+
+def sections():
+    device1 = DeviceInfoFactory(device_name="fw1", model="PA-460")
+    device2 = DeviceInfoFactory(
+        device_name="fw2", min_required_version="10.1.14-h2", notes="<upgrade>"
+    )
+    return dict(
+        unaffected_devices=[device1],
+        no_upgrade_required=[],
+        upgrade_required=DeviceTable.from_devices([device2]),
+        devices_with_globalprotect=[device1, device2],
+        devices_with_certificates=[],
+    )
+
+
+def run_details():
+    device = DeviceInfoFactory(device_name="fw3", serial_number="sn3")
+    return dict(
+        collection_failures=[CollectionFailure(hostname="pano2", error="timed out")],
+        changes=SnapshotDiff(
+            added=[],
+            changed=[
+                DeviceChange(
+                    "sn3", "changed", device, {"software_version": ("10.1.0", "11.0.0")}
+                )
+            ],
+            removed=[],
+            unchanged=4,
+        ),
+    )
+
+
+def test_render_csv(tmp_path):
+    output_file = tmp_path / "report.csv"
+    render_report("csv", output_file=str(output_file), **sections())
+
+    with open(output_file, newline="") as file:
+        rows = list(csv.DictReader(file))
+
+    assert list(rows[0]) == ["section", *DEVICE_FIELDS]
+    assert [(row["section"], row["device_name"]) for row in rows] == [
+        ("unaffected", "fw1"),
+        ("upgrade_required", "fw2"),
+        ("globalprotect", "fw1"),
+        ("globalprotect", "fw2"),
+    ]
+    assert rows[1]["min_required_version"] == "10.1.14-h2"
+    assert rows[0]["notes"] == ""
+
+
+def test_render_jsonl(tmp_path):
+    output_file = tmp_path / "report.jsonl"
+    render_report(OutputFormat.JSONL, output_file=str(output_file), **sections())
+
+    with open(output_file) as file:
+        records = [json.loads(line) for line in file]
+
+    assert len(records) == 4
+    assert records[1]["section"] == "upgrade_required"
+    assert records[1]["notes"] == "<upgrade>"
+    assert records[0]["notes"] is None
+
+
+def test_render_html_escapes_values(tmp_path):
+    output_file = tmp_path / "report.html"
+    render_report("html", output_file=str(output_file), **sections())
+
+    page = output_file.read_text()
+    assert page.count("<table>") == 3
+    assert "&lt;upgrade&gt;" in page
+    assert page.rstrip().endswith("</html>")
+
+
+def test_render_html_expiry_histogram(tmp_path):
+    output_file = tmp_path / "report.html"
+    render_report(
+        "html",
+        output_file=str(output_file),
+        expiry_histogram=[("Expired", 2), ("Within 30 days", 0)],
+        **sections(),
+    )
+
+    page = output_file.read_text()
+    assert "<tr><td>Expired</td><td>2</td></tr>" in page
+    assert page.index("Certificate Expiry Outlook") > page.index('id="certificates"')
+
+
+def test_render_parquet(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    output_file = tmp_path / "report.parquet"
+    render_report("parquet", output_file=str(output_file), **sections())
+
+    table = pq.read_table(output_file)
+    assert table.column_names == ["section", *DEVICE_FIELDS]
+    assert table.column("device_name").to_pylist() == ["fw1", "fw2", "fw1", "fw2"]
+
+
+def test_render_pdf(tmp_path):
+    output_file = tmp_path / "report.pdf"
+    render_report("pdf", output_file=str(output_file), **sections())
+
+    assert output_file.read_bytes().startswith(b"%PDF")
+
+
+@pytest.mark.parametrize("output_format", ["csv", "jsonl"])
+def test_record_formats_write_run_details_next_to_the_report(tmp_path, output_format):
+    output_file = tmp_path / f"report.{output_format}"
+    render_report(
+        output_format, output_file=str(output_file), **sections(), **run_details()
+    )
+
+    path = tmp_path / "report.run.json"
+    assert run_details_path(str(output_file)) == str(path)
+    details = json.loads(path.read_text())
+    assert details["collection_failures"] == [
+        {"hostname": "pano2", "error": "timed out"}
+    ]
+    assert details["changes"]["changed"] == [
+        {
+            "serial_number": "sn3",
+            "device_name": "fw3",
+            "fields": {"software_version": ["10.1.0", "11.0.0"]},
+        }
+    ]
+    assert details["changes"]["unchanged"] == 4
+
+    # A later run without failures or changes does not leave them behind
+    render_report(output_format, output_file=str(output_file), **sections())
+    assert not path.exists()
+
+
+def test_render_html_run_details(tmp_path):
+    output_file = tmp_path / "report.html"
+    render_report("html", output_file=str(output_file), **sections(), **run_details())
+
+    content = output_file.read_text()
+    assert content.index("Changes Since Last Run") < content.index("Unaffected")
+    assert "software_version: 10.1.0 -&gt; 11.0.0" in content
+    assert "<td>pano2</td><td>timed out</td>" in content
+    assert not (tmp_path / "report.run.json").exists()
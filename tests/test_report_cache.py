@@ -0,0 +1,82 @@
+# tests/test_report_cache.py
+
+import os
+
+from pathlib import Path
+
+from device_certificate_report.models.device import CollectionFailure, DeviceInfo
+from device_certificate_report.utilities.renderers import render_report
+from device_certificate_report.utilities.report_cache import ReportCache, report_key
+
+
+def sections(version="10.1.0"):
+    device = DeviceInfo(
+        device_name="fw1",
+        model="PA-220",
+        serial_number="0001",
+        ipv4_address="192.0.2.1",
+        device_state="Connected",
+        device_certificate="Valid",
+        device_certificate_expiry_date="2030/01/01 00:00:00",
+        software_version=version,
+        globalprotect_client=None,
+    )
+    return dict(
+        unaffected_devices=[device],
+        no_upgrade_required=[],
+        upgrade_required=[],
+        devices_with_globalprotect=[],
+        devices_with_certificates=[device],
+    )
+
+
+def test_unchanged_report_is_linked_from_cache(tmp_path):
+    cache = ReportCache(tmp_path / "cache")
+    output_file = str(tmp_path / "report.csv")
+
+    assert not render_report("csv", output_file=output_file, cache=cache, **sections())
+    first = Path(output_file).read_text()
+    os.unlink(output_file)
+
+    assert render_report("csv", output_file=output_file, cache=cache, **sections())
+    ((_, stat),) = cache.entries()
+    assert os.stat(output_file).st_ino == stat.st_ino
+    assert Path(output_file).read_text() == first
+
+
+def test_key_covers_devices_and_options():
+    failure = [CollectionFailure(hostname="pano2", error="timed out")]
+    keys = {
+        report_key("csv", sections(), {}),
+        report_key("pdf", sections(), {}),
+        report_key("csv", sections("11.0.0"), {}),
+        report_key("csv", sections(), {"include_source": True}),
+        report_key("csv", sections(), {"collection_failures": failure}),
+    }
+    assert len(keys) == 5
+    assert report_key("pdf", sections(), {"render_workers": 1}) == report_key(
+        "pdf", sections(), {}
+    )
+
+
+def test_rendering_over_a_linked_report_keeps_the_cache_intact(tmp_path):
+    cache = ReportCache(tmp_path / "cache")
+    output_file = str(tmp_path / "report.csv")
+
+    render_report("csv", output_file=output_file, cache=cache, **sections())
+    render_report("csv", output_file=output_file, cache=cache, **sections("11.0.0"))
+
+    contents = sorted(path.read_text() for path, _ in cache.entries())
+    assert len(contents) == 2
+    assert "10.1.0" in contents[0] and "11.0.0" in contents[1]
+
+
+def test_least_recently_used_reports_are_evicted(tmp_path):
+    cache = ReportCache(tmp_path / "cache", max_bytes=25)
+    for number, key in enumerate("abc"):
+        report = tmp_path / f"{key}.csv"
+        report.write_text("x" * 10)
+        os.utime(report, (number, number))
+        cache.store(key, ".csv", str(report))
+
+    assert sorted(path.name for path, _ in cache.entries()) == ["b.csv", "c.csv"]
@@ -0,0 +1,122 @@
+# tests/test_sharding.py
+
+from pathlib import Path
+
+import pytest
+
+from device_certificate_report.config.output_formats import OutputFormat, ShardBy
+from device_certificate_report.main import write_report
+from device_certificate_report.models.device import CollectionFailure, DeviceInfo
+from device_certificate_report.utilities.classification import DEVICES, classify_devices
+from device_certificate_report.utilities.filters import UPGRADE_REQUIRED
+from device_certificate_report.utilities import sharding
+from device_certificate_report.utilities.sharding import (
+    INDEX_FILE,
+    render_shards,
+    shard_file_name,
+    split_classification,
+)
+
+
+def device(name, model, version="10.1.0", source=None):
+    return DeviceInfo(
+        device_name=name,
+        model=model,
+        serial_number=f"{name}-serial",
+        ipv4_address="192.0.2.1",
+        device_state="Connected",
+        device_certificate="Valid",
+        device_certificate_expiry_date="2030/01/01 00:00:00",
+        software_version=version,
+        globalprotect_client=None,
+        source=source,
+    )
+
+
+FLEET = [
+    device("fw1", "PA-220", "9.1.0", source="pano1"),
+    device("fw2", "PA-460", source="pano2"),
+    device("fw3", "pa 220", "11.0.0", source="pano1"),
+    device("fw4", "XYZ-1", source="pano2"),
+    device("fw5", "PA-3220", "8.1.0"),
+]
+
+
+def test_split_keeps_every_device_in_its_buckets():
+    classification = classify_devices(FLEET)
+    shards = {
+        shard.name: shard.classification
+        for shard in split_classification(classification, "family")
+    }
+
+    assert sorted(shards) == ["220", "3200", "400", "unrecognized"]
+    assert [d.device_name for d in shards["220"].certificates] == ["fw1", "fw3"]
+    assert sum(shard.counters[DEVICES] for shard in shards.values()) == len(FLEET)
+    assert sum(
+        shard.counters[UPGRADE_REQUIRED] for shard in shards.values()
+    ) == classification.counters[UPGRADE_REQUIRED]
+
+    by_model = [s.name for s in split_classification(classification, "model")]
+    assert by_model == ["PA-220", "PA-3220", "PA-460", "XYZ-1"]
+    by_source = [s.name for s in split_classification(classification, "source")]
+    assert by_source == ["pano1", "pano2", "unknown source"]
+
+
+def test_shard_file_names_are_safe():
+    assert shard_file_name("unknown source", "pdf") == "unknown_source.pdf"
+    assert shard_file_name("../pano/1", "csv") == "pano_1.csv"
+
+
+def test_parallel_shards_match_sequential_and_are_indexed(tmp_path):
+    classification = classify_devices(FLEET)
+    failures = [CollectionFailure(hostname="pano3", error="timed out")]
+
+    parallel = render_shards(
+        "csv",
+        classification,
+        str(tmp_path / "parallel"),
+        "source",
+        workers=2,
+        collection_failures=failures,
+    )
+    sequential = render_shards(
+        "csv", classification, str(tmp_path / "sequential"), "source", workers=1
+    )
+
+    assert parallel == sequential
+    assert [report.file_name for report in parallel] == [
+        "pano1.csv",
+        "pano2.csv",
+        "unknown_source.csv",
+    ]
+    for report in parallel:
+        assert (tmp_path / "parallel" / report.file_name).read_bytes() == (
+            tmp_path / "sequential" / report.file_name
+        ).read_bytes()
+
+    index = Path(tmp_path / "parallel" / INDEX_FILE).read_text()
+    assert '<a href="pano1.csv">pano1</a>' in index
+    assert "pano3" in index and "pano3" not in (
+        tmp_path / "sequential" / INDEX_FILE
+    ).read_text()
+
+
+@pytest.mark.parametrize("render_workers", [None, 1, 3])
+def test_render_workers_are_passed_to_sharding_unchanged(
+    tmp_path, monkeypatch, render_workers
+):
+    calls = []
+    monkeypatch.setattr(
+        sharding, "render_shards", lambda *args, workers, **_: calls.append(workers)
+    )
+
+    write_report(
+        OutputFormat.CSV,
+        classify_devices(FLEET),
+        str(tmp_path / "report.csv"),
+        shard_by=ShardBy.SOURCE,
+        render_workers=render_workers,
+    )
+
+    # None means one process per CPU; an explicit 1 renders the shards serially
+    assert calls == [render_workers]
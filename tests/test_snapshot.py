@@ -0,0 +1,119 @@
+# tests/test_snapshot.py
+
+import time
+
+from typer.testing import CliRunner
+
+from device_certificate_report.components import data_collection
+from device_certificate_report.main import app
+from device_certificate_report.utilities.snapshot import SnapshotStore
+from tests.factories import DeviceInfoFactory
+
+def test_snapshot_round_trip(tmp_path):
+    store = SnapshotStore(str(tmp_path / "snapshots.sqlite3"))
+    devices = [DeviceInfoFactory(), DeviceInfoFactory(source="pano1")]
+
+    store.save("panorama/pano1", devices)
+    snapshot = store.load("panorama/pano1")
+
+    assert snapshot.devices == devices
+    assert snapshot.age < 60
+    assert store.load("panorama/other") is None
+
+def test_snapshot_ttl(tmp_path):
+    store = SnapshotStore(str(tmp_path / "snapshots.sqlite3"))
+    store.save("firewall/fw1", [DeviceInfoFactory()], collected_at=time.time() - 120)
+
+    assert store.load("firewall/fw1", max_age=60) is None
+    assert store.load("firewall/fw1", max_age=300) is not None
+
+def test_is_fresh(tmp_path):
+    path = str(tmp_path / "snapshots.sqlite3")
+    store = SnapshotStore(path, ttl=60)
+    store.save("firewall/fw1", [DeviceInfoFactory()])
+    store.save("firewall/fw2", [DeviceInfoFactory()], collected_at=time.time() - 120)
+
+    assert store.is_fresh("firewall/fw1")
+    assert not store.is_fresh("firewall/fw2")
+    assert not store.is_fresh("firewall/fw3")
+    assert not SnapshotStore(path, ttl=60, refresh=True).is_fresh("firewall/fw1")
+
+def test_get_or_collect(tmp_path):
+    path = str(tmp_path / "snapshots.sqlite3")
+    calls = []
+
+    def collect():
+        calls.append(1)
+        return [DeviceInfoFactory(device_name=f"fw{len(calls)}")]
+
+    store = SnapshotStore(path, ttl=60)
+    assert store.get_or_collect("firewall/fw", collect)[0].device_name == "fw1"
+    assert store.get_or_collect("firewall/fw", collect)[0].device_name == "fw1"
+    assert len(calls) == 1
+
+    refreshing = SnapshotStore(path, ttl=60, refresh=True)
+    assert refreshing.get_or_collect("firewall/fw", collect)[0].device_name == "fw2"
+    assert store.get_or_collect("firewall/fw", collect)[0].device_name == "fw2"
+
+def test_get_or_collect_keeps_snapshot_on_empty_collection(tmp_path):
+    store = SnapshotStore(str(tmp_path / "snapshots.sqlite3"), refresh=True)
+    store.save("panorama/pano1", [DeviceInfoFactory()])
+
+    assert store.get_or_collect("panorama/pano1", lambda: []) == []
+    assert len(store.load("panorama/pano1").devices) == 1
+
+def test_panorama_run_writes_no_snapshot_without_cache_options(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setattr(
+        data_collection,
+        "collect_data_from_panorama",
+        lambda panorama, **_: [DeviceInfoFactory()],
+    )
+
+    result = CliRunner().invoke(
+        app,
+        [
+            "panorama",
+            "--hostname",
+            "pano1",
+            "--username",
+            "admin",
+            "--password",
+            "secret",
+            "--format",
+            "jsonl",
+            "--output-file",
+            str(tmp_path / "report.jsonl"),
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert not (tmp_path / "cache").exists()
+
+def test_warm_cache_run_asks_for_no_credentials(tmp_path, monkeypatch):
+    collections = []
+    monkeypatch.setattr(
+        data_collection,
+        "collect_data_from_panorama",
+        lambda panorama, **_: collections.append(panorama) or [DeviceInfoFactory()],
+    )
+    args = [
+        "panorama",
+        "--hostname",
+        "pano1",
+        "--use-cache",
+        "--cache-file",
+        str(tmp_path / "snapshots.sqlite3"),
+        "--format",
+        "jsonl",
+        "--output-file",
+        str(tmp_path / "report.jsonl"),
+    ]
+
+    cold = CliRunner().invoke(app, args, input="admin\nsecret\n")
+    warm = CliRunner().invoke(app, args)
+
+    assert cold.exit_code == 0 and "Panorama password" in cold.output
+    assert warm.exit_code == 0, warm.output
+    assert "username" not in warm.output
+    assert len(collections) == 1
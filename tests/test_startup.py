@@ -0,0 +1,51 @@
+# tests/test_startup.py
+
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks.bench_import_time import DEFAULT_BUDGET_MS, MODULE, import_times
+
+ROOT = Path(__file__).resolve().parents[1]
+
+HEAVY_PACKAGES = {"panos", "pan", "pydantic", "reportlab", "pyarrow", "pypdf"}
+
+# Headroom over the benchmark's budget, so a slow or busy machine does not
+# fail the suite while a heavy dependency imported at startup still does
+IMPORT_TIME_SLACK = 3
+
+
+def loaded_packages(code: str):
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"{code}\nimport sys\nprint(' '.join(sorted({{m.split('.')[0] for m in sys.modules}})))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=ROOT,
+    )
+    return set(result.stdout.split())
+
+
+def test_cli_import_does_not_load_heavy_dependencies():
+    assert loaded_packages("import device_certificate_report.main") & HEAVY_PACKAGES == set()
+
+
+def test_csv_path_does_not_load_pan_os_python_or_reportlab():
+    loaded = loaded_packages(
+        "from device_certificate_report.components.data_collection import iter_csv_devices\n"
+        "from device_certificate_report.utilities.filters import filter_devices_by_model\n"
+        "from device_certificate_report.utilities.renderers import render_report"
+    )
+    assert loaded & {"panos", "pan", "reportlab", "pyarrow"} == set()
+
+
+def test_cli_import_time_within_budget(monkeypatch):
+    # The interpreters started by import_times look for the package here
+    monkeypatch.chdir(ROOT)
+    totals = [import_times(MODULE)[MODULE][1] / 1000 for _ in range(3)]
+    assert statistics.median(totals) <= DEFAULT_BUDGET_MS * IMPORT_TIME_SLACK
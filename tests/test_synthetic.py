@@ -0,0 +1,33 @@
+# tests/test_synthetic.py
+
+from benchmarks.synthetic import write_panorama_csv, write_show_devices_xml
+from device_certificate_report.components.data_collection import iter_csv_devices
+from device_certificate_report.components.xml_stream import iter_panorama_devices
+
+
+def test_synthetic_csv_and_xml_describe_the_same_fleet(tmp_path):
+    csv_file = tmp_path / "fleet.csv"
+    xml_file = tmp_path / "fleet.xml"
+    rows = write_panorama_csv(str(csv_file), 500, seed=7, multi_device_rate=0.3)
+    write_show_devices_xml(str(xml_file), 500, seed=7, multi_device_rate=0.3)
+
+    from_csv = list(iter_csv_devices(str(csv_file)))
+    from_xml = list(iter_panorama_devices(str(xml_file)))
+
+    assert rows < 500  # some rows hold several devices
+    assert "<p>" in csv_file.read_text()
+    assert len(from_csv) == len(from_xml) == 500
+    for csv_device, xml_device in zip(from_csv, from_xml):
+        # The CSV path maps an absent GlobalProtect client to None, the XML
+        # path to an empty string
+        xml_device.globalprotect_client = xml_device.globalprotect_client or None
+        assert csv_device == xml_device
+
+
+def test_synthetic_fleet_is_deterministic(tmp_path):
+    first = tmp_path / "first.csv"
+    second = tmp_path / "second.csv"
+    write_panorama_csv(str(first), 200, seed=3)
+    write_panorama_csv(str(second), 200, seed=3)
+
+    assert first.read_bytes() == second.read_bytes()
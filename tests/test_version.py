@@ -24,6 +24,11 @@ def test_version_comparison():
     v2 = Version(10, 1, 7, 1)
     assert v1 < v2
 
+def test_version_key_ordering():
+    versions = [Version(9, 1, 13, 5), Version(10, 1, 6, 8), Version(10, 1, 6), Version(10, 1, 7, 1)]
+    by_key = sorted(versions, key=lambda v: v.key)
+    assert [repr(v) for v in by_key] == ["9.1.13-h5", "10.1.6", "10.1.6-h8", "10.1.7-h1"]
+
 def test_invalid_version():
     with pytest.raises(ValueError):
         parse_version("invalid-version")
\ No newline at end of file
@@ -0,0 +1,75 @@
+# tests/test_xml_stream.py
+
+import io
+import xml.etree.ElementTree as ET
+
+import pytest
+from device_certificate_report.components import data_collection
+from device_certificate_report.components.data_collection import (
+    collect_data_from_panorama,
+)
+from device_certificate_report.components.xml_stream import (
+    iter_panorama_devices,
+    iter_panorama_records,
+    panorama_entry_record,
+)
+from panos.panorama import Panorama
+
+def devices_xml(count):
+    entries = "".join(
+        f"""<entry name="serial{n}">
+            <serial>serial{n}</serial>
+            <hostname>fw{n}</hostname>
+            <model>PA-220</model>
+            <ip-address>10.0.0.{n % 250}</ip-address>
+            <connected>{"yes" if n % 2 else "no"}</connected>
+            <sw-version>10.1.{n % 12}</sw-version>
+            <global-protect-client-package-version>0.0.0</global-protect-client-package-version>
+            <vsys><entry name="vsys1"><display-name>vsys1</display-name></entry></vsys>
+        </entry>"""
+        for n in range(count)
+    )
+    return (
+        f'<response status="success"><result><devices>{entries}</devices></result></response>'
+    ).encode()
+
+def test_iter_panorama_records_matches_tree_parse():
+    document = devices_xml(50)
+
+    streamed = list(iter_panorama_records(io.BytesIO(document)))
+    parsed = [
+        panorama_entry_record(entry)
+        for entry in ET.fromstring(document).findall(".//devices/entry")
+    ]
+
+    assert len(streamed) == 50
+    assert streamed == parsed
+    assert streamed[1]["device_state"] == "Connected"
+    assert streamed[0]["globalprotect_client"] == ""
+
+def test_iter_panorama_devices_from_file(tmp_path):
+    xml_file = tmp_path / "devices.xml"
+    xml_file.write_bytes(devices_xml(3))
+
+    devices = list(iter_panorama_devices(str(xml_file)))
+
+    assert [d.device_name for d in devices] == ["fw0", "fw1", "fw2"]
+
+def test_iter_panorama_records_error_response():
+    document = b'<response status="error"><msg><line>Invalid credentials.</line></msg></response>'
+    with pytest.raises(ValueError, match="Invalid credentials"):
+        list(iter_panorama_records(io.BytesIO(document)))
+
+def test_collect_data_from_panorama_streaming(monkeypatch):
+    panorama = Panorama("hostname", "username", "password")
+    monkeypatch.setattr(
+        data_collection,
+        "open_op_stream",
+        lambda device, cmd: io.BytesIO(devices_xml(4)),
+    )
+
+    devices = collect_data_from_panorama(panorama, streaming=True)
+    table = collect_data_from_panorama(panorama, as_table=True, streaming=True)
+
+    assert [d.device_name for d in devices] == ["fw0", "fw1", "fw2", "fw3"]
+    assert table.to_devices() == devices
@@ -0,0 +1,173 @@
+# tests/xml_api.py
+
+"""
+A stand-in for the PAN-OS XML API, served over HTTP or HTTPS by the
+`xml_api` and `tls_xml_api` fixtures in conftest.py.
+"""
+
+import shutil
+import ssl
+import subprocess
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+from urllib.parse import parse_qs
+
+import pytest
+
+from device_certificate_report.components.data_collection import FIREWALL_COMMANDS
+from device_certificate_report.components.xml_stream import SHOW_DEVICES_ALL
+
+SYSTEM_INFO = (
+    '<response status="success"><result><system>'
+    "<hostname>fw1</hostname><model>PA-220</model><serial>0001</serial>"
+    "<ip-address>192.0.2.1</ip-address><sw-version>10.1.0</sw-version>"
+    "<global-protect-client-package-version>0.0.0"
+    "</global-protect-client-package-version>"
+    "<device-certificate-status>None</device-certificate-status>"
+    "</system></result></response>"
+)
+
+DEVICE_CERTIFICATE = (
+    '<response status="success"><result><device-certificate>'
+    "<validity>Valid</validity><not_valid_after>2030/01/01 00:00:00</not_valid_after>"
+    "</device-certificate></result></response>"
+)
+
+DEVICES_ALL = (
+    '<response status="success"><result><devices>'
+    "<entry><hostname>fw1</hostname><model>PA-220</model><serial>0001</serial>"
+    "<connected>yes</connected><sw-version>10.1.0</sw-version></entry>"
+    "<entry><hostname>fw2</hostname><model>PA-460</model><serial>0002</serial>"
+    "<connected>no</connected><sw-version>11.0.0</sw-version></entry>"
+    "</devices></result></response>"
+)
+
+API_KEY = '<response status="success"><result><key>KEY</key></result></response>'
+
+ERROR = '<response status="error"><msg><line>{}</line></msg></response>'
+
+
+class XmlApiHandler(BaseHTTPRequestHandler):
+    """
+    Answers keygen and the operational commands the collectors send, like
+    a PAN-OS host would, over HTTP/1.1 keep-alive connections.
+    """
+
+    protocol_version = "HTTP/1.1"
+    # Send each response in one write, as a real server does
+    wbufsize = 65536
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers["Content-Length"])
+        query = {k: v[0] for k, v in parse_qs(self.rfile.read(length).decode()).items()}
+        status, body = 200, ERROR.format("Unknown command")
+        if self.headers["Host"].startswith("localhost"):
+            status, body = 403, ERROR.format("Access denied")
+        elif query["type"] == "keygen":
+            if query["password"] == "secret":
+                body = API_KEY
+            else:
+                status, body = 403, ERROR.format("Invalid Credential")
+        elif query.get("key") != "KEY":
+            status, body = 403, ERROR.format("Invalid key")
+        else:
+            body = {
+                SHOW_DEVICES_ALL: DEVICES_ALL,
+                FIREWALL_COMMANDS["system_info"]: SYSTEM_INFO,
+                FIREWALL_COMMANDS["device_certificate"]: DEVICE_CERTIFICATE,
+            }.get(query["cmd"], body)
+
+        content = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/xml")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+        # Drop the connection without saying so, as a host timing out an
+        # idle keep-alive connection would
+        self.close_connection = self.server.drop_connections
+
+
+class TlsXmlApiHandler(XmlApiHandler):
+    """
+    Completes the TLS handshake in the connection's own thread and records
+    whether the client resumed an earlier session.
+    """
+
+    def setup(self):
+        self.request.do_handshake()
+        with self.server.lock:
+            self.server.session_reused.append(self.request.session_reused)
+        super().setup()
+
+
+def self_signed_context(directory: Path) -> ssl.SSLContext:
+    """
+    Return a server SSL context with a throwaway certificate for 127.0.0.1,
+    made with openssl. Skips the calling test when openssl is not available.
+    """
+    openssl = shutil.which("openssl")
+    if openssl is None:
+        pytest.skip("openssl is needed to create a test certificate")
+    cert_file, key_file = directory / "cert.pem", directory / "key.pem"
+    subprocess.run(
+        [
+            openssl,
+            "req",
+            "-x509",
+            "-newkey",
+            "ec",
+            "-pkeyopt",
+            "ec_paramgen_curve:prime256v1",
+            "-nodes",
+            "-days",
+            "1",
+            "-subj",
+            "/CN=127.0.0.1",
+            "-keyout",
+            str(key_file),
+            "-out",
+            str(cert_file),
+        ],
+        check=True,
+        capture_output=True,
+    )
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert_file, key_file)
+    return context
+
+
+def start_server(
+    handler=XmlApiHandler, context: Optional[ssl.SSLContext] = None
+) -> ThreadingHTTPServer:
+    """
+    Serve the stand-in API on a free port of 127.0.0.1 from a daemon thread.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    if context is not None:
+        server.socket = context.wrap_socket(
+            server.socket, server_side=True, do_handshake_on_connect=False
+        )
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.connections = 0
+    server.session_reused = []
+    server.drop_connections = False
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def stop_server(server: ThreadingHTTPServer):
+    server.shutdown()
+    server.server_close()